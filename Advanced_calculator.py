@@ -1,5 +1,10 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, simpledialog, messagebox
+from calc_engine import evaluate, make_backend, ExpressionError, IncrementalEvaluator
+from calc_sheet import Sheet
+from storage import Document
+
+REDRAW_DELAY_MS = 16
 
 class Calculator:
     def __init__(self, root):
@@ -9,9 +14,25 @@ class Calculator:
         
         self.current_expression = ""
         self.total_expression = ""
+        self.backend = make_backend("float")
+        self.backend_var = tk.StringVar(value="float")
+        self.precision = 28
+        self.incremental = IncrementalEvaluator(self.backend)
+        self.total_display = ""
+        self.total_message = None
+        self.redraw_job = None
+        self.sheet = Sheet(self.backend)
+        self.sheet_window = None
+        self.graph_window = None
+        self.settings = Document("calculator_sheet.json", after=self.root.after)
+        try:
+            self.sheet.define_many(self.settings.get("definitions", []))
+        except ExpressionError:
+            self.sheet = Sheet(self.backend)
+        self.create_menu()
         
         self.display_frame = self.create_display_frame()
-        self.total_label, self.label = self.create_display_labels()
+        self.total_label, self.label, self.preview_label = self.create_display_labels()
         self.digits = {
             7: (1, 1), 8: (1, 2), 9: (1, 3),
             4: (2, 1), 5: (2, 2), 6: (2, 3),
@@ -31,6 +52,43 @@ class Calculator:
         self.create_special_buttons()
         self.bind_keys()
 
+    def create_menu(self):
+        menubar = tk.Menu(self.root)
+        mode_menu = tk.Menu(menubar, tearoff=0)
+        mode_menu.add_radiobutton(label="Float (fast)", variable=self.backend_var, value="float",
+                                  command=self.set_backend)
+        mode_menu.add_radiobutton(label="Decimal", variable=self.backend_var, value="decimal",
+                                  command=self.set_backend)
+        mode_menu.add_radiobutton(label="Exact (fractions)", variable=self.backend_var, value="fraction",
+                                  command=self.set_backend)
+        mode_menu.add_separator()
+        mode_menu.add_command(label="Precision...", command=self.ask_precision)
+        menubar.add_cascade(label="Mode", menu=mode_menu)
+        memory_menu = tk.Menu(menubar, tearoff=0)
+        memory_menu.add_command(label="Memory Add (M+)", command=lambda: self.memory_add(1))
+        memory_menu.add_command(label="Memory Subtract (M-)", command=lambda: self.memory_add(-1))
+        memory_menu.add_command(label="Memory Recall (MR)", command=self.memory_recall)
+        memory_menu.add_command(label="Memory Clear (MC)", command=self.memory_clear)
+        memory_menu.add_separator()
+        memory_menu.add_command(label="Variables...", command=self.show_sheet)
+        memory_menu.add_command(label="Graph...", command=self.show_graph)
+        menubar.add_cascade(label="Memory", menu=memory_menu)
+        self.root.config(menu=menubar)
+
+    def set_backend(self):
+        self.backend = make_backend(self.backend_var.get(), self.precision)
+        self.incremental = IncrementalEvaluator(self.backend)
+        self.incremental.feed(self.total_expression)
+        self.sheet_changed(self.sheet.set_backend(self.backend))
+        self.schedule_redraw()
+
+    def ask_precision(self):
+        precision = simpledialog.askinteger("Precision", "Significant digits:", parent=self.root,
+                                            initialvalue=self.precision, minvalue=1, maxvalue=1000)
+        if precision:
+            self.precision = precision
+            self.set_backend()
+
     def bind_keys(self):
         self.root.bind("<Return>", lambda event: self.evaluate())
         for key in self.digits:
@@ -53,7 +111,11 @@ class Calculator:
                         bg="#F5F5F5", fg="#25265E", padx=24, font=("Arial", 40, "bold"))
         label.pack(expand=True, fill="both")
 
-        return total_label, label
+        preview_label = tk.Label(self.display_frame, text="", anchor=tk.E,
+                                 bg="#F5F5F5", fg="#8A8BA8", padx=24, font=("Arial", 16))
+        preview_label.pack(expand=True, fill="both")
+
+        return total_label, label, preview_label
 
     def create_display_frame(self):
         frame = tk.Frame(self.root, height=221, bg="#F5F5F5")
@@ -62,7 +124,7 @@ class Calculator:
 
     def add_to_expression(self, value):
         self.current_expression += str(value)
-        self.update_label()
+        self.schedule_redraw()
 
     def create_digit_buttons(self):
         for digit, grid_value in self.digits.items():
@@ -72,11 +134,15 @@ class Calculator:
             button.grid(row=grid_value[0], column=grid_value[1], sticky=tk.NSEW)
 
     def append_operator(self, operator):
-        self.current_expression += operator
-        self.total_expression += self.current_expression
+        text = self.current_expression + operator
+        if not self.total_expression:
+            self.total_display = ""
+        self.incremental.feed(text)
+        self.total_expression += text
+        self.total_display += self.format_operators(text)
+        self.total_message = None
         self.current_expression = ""
-        self.update_total_label()
-        self.update_label()
+        self.schedule_redraw()
 
     def create_operator_buttons(self):
         i = 0
@@ -90,8 +156,10 @@ class Calculator:
     def clear(self):
         self.current_expression = ""
         self.total_expression = ""
-        self.update_label()
-        self.update_total_label()
+        self.incremental.reset()
+        self.total_display = ""
+        self.total_message = None
+        self.schedule_redraw()
 
     def create_clear_button(self):
         button = tk.Button(self.buttons_frame, text="C", bg="#F8FAFF",
@@ -99,13 +167,17 @@ class Calculator:
                           command=self.clear)
         button.grid(row=0, column=1, sticky=tk.NSEW)
 
+    def show_error(self, error):
+        self.current_expression = "Error"
+        self.total_message = str(error)
+
     def square(self):
         try:
-            self.current_expression = str(eval(f"{self.current_expression}**2"))
-        except Exception as e:
-            self.current_expression = "Error"
+            self.current_expression = str(evaluate(f"({self.current_expression})**2", backend=self.backend))
+        except ExpressionError as e:
+            self.show_error(e)
         finally:
-            self.update_label()
+            self.schedule_redraw()
 
     def create_square_button(self):
         button = tk.Button(self.buttons_frame, text="x²", bg="#F8FAFF",
@@ -115,11 +187,11 @@ class Calculator:
 
     def sqrt(self):
         try:
-            self.current_expression = str(eval(f"{self.current_expression}**0.5"))
-        except Exception as e:
-            self.current_expression = "Error"
+            self.current_expression = str(evaluate(f"({self.current_expression})**0.5", backend=self.backend))
+        except ExpressionError as e:
+            self.show_error(e)
         finally:
-            self.update_label()
+            self.schedule_redraw()
 
     def create_sqrt_button(self):
         button = tk.Button(self.buttons_frame, text="√", bg="#F8FAFF",
@@ -128,15 +200,22 @@ class Calculator:
         button.grid(row=0, column=3, sticky=tk.NSEW)
 
     def evaluate(self):
+        if not self.total_expression:
+            self.total_display = ""
+        self.incremental.feed(self.current_expression)
         self.total_expression += self.current_expression
-        self.update_total_label()
+        self.total_display += self.format_operators(self.current_expression)
+        self.total_message = None
         try:
-            self.current_expression = str(eval(self.total_expression))
+            result = evaluate(self.total_expression, backend=self.backend)
+            self.current_expression = str(result)
             self.total_expression = ""
-        except Exception as e:
-            self.current_expression = "Error"
+            self.incremental.reset()
+            self.sheet_changed(self.sheet.set_value("ans", result))
+        except ExpressionError as e:
+            self.show_error(e)
         finally:
-            self.update_label()
+            self.schedule_redraw()
 
     def create_equals_button(self):
         button = tk.Button(self.buttons_frame, text="=", bg="#CCEDFF",
@@ -149,17 +228,284 @@ class Calculator:
         frame.pack(expand=True, fill="both")
         return frame
 
-    def update_total_label(self):
-        expression = self.total_expression
+    def format_operators(self, text):
         for operator, symbol in self.operations.items():
-            expression = expression.replace(operator, f' {symbol} ')
-        self.total_label.config(text=expression)
+            text = text.replace(operator, f' {symbol} ')
+        return text
+
+    def schedule_redraw(self):
+        if self.redraw_job is None:
+            self.redraw_job = self.root.after(REDRAW_DELAY_MS, self.redraw)
+
+    def redraw(self):
+        self.redraw_job = None
+        self.update_total_label()
+        self.update_label()
+        self.update_preview()
+
+    def update_total_label(self):
+        text = self.total_display if self.total_message is None else self.total_message
+        self.total_label.config(text=text)
+
+    def update_preview(self):
+        text = ""
+        if self.total_expression and self.total_message is None:
+            try:
+                value = self.incremental.preview(self.current_expression)
+            except ExpressionError:
+                value = None
+            if value is not None:
+                text = f"= {value}"
+        self.preview_label.config(text=text)
 
     def update_label(self):
-        self.label.config(text=self.current_expression[:11])
+        text = self.current_expression
+        size = 40 if len(text) <= 11 else max(14, 40 * 11 // len(text))
+        self.label.config(text=text, font=("Arial", size, "bold"), wraplength=330)
+
+    def current_value(self):
+        return evaluate(self.current_expression or "0", backend=self.backend)
+
+    def memory_add(self, sign):
+        try:
+            value = self.current_value()
+            memory = self.sheet.values.get("M", 0)
+            self.sheet_changed(self.sheet.set_value("M", memory + value if sign > 0 else memory - value))
+        except ExpressionError as e:
+            self.show_error(e)
+            self.schedule_redraw()
+
+    def memory_recall(self):
+        self.current_expression = str(self.sheet.values.get("M", 0))
+        self.schedule_redraw()
+
+    def memory_clear(self):
+        self.sheet_changed(self.sheet.remove("M"))
+
+    def define(self, text):
+        changed = self.sheet.define(text)
+        self.sheet_changed(changed)
+        return changed
+
+    def remove_variable(self, name):
+        self.sheet_changed(self.sheet.remove(name))
+
+    def sheet_changed(self, names):
+        self.settings.set("definitions", self.sheet.definitions())
+        if self.sheet_window is not None:
+            self.sheet_window.refresh_rows(names)
+
+    def show_sheet(self):
+        if self.sheet_window is None:
+            self.sheet_window = SheetWindow(self)
+        else:
+            self.sheet_window.window.deiconify()
+            self.sheet_window.window.lift()
+
+    def show_graph(self):
+        if self.graph_window is not None:
+            self.graph_window.window.deiconify()
+            self.graph_window.window.lift()
+            return
+        try:
+            import calc_plot
+        except ImportError:
+            messagebox.showerror("Graph", "Graphing needs numpy to be installed.")
+            return
+        self.graph_window = GraphWindow(self, calc_plot)
+
+    def on_close(self):
+        self.settings.close()
+        self.root.destroy()
+
+class SheetWindow:
+    def __init__(self, calculator):
+        self.calculator = calculator
+        self.sheet = calculator.sheet
+        self.window = tk.Toplevel(calculator.root)
+        self.window.title("Variables")
+        self.window.geometry("480x420")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(frame, text="Define (rate = 0.07, f(x) = x * rate) or evaluate an expression:").pack(anchor=tk.W)
+        self.entry = ttk.Entry(frame)
+        self.entry.pack(fill=tk.X, pady=5)
+        self.entry.bind("<Return>", lambda event: self.submit())
+        self.message_var = tk.StringVar()
+        ttk.Label(frame, textvariable=self.message_var).pack(anchor=tk.W)
+
+        self.tree = ttk.Treeview(frame, columns=("Definition", "Value"), show="tree headings")
+        self.tree.heading("#0", text="Name")
+        self.tree.heading("Definition", text="Definition")
+        self.tree.heading("Value", text="Value")
+        self.tree.column("#0", width=80)
+        self.tree.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        ttk.Button(frame, text="Delete Selected", command=self.delete_selected).pack(anchor=tk.E)
+        self.refresh_rows(list(self.sheet.cells))
+
+    def refresh_rows(self, names):
+        self.sheet = self.calculator.sheet
+        for name in names:
+            if name in self.sheet:
+                values = (self.sheet.cells[name].text, self.sheet.display(name))
+                if self.tree.exists(name):
+                    self.tree.item(name, values=values)
+                else:
+                    self.tree.insert("", tk.END, iid=name, text=name, values=values)
+            elif self.tree.exists(name):
+                self.tree.delete(name)
+
+    def submit(self):
+        text = self.entry.get().strip()
+        if not text:
+            return
+        try:
+            if "=" in text:
+                changed = self.calculator.define(text)
+                name = text.split("=", 1)[0].split("(", 1)[0].strip()
+                self.refresh_rows([name])
+                self.message_var.set(f"{name}: {self.sheet.display(name)} ({len(changed)} updated)")
+            else:
+                self.message_var.set(f"= {self.sheet.evaluate(text)}")
+        except ExpressionError as e:
+            self.message_var.set(f"Error: {e}")
+            return
+        self.entry.delete(0, tk.END)
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self.entry.delete(0, tk.END)
+            self.entry.insert(0, self.sheet.cells[selection[0]].text)
+
+    def delete_selected(self):
+        for name in self.tree.selection():
+            self.calculator.remove_variable(name)
+
+    def close(self):
+        self.calculator.sheet_window = None
+        self.window.destroy()
+
+class GraphWindow:
+    def __init__(self, calculator, calc_plot, width=600, height=400):
+        self.calculator = calculator
+        self.calc_plot = calc_plot
+        self.plot = None
+        self.width = width
+        self.height = height
+        self.level = -20
+        self.first_column = -width // 2
+        self.y_top = height / 2 * calc_plot.level_scale(self.level)
+        self.y_scale = calc_plot.level_scale(self.level)
+        self.drag_start = None
+        self.redraw_job = None
+
+        self.window = tk.Toplevel(calculator.root)
+        self.window.title("Graph")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        entry_frame = ttk.Frame(frame)
+        entry_frame.pack(fill=tk.X)
+        ttk.Label(entry_frame, text="y =").pack(side=tk.LEFT)
+        self.entry = ttk.Entry(entry_frame)
+        self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.entry.bind("<Return>", lambda event: self.set_expression())
+        ttk.Button(entry_frame, text="Plot", command=self.set_expression).pack(side=tk.LEFT)
+        self.message_var = tk.StringVar(value="Drag to pan, scroll to zoom")
+        ttk.Label(frame, textvariable=self.message_var).pack(anchor=tk.W)
+
+        self.canvas = tk.Canvas(frame, width=width, height=height, bg="white", highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.bind("<ButtonPress-1>", self.start_drag)
+        self.canvas.bind("<B1-Motion>", self.drag)
+        self.canvas.bind("<MouseWheel>", lambda event: self.zoom(-1 if event.delta > 0 else 1, event.x, event.y))
+        self.canvas.bind("<Button-4>", lambda event: self.zoom(-1, event.x, event.y))
+        self.canvas.bind("<Button-5>", lambda event: self.zoom(1, event.x, event.y))
+        self.canvas.bind("<Configure>", self.resize)
+        self.schedule_redraw()
+
+    def set_expression(self):
+        text = self.entry.get().strip()
+        if not text:
+            return
+        try:
+            plot = self.calc_plot.Plot(text, self.calculator.sheet.values)
+        except (ExpressionError, TypeError, ValueError) as e:
+            self.message_var.set(f"Error: {e}")
+            return
+        self.plot = plot
+        low, high = plot.y_range(self.level, self.first_column, self.width)
+        self.y_scale = (high - low) / self.height
+        self.y_top = high
+        self.message_var.set("Drag to pan, scroll to zoom")
+        self.schedule_redraw()
+
+    def start_drag(self, event):
+        self.drag_start = (event.x, event.y)
+
+    def drag(self, event):
+        if self.drag_start is None:
+            return
+        dx, dy = event.x - self.drag_start[0], event.y - self.drag_start[1]
+        self.drag_start = (event.x, event.y)
+        self.first_column -= dx
+        self.y_top += dy * self.y_scale
+        self.schedule_redraw()
+
+    def zoom(self, steps, x, y):
+        x_value = (self.first_column + x) * self.calc_plot.level_scale(self.level)
+        y_value = self.y_top - y * self.y_scale
+        self.level += steps
+        factor = 2.0 ** (steps / self.calc_plot.ZOOM_STEPS)
+        self.first_column = round(x_value / self.calc_plot.level_scale(self.level) - x)
+        self.y_scale *= factor
+        self.y_top = y_value + y * self.y_scale
+        self.schedule_redraw()
+
+    def resize(self, event):
+        if (event.width, event.height) != (self.width, self.height) and event.width > 1:
+            self.width, self.height = event.width, event.height
+            self.schedule_redraw()
+
+    def schedule_redraw(self):
+        if self.redraw_job is None:
+            self.redraw_job = self.window.after(REDRAW_DELAY_MS, self.redraw)
+
+    def redraw(self):
+        self.redraw_job = None
+        self.canvas.delete("all")
+        scale = self.calc_plot.level_scale(self.level)
+        x_axis = (self.y_top - 0) / self.y_scale
+        y_axis = -self.first_column - 0.5
+        if 0 <= x_axis <= self.height:
+            self.canvas.create_line(0, x_axis, self.width, x_axis, fill="#C8C8D8")
+        if 0 <= y_axis <= self.width:
+            self.canvas.create_line(y_axis, 0, y_axis, self.height, fill="#C8C8D8")
+        self.canvas.create_text(4, self.height - 4, anchor=tk.SW, fill="#8A8BA8",
+                                text=f"x: {self.first_column * scale:.4g} .. {(self.first_column + self.width) * scale:.4g}"
+                                     f"   y: {self.y_top - self.height * self.y_scale:.4g} .. {self.y_top:.4g}")
+        if self.plot is None:
+            return
+        for line in self.plot.polylines(self.level, self.first_column, self.width,
+                                        self.y_top, self.y_scale, self.height):
+            if len(line) >= 4:
+                self.canvas.create_line(*line, fill="#25265E", width=2)
+
+    def close(self):
+        self.calculator.graph_window = None
+        self.window.destroy()
+
+def create_app(root):
+    root.geometry("375x667")
+    app = Calculator(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
+    return app
 
 if __name__ == "__main__":
     root = tk.Tk()
-    root.geometry("375x667")
-    calc = Calculator(root)
+    calc = create_app(root)
     root.mainloop()
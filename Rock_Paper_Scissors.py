@@ -1,9 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import random
-from datetime import datetime
+from collections import deque
 import json
-import os
+import struct
+import threading
+from rps_ai import load_models, make_opponents, save_models
+from rps_engine import CHOICES, RoundRecord, RoundStats, RPSEngine
+from rps_log import RoundLog, RoundLogView
+from storage import Document, StorageLocked, data_path
+
+MODELS_FILE = "rps_models.bin"
+LOG_FILE = "rps_rounds.log"
+HISTORY_SIZE = 10
+LOAD_POLL_MS = 20
 
 class RockPaperScissors:
     def __init__(self, root):
@@ -11,15 +20,25 @@ class RockPaperScissors:
         self.root.title("Rock Paper Scissors")
         self.root.geometry("800x600")
         
-        self.choices = ["Rock", "Paper", "Scissors"]
-        self.user_score = 0
-        self.computer_score = 0
-        self.rounds_played = 0
-        self.game_history = []
+        self.choices = CHOICES
+        self.settings = Document("rps_settings.json", after=self.root.after)
+        self.opponents = make_opponents()
+        opponent = self.settings.get("opponent", "Random")
+        if opponent not in self.opponents:
+            opponent = "Random"
+        self.engine = RPSEngine(self.opponents[opponent], opponent=opponent)
+        self.state = self.engine.state
+        self.game_history = deque(maxlen=HISTORY_SIZE)
+        self.round_log = RoundLog(data_path(LOG_FILE))
+        self.loading = True
+        self.load_result = None
         
         self.load_high_score()
         self.setup_gui()
-        self.load_statistics()
+        self.result_var.set("Loading statistics...")
+        self.update_statistics()
+        threading.Thread(target=self.load_statistics, daemon=True).start()
+        self.root.after(LOAD_POLL_MS, self.check_loaded)
         
     def setup_gui(self):
         style = ttk.Style()
@@ -47,6 +66,13 @@ class RockPaperScissors:
         ttk.Label(score_frame, textvariable=self.computer_score_var, style="Score.TLabel").grid(row=0, column=1, padx=20)
         ttk.Label(score_frame, textvariable=self.high_score_var, style="Score.TLabel").grid(row=0, column=2, padx=20)
         
+        ttk.Label(score_frame, text="Opponent:").grid(row=0, column=3, padx=(20, 5))
+        self.opponent_var = tk.StringVar(value=self.engine.opponent)
+        opponent_box = ttk.Combobox(score_frame, textvariable=self.opponent_var, values=list(self.opponents),
+                                    state="readonly", width=16)
+        opponent_box.grid(row=0, column=4)
+        opponent_box.bind("<<ComboboxSelected>>", self.change_opponent)
+        
     def setup_game_area(self, parent):
         game_frame = ttk.LabelFrame(parent, text="Game Area", padding="10")
         game_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=10)
@@ -59,10 +85,13 @@ class RockPaperScissors:
         
         ttk.Label(game_frame, text="Your Choice:", font=("Arial", 12)).grid(row=1, column=0, columnspan=3, pady=5)
         
+        self.choice_buttons = []
         for i, choice in enumerate(self.choices):
             btn = ttk.Button(game_frame, text=choice, style="GameButton.TButton",
                            command=lambda c=choice: self.play_round(c))
             btn.grid(row=2, column=i, padx=10, pady=10)
+            btn.state(["disabled"])
+            self.choice_buttons.append(btn)
             
         self.choice_display = ttk.Label(game_frame, text="", font=("Arial", 14))
         self.choice_display.grid(row=3, column=0, columnspan=3, pady=10)
@@ -82,132 +111,147 @@ class RockPaperScissors:
             "Rounds Played": tk.StringVar(),
             "Win Rate": tk.StringVar(),
             "Most Picked": tk.StringVar(),
-            "Best Streak": tk.StringVar()
+            "Best Streak": tk.StringVar(),
+            "Current Streak": tk.StringVar(),
+            "Vs Opponent": tk.StringVar()
         }
         
         for i, (stat, var) in enumerate(self.stats_vars.items()):
             ttk.Label(stats_frame, text=stat + ":", font=("Arial", 11)).grid(row=i//2, column=i%2*2, padx=5, pady=5, sticky=tk.E)
             ttk.Label(stats_frame, textvariable=var, font=("Arial", 11, "bold")).grid(row=i//2, column=i%2*2+1, padx=5, pady=5, sticky=tk.W)
             
+    def change_opponent(self, event=None):
+        self.engine.opponent = self.opponent_var.get()
+        self.engine.strategy = self.opponents[self.engine.opponent]
+        self.settings.set("opponent", self.engine.opponent)
+        self.update_statistics()
+        
     def play_round(self, player_choice):
-        computer_choice = random.choice(self.choices)
+        record = self.engine.play(player_choice)
+        computer_choice = CHOICES[record.computer]
+        result = record.result_name
         
         self.player_choice_var.set(player_choice)
         self.computer_choice_var.set(computer_choice)
         
         self.choice_display.config(text=f"You chose {player_choice} - Computer chose {computer_choice}")
         
-        result = self.determine_winner(player_choice, computer_choice)
+        self.show_result(result)
         self.update_scores(result)
-        self.update_history(player_choice, computer_choice, result)
+        self.update_history(record)
         self.update_statistics()
-        self.save_statistics()
-        
-    def determine_winner(self, player_choice, computer_choice):
-        if player_choice == computer_choice:
-            self.result_var.set("It's a Tie!")
-            return "Tie"
-            
-        winning_combinations = {
-            "Rock": "Scissors",
-            "Paper": "Rock",
-            "Scissors": "Paper"
-        }
+        self.round_log.append(record)
         
-        if winning_combinations[player_choice] == computer_choice:
-            self.result_var.set("You Win!")
-            return "Win"
-        else:
-            self.result_var.set("Computer Wins!")
-            return "Loss"
+    def show_result(self, result):
+        messages = {"Tie": "It's a Tie!", "Win": "You Win!", "Loss": "Computer Wins!"}
+        self.result_var.set(messages[result])
             
     def update_scores(self, result):
-        if result == "Win":
-            self.user_score += 1
-        elif result == "Loss":
-            self.computer_score += 1
-            
-        self.rounds_played += 1
-        self.user_score_var.set(f"Player: {self.user_score}")
-        self.computer_score_var.set(f"Computer: {self.computer_score}")
+        self.user_score_var.set(f"Player: {self.state.user_score}")
+        self.computer_score_var.set(f"Computer: {self.state.computer_score}")
         
-        if self.user_score > self.high_score:
-            self.high_score = self.user_score
+        if self.state.user_score > self.high_score:
+            self.high_score = self.state.user_score
             self.high_score_var.set(f"High Score: {self.high_score}")
-            self.save_high_score()
             
-    def update_history(self, player_choice, computer_choice, result):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        history_entry = f"{timestamp} - {player_choice} vs {computer_choice}: {result}\n"
-        self.game_history.append(history_entry)
-        self.history_text.insert(tk.END, history_entry)
-        self.history_text.see(tk.END)
-        
-        if len(self.game_history) > 10:
-            self.game_history.pop(0)
+    def update_history(self, record):
+        if len(self.game_history) == HISTORY_SIZE:
             self.history_text.delete("1.0", "2.0")
+        self.game_history.append(record)
+        self.history_text.insert(tk.END, record.format() + "\n")
+        self.history_text.see(tk.END)
             
     def update_statistics(self):
-        win_rate = (self.user_score / self.rounds_played * 100) if self.rounds_played > 0 else 0
+        stats = self.engine.stats
+        ties, wins, losses = stats.opponent_results(self.engine.opponent)
         
-        choice_counts = {}
-        for entry in self.game_history:
-            choice = entry.split(" - ")[1].split(" vs ")[0]
-            choice_counts[choice] = choice_counts.get(choice, 0) + 1
-            
-        most_picked = max(choice_counts.items(), key=lambda x: x[1])[0] if choice_counts else "None"
-        
-        self.stats_vars["Rounds Played"].set(str(self.rounds_played))
-        self.stats_vars["Win Rate"].set(f"{win_rate:.1f}%")
-        self.stats_vars["Most Picked"].set(most_picked)
-        self.stats_vars["Best Streak"].set(str(self.calculate_best_streak()))
-        
-    def calculate_best_streak(self):
-        current_streak = 0
-        best_streak = 0
-        
-        for entry in self.game_history:
-            result = entry.split(": ")[1].strip()
-            if result == "Win":
-                current_streak += 1
-                best_streak = max(best_streak, current_streak)
-            else:
-                current_streak = 0
-                
-        return best_streak
+        self.stats_vars["Rounds Played"].set(str(stats.rounds))
+        self.stats_vars["Win Rate"].set(f"{stats.win_rate() * 100:.1f}%")
+        self.stats_vars["Most Picked"].set(stats.most_picked() or "None")
+        self.stats_vars["Best Streak"].set(str(stats.best_streak))
+        self.stats_vars["Current Streak"].set(str(stats.current_streak))
+        self.stats_vars["Vs Opponent"].set(f"{wins}W / {losses}L / {ties}T")
         
     def load_high_score(self):
         try:
-            with open("rps_high_score.txt", "r") as file:
+            with open(data_path("rps_high_score.txt"), "r") as file:
                 self.high_score = int(file.read())
         except FileNotFoundError:
             self.high_score = 0
             
-    def save_high_score(self):
-        with open("rps_high_score.txt", "w") as file:
-            file.write(str(self.high_score))
-            
-    def load_statistics(self):
+    def load_legacy_statistics(self):
         try:
-            with open("rps_statistics.json", "r") as file:
+            with open(data_path("rps_statistics.json"), "r") as file:
                 stats = json.load(file)
-                self.rounds_played = stats.get("rounds_played", 0)
-                self.game_history = stats.get("game_history", [])
-                self.update_statistics()
-                for entry in self.game_history:
-                    self.history_text.insert(tk.END, entry)
         except FileNotFoundError:
-            pass
+            return RoundStats(), []
+        if "stats" in stats:
+            records = [RoundRecord.from_dict(record) for record in stats.get("recent", [])]
+            return RoundStats.from_dict(stats["stats"]), records
+        records = [RoundRecord.parse_legacy(entry) for entry in stats.get("game_history", [])]
+        records = [record for record in records if record is not None]
+        baseline = RoundStats()
+        for record in records:
+            baseline.record(record)
+        baseline.rounds = max(baseline.rounds, stats.get("rounds_played", 0))
+        return baseline, records
             
-    def save_statistics(self):
-        stats = {
-            "rounds_played": self.rounds_played,
-            "game_history": self.game_history
-        }
-        with open("rps_statistics.json", "w") as file:
-            json.dump(stats, file)
+    def load_statistics(self):
+        try:
+            try:
+                load_models(data_path(MODELS_FILE), self.opponents)
+            except (ValueError, struct.error):
+                pass
+            baseline, records = self.load_legacy_statistics()
+            self.round_log.open()
+            with RoundLogView(self.round_log.path) as view:
+                stats, high_score = view.aggregate()
+                records = (records + view.recent(HISTORY_SIZE))[-HISTORY_SIZE:]
+            self.round_log.start_session()
+            self.load_result = (baseline.merge(stats), high_score, records)
+        except (StorageLocked, OSError, ValueError) as e:
+            self.load_result = e
+
+    def check_loaded(self):
+        if self.load_result is None:
+            self.root.after(LOAD_POLL_MS, self.check_loaded)
+            return
+        if isinstance(self.load_result, Exception):
+            messagebox.showerror("Error", str(self.load_result))
+            self.settings.close()
+            self.root.destroy()
+            return
+        self.engine.stats, high_score, records = self.load_result
+        self.load_result = None
+        self.high_score = max(self.high_score, high_score)
+        self.high_score_var.set(f"High Score: {self.high_score}")
+        for record in records:
+            self.update_history(record)
+        self.update_statistics()
+        self.result_var.set("")
+        for button in self.choice_buttons:
+            button.state(["!disabled"])
+        self.loading = False
+
+    def on_close(self):
+        if self.loading:
+            self.settings.close()
+            self.root.destroy()
+            return
+        try:
+            save_models(data_path(MODELS_FILE), self.opponents)
+        except OSError:
+            pass
+        self.round_log.close()
+        self.settings.close()
+        self.root.destroy()
+
+def create_app(root):
+    app = RockPaperScissors(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
+    return app
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app = RockPaperScissors(root)
+    app = create_app(root)
     root.mainloop()
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calc_plot import Plot, level_scale
+
+WIDTH = 1200
+HEIGHT = 800
+EXPRESSIONS = ["x**3 - 2*x", "sin(40*x)*x + tan(x)", "sin(1/x)", "sqrt(x)*log(abs(x))"]
+
+def pan(text, frames, step, cached=True, level=-20):
+    plot = Plot(text)
+    scale = level_scale(level)
+    first_column = -WIDTH // 2
+    segments = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        first_column += step
+        if not cached:
+            plot.tiles.clear()
+        lines = plot.polylines(level, first_column, WIDTH, HEIGHT / 2 * scale, scale, HEIGHT)
+        segments = sum(len(line) // 2 - 1 for line in lines)
+    elapsed = time.perf_counter() - start
+    return frames / elapsed, plot.samples / frames, segments
+
+def zoom(text, frames):
+    plot = Plot(text)
+    start = time.perf_counter()
+    for i in range(frames):
+        level = -20 - i % 16
+        scale = level_scale(level)
+        plot.polylines(level, -WIDTH // 2, WIDTH, HEIGHT / 2 * scale, scale, HEIGHT)
+    return frames / (time.perf_counter() - start)
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    print(f"{'expression':<24} {'pan fps':>10} {'uncached':>10} {'samples/frame':>14} {'segments':>9} {'zoom fps':>9}")
+    for text in EXPRESSIONS:
+        fps, samples, segments = pan(text, frames, 8)
+        uncached, _, _ = pan(text, max(10, frames // 10), 8, cached=False)
+        print(f"{text:<24} {fps:>10,.0f} {uncached:>10,.0f} {samples:>14,.0f} {segments:>9,} {zoom(text, frames):>9,.0f}")
+
+if __name__ == "__main__":
+    main()
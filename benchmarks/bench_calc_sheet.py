@@ -0,0 +1,41 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calc_sheet import Sheet
+
+def make_sheet(size, inputs=20, seed=0):
+    rng = random.Random(seed)
+    texts = [f"in{i} = {rng.randint(1, 100)}" for i in range(inputs)]
+    texts.append("scale(x, k) = x * k + in0")
+    names = [f"in{i}" for i in range(inputs)]
+    for i in range(size):
+        a, b = rng.sample(names[-50:] if rng.random() < 0.7 else names, 2)
+        body = rng.choice([f"{a} + {b}", f"{a} * 0.5 - {b}", f"scale({a}, 1.01)", f"({a} + {b}) / 2"])
+        texts.append(f"c{i} = {body}")
+        names.append(f"c{i}")
+    return texts
+
+def main():
+    edits = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    for size in (100, 500, 2000):
+        texts = make_sheet(size)
+        sheet = Sheet()
+        start = time.perf_counter()
+        sheet.define_many(texts)
+        full = time.perf_counter() - start
+
+        rng = random.Random(1)
+        updated = 0
+        start = time.perf_counter()
+        for _ in range(edits):
+            updated += len(sheet.define(f"in{rng.randrange(1, 20)} = {rng.randint(1, 100)}"))
+        incremental = (time.perf_counter() - start) / edits
+        print(f"{size:>6} formulas: full recompute {full * 1000:>8.2f} ms, "
+              f"edit {incremental * 1000:>7.3f} ms ({updated / edits:>6.1f} cells updated/edit)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calc_engine import (compile_expression, evaluate, evaluate_array, evaluate_many, make_backend, parse, FLOAT,
+                         IncrementalEvaluator)
+
+def make_expressions(count, distinct, seed=0):
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(distinct):
+        terms = [str(rng.randint(1, 999)) for _ in range(rng.randint(2, 6))]
+        text = terms[0]
+        for term in terms[1:]:
+            text += rng.choice("+-*/") + term
+        pool.append(rng.choice([text, f"({text})**2", f"({text})**0.5", f"-({text})"]))
+    return [rng.choice(pool) for _ in range(count)]
+
+def try_compile(text, backend=FLOAT):
+    try:
+        return compile_expression(text, backend)
+    except ValueError:
+        return None
+
+def run(label, function, items):
+    start = time.perf_counter()
+    errors = 0
+    for item in items:
+        try:
+            function(item)
+        except ValueError:
+            errors += 1
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {len(items) / elapsed:>14,.0f} expr/s  ({errors} errors)")
+
+def keystroke_preview(tokens, seed=2):
+    rng = random.Random(seed)
+    keys = []
+    for _ in range(tokens // 2):
+        keys.extend(str(rng.randint(1, 9)) * rng.randint(1, 3))
+        keys.append(rng.choice("+-*/"))
+    evaluator = IncrementalEvaluator()
+    total, current = "", ""
+    incremental = full = 0.0
+    full_samples = 0
+    for i, key in enumerate(keys):
+        start = time.perf_counter()
+        if key.isdigit():
+            current += key
+        else:
+            evaluator.feed(current + key)
+            total += current + key
+            current = ""
+        try:
+            evaluator.preview(current)
+        except ValueError:
+            pass
+        incremental += time.perf_counter() - start
+        if full is not None and i % max(1, len(keys) // 200) == 0:
+            start = time.perf_counter()
+            try:
+                evaluate(total + current + ("0" if not current else ""))
+            except ValueError:
+                pass
+            except RecursionError:
+                full = None
+                continue
+            full += time.perf_counter() - start
+            full_samples += 1
+    return incremental / len(keys), None if full is None else full / full_samples
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    for tokens in (10, 100, 1000, 10000):
+        incremental, full = keystroke_preview(tokens)
+        full = "recursion limit" if full is None else f"{full * 1e6:.2f} us"
+        print(f"{'preview per keystroke':<24} {tokens:>6} tokens {incremental * 1e6:>9.2f} us "
+              f"(full re-parse {full})")
+    print()
+    cached = make_expressions(count, 1000)
+    unique = make_expressions(count // 20, count // 20, seed=1)
+    compiled = [expression for expression in map(try_compile, set(cached)) if expression is not None]
+
+    run("parse only (uncached)", parse, unique)
+    run("evaluate (LRU cache hits)", evaluate, cached)
+    run("compiled.evaluate()", lambda expression: expression.evaluate(), compiled * (count // len(compiled)))
+    run("builtin eval (baseline)", eval, cached[:count // 10])
+
+    start = time.perf_counter()
+    evaluate_many(cached)
+    print(f"{'evaluate_many':<32} {count / (time.perf_counter() - start):>14,.0f} expr/s")
+
+    print()
+    variable = [f"x*({text})+x" for text in unique]
+    for name, precision in [("float", 28), ("decimal", 28), ("decimal", 100), ("fraction", 28)]:
+        backend = make_backend(name, precision)
+        label = f"{name} (prec {precision})" if name != "float" else name
+        run(f"{label} compile+eval", lambda text: evaluate(text, backend=backend), unique)
+        x = backend.number("1.5")
+        compiled = [expression for expression in
+                    (try_compile(text, backend) for text in variable[:1000]) if expression is not None]
+        items = compiled * max(1, count // 10 // max(1, len(compiled)))
+        run(f"{label} eval x=1.5", lambda expression: expression.evaluate({"x": x}), items)
+
+    try:
+        import numpy as np
+    except ImportError:
+        print("numpy not installed; skipping vectorized mode")
+        return
+    x = np.random.default_rng(0).random(count * 10)
+    start = time.perf_counter()
+    evaluate_array("(x*2+1)**0.5/x - x**2", x=x)
+    print(f"{'evaluate_array (numpy)':<32} {len(x) / (time.perf_counter() - start):>14,.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_contact_search import contacts
+from contact_dedupe import find_duplicate_ids
+
+DUPLICATE_RATE = 0.1
+
+def reformat_phone(rng, phone):
+    digits = "".join(c for c in phone if c.isdigit())
+    return rng.choice([f"({digits[:3]}) {digits[3:6]}-{digits[6:]}", f"+1 {digits[:3]} {digits[3:]}",
+                       f"{digits[:3]}.{digits[3:6]}.{digits[6:]}", digits])
+
+def misspell(rng, name):
+    i = rng.randrange(1, len(name) - 1)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:] if rng.random() < 0.5 else name[:i] + name[i + 1:]
+
+def variant(rng, record):
+    name, phone, email, address = record
+    first, last = name.split(" ", 1)
+    name = rng.choice([name, f"{last}, {first}", f"{last} {first}", name.upper(), misspell(rng, name)])
+    phone = reformat_phone(rng, phone) if rng.random() < 0.8 else ""
+    email = email.upper() if rng.random() < 0.5 else (email if rng.random() < 0.7 else "")
+    address = address if rng.random() < 0.7 else address.replace("Street", "St")
+    return name, phone, email, address
+
+def book(size, seed=7):
+    rng = random.Random(seed)
+    records = list(contacts(int(size / (1 + DUPLICATE_RATE)), seed=seed))
+    originals = len(records)
+    truth = set()
+    while len(records) < size:
+        original = rng.randrange(originals)
+        truth.add((original, len(records)))
+        records.append(variant(rng, records[original]))
+    return records, truth
+
+def evaluate(groups, truth):
+    origin = {duplicate: original for original, duplicate in truth}
+    correct = predicted = 0
+    group_of = {}
+    for i, (ids, score) in enumerate(groups):
+        origins = [origin.get(contact_id, contact_id) for contact_id in ids]
+        correct += max(origins.count(value) for value in set(origins)) - 1
+        predicted += len(ids) - 1
+        group_of.update(dict.fromkeys(ids, i))
+    found = sum(1 for a, b in truth if a in group_of and group_of[a] == group_of.get(b))
+    return found / max(len(truth), 1), correct / max(predicted, 1)
+
+def run(records, truth, processes):
+    start = time.perf_counter()
+    groups = find_duplicate_ids(enumerate(records), processes=processes)
+    elapsed = time.perf_counter() - start
+    recall, precision = evaluate(groups, truth)
+    print(f"{len(records):>9,} contacts {processes:>2} process(es): {elapsed:>7.1f} s, "
+          f"{len(groups):>7,} groups, recall {recall:.3f}, precision {precision:.3f}")
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    processes = os.cpu_count() or 1
+    for size in sizes:
+        records, truth = book(size)
+        run(records, truth, 1)
+        if processes > 1:
+            run(records, truth, processes)
+
+if __name__ == "__main__":
+    main()
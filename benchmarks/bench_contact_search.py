@@ -0,0 +1,92 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_book import ContactManager
+from contact_search import ContactSearchIndex
+
+SYLLABLES = ["an", "ber", "cal", "da", "el", "fin", "gar", "ha", "is", "jo", "ka", "lin", "mar", "no",
+             "or", "pe", "quin", "ro", "sa", "ta", "ur", "vi", "wil", "xa", "yo", "zel"]
+FIRST_NAMES = ["John", "Jonathan", "Mary", "Maria", "Michael", "Sarah", "David", "Laura", "James", "Anna"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Wilson", "Taylor", "Clark"]
+STREETS = ["Main", "Oak", "Pine", "Maple", "Cedar", "Elm", "Lake", "Hill", "Park", "River"]
+DOMAINS = ["example.com", "mail.org", "post.net", "inbox.io"]
+QUERIES = ["Jonh Smtih", "mary johnson", "Wiliams", "marai", "smi", "cedar street", "jonathan@example",
+           "xyzzy qwerty"]
+
+def invent(rng, syllables):
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize()
+
+def popular(rng, names, skew):
+    return names[int(len(names) * rng.random() ** skew)]
+
+def contacts(count, seed=1):
+    rng = random.Random(seed)
+    first_names = FIRST_NAMES + [invent(rng, rng.randint(2, 3)) for _ in range(5000)]
+    last_names = LAST_NAMES + [invent(rng, rng.randint(2, 4)) for _ in range(50000)]
+    streets = STREETS + [invent(rng, 2) for _ in range(2000)]
+    for _ in range(count):
+        first = popular(rng, first_names, 6)
+        last = popular(rng, last_names, 4)
+        yield (f"{first} {last}", f"555-{rng.randrange(10000000):07d}",
+               f"{first.lower()}.{last.lower()}{rng.randrange(100)}@{rng.choice(DOMAINS)}",
+               f"{rng.randint(1, 999)} {popular(rng, streets, 2)} Street")
+
+def query_times(index, query, repeat, cold=False):
+    times = []
+    for _ in range(repeat):
+        if cold:
+            index.match_cache.clear()
+        start = time.perf_counter()
+        results = index.search(query)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2], times[-1], results
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    index = ContactSearchIndex()
+    records = {}
+    start = time.perf_counter()
+    for contact_id, record in enumerate(contacts(size)):
+        records[contact_id] = record
+        index.add(contact_id, record)
+    print(f"indexed {size:,} contacts in {time.perf_counter() - start:.1f} s")
+
+    print(f"{'query':<20} {'median ms':>10} {'max ms':>8} {'cold ms':>8} {'hits':>5}  best match")
+    for query in QUERIES:
+        median, worst, results = query_times(index, query, 20)
+        cold, _, _ = query_times(index, query, 5, cold=True)
+        best = records[results[0][0]][0] if results else "-"
+        print(f"{query:<20} {median * 1000:>10.2f} {worst * 1000:>8.2f} {cold * 1000:>8.2f} {len(results):>5}  {best}")
+
+    rng = random.Random(2)
+    edits = 2000
+    start = time.perf_counter()
+    for _ in range(edits):
+        contact_id = rng.randrange(size)
+        record = records[contact_id]
+        changed = (record[0] + "x",) + record[1:]
+        index.update(contact_id, record, changed)
+        records[contact_id] = changed
+    print(f"incremental update: {(time.perf_counter() - start) / edits * 1e6:.1f} us/contact")
+
+    del index, records
+    manager = ContactManager()
+    for record in contacts(20000, seed=3):
+        manager.add_contact(*record)
+    manager.add_contact("John Smith", "555-0100", "john@example.com", "1 Main Street")
+    start = time.perf_counter()
+    manager.install_search_index(ContactManager.build_search_index(manager.start_index_build()),
+                                 manager.index_pending)
+    print(f"manager background index build over 20,000 contacts: {(time.perf_counter() - start) * 1000:.1f} ms")
+    start = time.perf_counter()
+    results = manager.fuzzy_search("Jonh Smtih")
+    print(f"manager fuzzy_search: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"top: {results[0] if results else '-'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import password_engine
+from password_engine import PasswordEngine, PasswordPolicy
+from password_pipeline import provision
+
+def run(label, engine, policy, count):
+    start = time.perf_counter()
+    passwords = engine.generate_batch(count, policy)
+    elapsed = time.perf_counter() - start
+    assert all(policy.validate(password) for password in passwords[:1000])
+    print(f"{label:<36} {count / elapsed:>14,.0f} passwords/s")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    engine = PasswordEngine()
+    for length in (12, 16, 32):
+        policy = PasswordPolicy(length)
+        if password_engine.np is not None:
+            run(f"vectorized, length {length}", engine, policy, count)
+        numpy = password_engine.np
+        password_engine.np = None
+        try:
+            run(f"pure python, length {length}", engine, policy, count // 10)
+        finally:
+            password_engine.np = numpy
+
+    policy = PasswordPolicy(16)
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        with open(os.devnull, "w") as output:
+            start = time.perf_counter()
+            provision(count * 4, policy, output, workers=workers)
+            elapsed = time.perf_counter() - start
+        print(f"{f'pipeline, {workers} workers':<36} {count * 4 / elapsed:>14,.0f} passwords/s")
+        workers *= 2
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rps_engine import STRATEGIES, make_strategy, play_match, run_tournament
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    names = list(STRATEGIES)
+    pairings = len(names) * (len(names) - 1) // 2
+
+    strategies = [make_strategy(name, random.Random(i)) for i, name in enumerate(names)]
+    start = time.perf_counter()
+    for i, first in enumerate(strategies):
+        for second in strategies[i + 1:]:
+            play_match(first, second, rounds // 100)
+    elapsed = time.perf_counter() - start
+    print(f"{'scalar engine':<24} {pairings * (rounds // 100) / elapsed:>14,.0f} rounds/s")
+
+    start = time.perf_counter()
+    run_tournament([make_strategy(name) for name in names], rounds, seed=1)
+    elapsed = time.perf_counter() - start
+    print(f"{'vectorized tournament':<24} {pairings * rounds / elapsed:>14,.0f} rounds/s")
+
+if __name__ == "__main__":
+    main()
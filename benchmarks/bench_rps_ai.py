@@ -0,0 +1,60 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rps_ai import OPPONENTS
+from rps_engine import OUTCOMES, WIN, beats
+
+def human_like_moves(count, seed=7):
+    rng = random.Random(seed)
+    moves = []
+    computer = rng.randrange(3)
+    move = rng.randrange(3)
+    for _ in range(count):
+        roll = rng.random()
+        if moves and OUTCOMES[move][computer] == WIN and roll < 0.5:
+            pass
+        elif moves and roll < 0.6:
+            move = beats(computer)
+        elif len(moves) >= 2 and moves[-1] == moves[-2]:
+            move = rng.choice([m for m in range(3) if m != move])
+        elif roll < 0.8:
+            move = rng.choices(range(3), (0.45, 0.3, 0.25))[0]
+        else:
+            move = rng.randrange(3)
+        moves.append(move)
+        computer = rng.randrange(3)
+    return moves
+
+def run(name, factory, moves):
+    strategy = factory(rng=random.Random(1))
+    correct = 0
+    predicted = 0
+    wins = 0
+    start = time.perf_counter()
+    for move in moves:
+        computer = strategy.next_move()
+        prediction = getattr(strategy, "prediction", None)
+        if prediction is not None:
+            predicted += 1
+            correct += prediction == move
+        wins += OUTCOMES[computer][move] == WIN
+        strategy.observe(computer, move)
+    elapsed = time.perf_counter() - start
+    accuracy = correct / predicted if predicted else 0.0
+    print(f"{name:<20} {elapsed / len(moves) * 1e6:>8.2f} us/move {accuracy:>9.1%} accuracy "
+          f"{wins / len(moves):>9.1%} computer wins")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    for size in (count // 100, count):
+        print(f"-- {size:,} human-like moves")
+        moves = human_like_moves(size)
+        for name, factory in OPPONENTS.items():
+            run(name, factory, moves)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rps_engine import RoundRecord
+from rps_log import RoundLog, RoundLogView
+
+def records(count, seed=1):
+    rng = random.Random(seed)
+    now = time.time()
+    return [RoundRecord(rng.randrange(3), rng.randrange(3), rng.randrange(3), "Random", now + i)
+            for i in range(count)]
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        sample = records(2000)
+        path = os.path.join(directory, "stats.json")
+        history = []
+        start = time.perf_counter()
+        for record in sample:
+            history.append(record.format())
+            with open(path, "w") as file:
+                json.dump({"rounds_played": len(history), "game_history": history[-10:]}, file)
+        elapsed = time.perf_counter() - start
+        print(f"{'json rewrite per round':<28} {elapsed / len(sample) * 1e6:>10.2f} us/round")
+
+        path = os.path.join(directory, "rounds.log")
+        log = RoundLog(path).open()
+        rounds = records(count)
+        start = time.perf_counter()
+        for record in rounds:
+            log.append(record)
+        log.close()
+        elapsed = time.perf_counter() - start
+        print(f"{'binary log append':<28} {elapsed / count * 1e6:>10.2f} us/round")
+        print(f"{'log size':<28} {os.path.getsize(path) / count:>10.2f} bytes/round")
+
+        start = time.perf_counter()
+        view = RoundLogView(path)
+        print(f"{'open (mmap)':<28} {(time.perf_counter() - start) * 1000:>10.2f} ms")
+        start = time.perf_counter()
+        view.aggregate()
+        elapsed = time.perf_counter() - start
+        print(f"{'aggregate':<28} {count / elapsed:>10,.0f} rounds/s")
+        view.close()
+
+if __name__ == "__main__":
+    main()
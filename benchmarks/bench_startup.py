@@ -0,0 +1,69 @@
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from contact_storage import SQLiteContactStore
+from launcher import APPS
+from rps_engine import RoundRecord
+from rps_log import RoundLog
+from task_store import TaskStore
+
+def seed_data(directory, tasks, rounds, contacts):
+    rng = random.Random(1)
+    store = TaskStore(os.path.join(directory, "tasks.json"), compact_every=10 ** 9)
+    store.load()
+    for i in range(tasks):
+        store.add({"title": f"Task {i}", "description": "", "due_date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                   "priority": rng.choice(["High", "Medium", "Low"]), "category": "bench", "status": "Pending"})
+    store.close()
+
+    log = RoundLog(os.path.join(directory, "rps_rounds.log")).open()
+    now = time.time() - rounds
+    for i in range(rounds):
+        log.append(RoundRecord(rng.randrange(3), rng.randrange(3), rng.randrange(3), "Random", now + i))
+    log.close()
+
+    store = SQLiteContactStore(os.path.join(directory, "contacts.db"))
+    store.add_many((f"Contact {i}", f"555-{i:07d}", f"user{i}@example.com", f"{i} Main St")
+                   for i in range(contacts))
+    store.close()
+
+def run(app, directory):
+    env = dict(os.environ, CODSOFT_DATA_DIR=directory)
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, os.path.join(ROOT, "launcher.py"), "--timing", app],
+                             capture_output=True, text=True, env=env, cwd=directory, timeout=300)
+    wall = (time.perf_counter() - start) * 1000
+    if process.returncode != 0 or not process.stdout.strip():
+        lines = process.stderr.strip().splitlines() or ["no output"]
+        raise RuntimeError(f"{app}: {lines[-1]}")
+    timings = json.loads(process.stdout.strip().splitlines()[-1])
+    timings["process_ms"] = wall
+    return timings
+
+def main():
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    columns = ["first_paint_ms", "import_ms", "app_paint_ms", "interactive_ms", "process_ms"]
+    with tempfile.TemporaryDirectory() as directory:
+        seed_data(directory, tasks=scale // 10, rounds=scale * 10, contacts=scale)
+        print(f"{scale // 10} tasks, {scale * 10} rounds, {scale} contacts; median of {repeat} runs")
+        print(f"{'app':<12}" + "".join(f"{name[:-3]:>14}" for name in columns) + "   (ms)")
+        for app in APPS:
+            try:
+                runs = [run(app, directory) for _ in range(repeat)]
+            except RuntimeError as e:
+                print(e)
+                continue
+            print(f"{app:<12}" + "".join(f"{statistics.median(r[name] for r in runs):>14.1f}" for name in columns))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import SERIALIZERS, Document, atomic_write
+from task_store import TaskStore
+
+BASE_TASKS = 100
+SCALES = (1, 10, 100, 1000)
+
+def tasks(count, seed=1):
+    rng = random.Random(seed)
+    return [{"id": i + 1, "title": f"Task {i}", "description": "x" * rng.randrange(10, 80),
+             "priority": rng.choice(["Low", "Medium", "High"]), "due_date": "2024-01-01",
+             "completed": rng.random() < 0.3}
+            for i in range(count)]
+
+def timed(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'tasks':>8} " + " ".join(f"{name + ' ms':>12}" for name in SERIALIZERS) + f" {'bytes':>12}")
+        for scale in SCALES:
+            data = {"seq": 0, "tasks": tasks(BASE_TASKS * scale)}
+            repeat = max(3, 300 // scale)
+            row = []
+            size = 0
+            for name, serializer in SERIALIZERS.items():
+                path = os.path.join(directory, f"snapshot.{name}")
+                row.append(timed(lambda: atomic_write(path, serializer.dumps(data)), repeat) * 1000)
+                size = os.path.getsize(path) if name == "json" else size
+            print(f"{BASE_TASKS * scale:>8} " + " ".join(f"{value:>12.2f}" for value in row) + f" {size:>12,}")
+
+        for scale in SCALES:
+            count = BASE_TASKS * scale
+            path = os.path.join(directory, f"tasks-{count}.json")
+            store = TaskStore(path, compact_every=10 ** 9)
+            store.load()
+            for task in tasks(count):
+                del task["id"]
+                store.add(task)
+            store.compact(background=False)
+            edits = 200
+            start = time.perf_counter()
+            for i in range(edits):
+                store.update(i % count + 1, {"completed": bool(i & 1)})
+            store.sync()
+            journal = (time.perf_counter() - start) / edits
+            rewrite = timed(lambda: store.compact(background=False), 3)
+            store.close()
+            print(f"{count:>8} tasks: journal update {journal * 1e6:>9.1f} us, snapshot rewrite {rewrite * 1000:>9.2f} ms")
+
+        settings = Document("settings.json", path=os.path.join(directory, "settings.json"), flush_delay=0.05)
+        updates = 100_000
+        start = time.perf_counter()
+        for i in range(updates):
+            settings.set("sort_column", i)
+        elapsed = time.perf_counter() - start
+        settings.close()
+        print(f"document set (coalesced)  {elapsed / updates * 1e6:>9.2f} us/update")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_engine import PasswordPolicy, generate_batch
+from password_strength import COMMON_PASSWORDS, StrengthEstimator, estimate_batch
+
+def human_passwords(count):
+    rng = random.Random(1)
+    suffixes = ["", "1", "123", "!", "2024", "1990", "!!"]
+    return [rng.choice(COMMON_PASSWORDS).capitalize() + rng.choice(suffixes) + str(rng.randrange(100))
+            for _ in range(count)]
+
+def run(label, passwords, workers=1):
+    start = time.perf_counter()
+    estimate_batch(passwords, workers)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {len(passwords) / elapsed:>14,.0f} passwords/s")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.idx")
+        start = time.perf_counter()
+        StrengthEstimator(index_path=path)
+        print(f"{'index build':<36} {(time.perf_counter() - start) * 1000:>11.2f} ms")
+        start = time.perf_counter()
+        StrengthEstimator(index_path=path)
+        print(f"{'index open (mmap)':<36} {(time.perf_counter() - start) * 1000:>11.2f} ms")
+
+    run("random, length 12", generate_batch(count, PasswordPolicy(12)))
+    run("random, length 24", generate_batch(count // 2, PasswordPolicy(24)))
+    run("human-style", human_passwords(count))
+    workers = 2
+    while workers <= (os.cpu_count() or 1):
+        run(f"random, length 12, {workers} workers", generate_batch(count, PasswordPolicy(12)), workers)
+        workers *= 2
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,585 @@
+import argparse
+import decimal
+import math
+import re
+import sys
+from contextlib import nullcontext
+from fractions import Fraction
+from functools import lru_cache
+
+TOKEN_RE = re.compile(r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+                      r"|(?P<name>[A-Za-z_][A-Za-z0-9_]*)|(?P<op>\*\*|[-+*/(),]))")
+
+BINARY_POWER = {"+": 10, "-": 10, "*": 20, "/": 20, "**": 40}
+UNARY_POWER = 30
+MAX_INT_DIGITS = 4000
+MAX_INT_BITS = int(MAX_INT_DIGITS * math.log2(10))
+
+class ExpressionError(ValueError):
+    def __init__(self, message, position=None):
+        super().__init__(message)
+        self.message = message
+        self.position = position
+
+    def __str__(self):
+        if self.position is None:
+            return self.message
+        return f"{self.message} at position {self.position + 1}"
+
+def power_digits(base, exponent):
+    return abs(exponent) * math.log10(max(abs(base.numerator), base.denominator))
+
+def check_size(result):
+    if isinstance(result, (float, decimal.Decimal)):
+        finite = result.is_finite() if isinstance(result, decimal.Decimal) else math.isfinite(result)
+        if not finite:
+            raise ExpressionError("Invalid operation" if result != result else "Result too large")
+    elif isinstance(result, (int, Fraction)) and \
+            max(abs(result.numerator), result.denominator).bit_length() > MAX_INT_BITS:
+        raise ExpressionError("Result too large")
+    return result
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            start = pos + len(text[pos:]) - len(text[pos:].lstrip())
+            raise ExpressionError(f"Unexpected character {text[start]!r}", start)
+        if match.group("number"):
+            tokens.append(("number", match.group("number"), match.start("number")))
+        elif match.group("name"):
+            tokens.append(("name", match.group("name"), match.start("name")))
+        else:
+            tokens.append(("op", match.group("op"), match.start("op")))
+        pos = match.end()
+    tokens.append(("end", None, len(text)))
+    return tokens
+
+class Parser:
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.index = 0
+
+    def peek(self):
+        return self.tokens[self.index]
+
+    def advance(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def parse(self):
+        node = self.expression(0)
+        kind, value, pos = self.peek()
+        if kind != "end":
+            raise ExpressionError(f"Unexpected {value!r}", pos)
+        return node
+
+    def expression(self, right_power):
+        node = self.prefix()
+        while True:
+            kind, value, pos = self.peek()
+            if kind != "op" or value not in BINARY_POWER:
+                return node
+            power = BINARY_POWER[value]
+            if power <= right_power:
+                return node
+            self.advance()
+            right = self.expression(power - 1 if value == "**" else power)
+            node = ("binary", value, node, right, pos)
+
+    def prefix(self):
+        kind, value, pos = self.advance()
+        if kind == "number":
+            return ("literal", value)
+        if kind == "name":
+            if self.peek()[:2] == ("op", "("):
+                return self.call(value, pos)
+            return ("name", value)
+        if kind == "op" and value in ("-", "+"):
+            operand = self.expression(UNARY_POWER)
+            return ("negate", operand) if value == "-" else operand
+        if kind == "op" and value == "(":
+            node = self.expression(0)
+            kind, value, close_pos = self.advance()
+            if kind != "op" or value != ")":
+                raise ExpressionError("Missing closing parenthesis", pos)
+            return node
+        if kind == "end":
+            raise ExpressionError("Incomplete expression", pos)
+        raise ExpressionError(f"Unexpected {value!r}", pos)
+
+    def call(self, name, pos):
+        self.advance()
+        args = []
+        if self.peek()[:2] != ("op", ")"):
+            args.append(self.expression(0))
+            while self.peek()[:2] == ("op", ","):
+                self.advance()
+                args.append(self.expression(0))
+        kind, value, close_pos = self.advance()
+        if kind != "op" or value != ")":
+            raise ExpressionError("Missing closing parenthesis", pos)
+        return ("call", name, tuple(args), pos)
+
+def parse(text):
+    return Parser(text).parse()
+
+class NumericBackend:
+    name = None
+
+    def key(self):
+        return (self.name,)
+
+    def __eq__(self, other):
+        return isinstance(other, NumericBackend) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def context(self):
+        return nullcontext()
+
+    def number(self, literal):
+        raise NotImplementedError
+
+    def power(self, left, right):
+        return left ** right
+
+class FloatBackend(NumericBackend):
+    name = "float"
+
+    def number(self, literal):
+        if any(c in literal for c in ".eE"):
+            return float(literal)
+        if len(literal) > MAX_INT_DIGITS:
+            raise ExpressionError("Number too large")
+        return int(literal)
+
+    def power(self, left, right):
+        if isinstance(left, int) and isinstance(right, int) and right > 0 and abs(left) > 1 \
+                and power_digits(left, right) > MAX_INT_DIGITS:
+            left = float(left)
+        return left ** right
+
+class DecimalBackend(NumericBackend):
+    name = "decimal"
+
+    def __init__(self, precision=28):
+        self.precision = precision
+        self.decimal_context = decimal.Context(prec=precision)
+
+    def key(self):
+        return (self.name, self.precision)
+
+    def context(self):
+        return decimal.localcontext(self.decimal_context)
+
+    def number(self, literal):
+        return decimal.Decimal(literal)
+
+    def power(self, left, right):
+        if right == 0.5:
+            if left < 0:
+                raise ExpressionError("Result is not a real number")
+            return left.sqrt()
+        if left < 0 and right != right.to_integral_value():
+            raise ExpressionError("Result is not a real number")
+        return left ** right
+
+class FractionBackend(NumericBackend):
+    name = "fraction"
+
+    def __init__(self, precision=28):
+        self.precision = precision
+
+    def key(self):
+        return (self.name, self.precision)
+
+    def number(self, literal):
+        if len(literal) > MAX_INT_DIGITS or abs(decimal.Decimal(literal).adjusted()) > MAX_INT_DIGITS:
+            raise ExpressionError("Number too large")
+        return Fraction(literal)
+
+    def power(self, left, right):
+        if right.denominator == 1:
+            if left and power_digits(left, right) > MAX_INT_DIGITS:
+                raise OverflowError
+            return left ** int(right)
+        if left < 0:
+            raise ExpressionError("Result is not a real number")
+        if right == Fraction(1, 2):
+            numerator = math.isqrt(left.numerator)
+            denominator = math.isqrt(left.denominator)
+            if numerator * numerator == left.numerator and denominator * denominator == left.denominator:
+                return Fraction(numerator, denominator)
+        with decimal.localcontext(decimal.Context(prec=self.precision)):
+            base = decimal.Decimal(left.numerator) / left.denominator
+            if right == Fraction(1, 2):
+                return Fraction(base.sqrt())
+            exponent = decimal.Decimal(right.numerator) / right.denominator
+            return Fraction(base ** exponent)
+
+FLOAT = FloatBackend()
+
+def make_backend(name, precision=28):
+    if name == "decimal":
+        return DecimalBackend(precision)
+    if name == "fraction":
+        return FractionBackend(precision)
+    return FLOAT
+
+def apply_operator(operator, left, right, position=None, backend=FLOAT):
+    try:
+        if operator == "+":
+            result = left + right
+        elif operator == "-":
+            result = left - right
+        elif operator == "*":
+            result = left * right
+        elif operator == "/":
+            result = left / right
+        else:
+            result = backend.power(left, right)
+    except ZeroDivisionError:
+        raise ExpressionError("Division by zero", position) from None
+    except (OverflowError, decimal.Overflow):
+        raise ExpressionError("Result too large", position) from None
+    except decimal.InvalidOperation:
+        raise ExpressionError("Invalid operation", position) from None
+    except ExpressionError as error:
+        raise ExpressionError(error.message, position) from None
+    if isinstance(result, complex):
+        raise ExpressionError("Result is not a real number", position)
+    return result
+
+def call_function(function, args, name, position=None):
+    if not callable(function):
+        raise ExpressionError(f"{name!r} is not a function", position)
+    return function(*args)
+
+def binary_chain(node):
+    steps = []
+    while node[0] == "binary":
+        steps.append((node[1], node[3], node[4]))
+        node = node[2]
+    steps.reverse()
+    return node, steps
+
+def compile_node(node, backend=FLOAT):
+    kind = node[0]
+    if kind == "number":
+        value = node[1]
+        return lambda env: value
+    if kind == "name":
+        name = node[1]
+        return lambda env: env[name]
+    if kind == "negate":
+        operand = compile_node(node[1], backend)
+        return lambda env: -operand(env)
+    if kind == "call":
+        _, name, arg_nodes, position = node
+        args = [compile_node(arg, backend) for arg in arg_nodes]
+        return lambda env: call_function(env[name], [arg(env) for arg in args], name, position)
+    left_node, steps = binary_chain(node)
+    left = compile_node(left_node, backend)
+    steps = [(operator, compile_node(right_node, backend), position) for operator, right_node, position in steps]
+    if len(steps) > 1:
+        def chain(env):
+            value = left(env)
+            for operator, right, position in steps:
+                value = apply_operator(operator, value, right(env), position, backend)
+            return value
+        return chain
+    operator, right, position = steps[0]
+    if operator == "+":
+        return lambda env: left(env) + right(env)
+    if operator == "-":
+        return lambda env: left(env) - right(env)
+    if operator == "*":
+        return lambda env: left(env) * right(env)
+    return lambda env: apply_operator(operator, left(env), right(env), position, backend)
+
+def node_names(node):
+    names = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        kind = node[0]
+        if kind == "name":
+            names.add(node[1])
+        elif kind == "negate":
+            stack.append(node[1])
+        elif kind == "binary":
+            stack.extend(node[2:4])
+        elif kind == "call":
+            names.add(node[1])
+            stack.extend(node[2])
+    return names
+
+def fold_constants(node, backend=FLOAT):
+    kind = node[0]
+    if kind == "literal":
+        return ("number", backend.number(node[1]))
+    if kind in ("number", "name"):
+        return node
+    if kind == "negate":
+        operand = fold_constants(node[1], backend)
+        if operand[0] == "number":
+            return ("number", -operand[1])
+        return ("negate", operand)
+    if kind == "call":
+        _, name, args, position = node
+        return ("call", name, tuple(fold_constants(arg, backend) for arg in args), position)
+    left, steps = binary_chain(node)
+    left = fold_constants(left, backend)
+    for operator, right, position in steps:
+        right = fold_constants(right, backend)
+        if left[0] == "number" and right[0] == "number":
+            left = ("number", apply_operator(operator, left[1], right[1], position, backend))
+        else:
+            left = ("binary", operator, left, right, position)
+    return left
+
+def normalize(text):
+    return " ".join(text.split())
+
+class CompiledExpression:
+    def __init__(self, text, backend=FLOAT):
+        self.text = text
+        self.backend = backend
+        with backend.context():
+            self.tree = fold_constants(parse(text), backend)
+        self.names = node_names(self.tree)
+        self.function = compile_node(self.tree, backend)
+
+    def evaluate(self, variables=None):
+        try:
+            with self.backend.context():
+                result = self.function(variables or {})
+        except KeyError as error:
+            raise ExpressionError(f"Unknown variable {error.args[0]!r}") from None
+        except (OverflowError, decimal.Overflow):
+            raise ExpressionError("Result too large") from None
+        except decimal.InvalidOperation:
+            raise ExpressionError("Invalid operation") from None
+        except TypeError:
+            raise ExpressionError("Functions must be called with arguments") from None
+        except RecursionError:
+            raise ExpressionError("Expression is nested too deeply") from None
+        if isinstance(result, complex):
+            raise ExpressionError("Result is not a real number")
+        return check_size(result)
+
+@lru_cache(maxsize=4096)
+def _compile_normalized(text, backend):
+    try:
+        return CompiledExpression(text, backend)
+    except ExpressionError as error:
+        return error
+    except RecursionError:
+        return ExpressionError("Expression is nested too deeply")
+
+def compile_expression(text, backend=FLOAT):
+    compiled = _compile_normalized(normalize(text), backend)
+    if isinstance(compiled, ExpressionError):
+        raise compiled.with_traceback(None)
+    return compiled
+
+def evaluate(text, variables=None, backend=FLOAT):
+    return compile_expression(text, backend).evaluate(variables)
+
+def evaluate_many(expressions, variables=None, backend=FLOAT):
+    results = []
+    for text in expressions:
+        try:
+            results.append(evaluate(text, variables, backend))
+        except ExpressionError as error:
+            results.append(error)
+        except RecursionError:
+            results.append(ExpressionError("Expression is nested too deeply"))
+    return results
+
+class IncrementalEvaluator:
+    def __init__(self, backend=FLOAT):
+        self.backend = backend
+        self.reset()
+
+    def reset(self):
+        self.values = []
+        self.operators = []
+        self.expect_operand = True
+        self.length = 0
+        self.error = None
+
+    def copy(self):
+        clone = IncrementalEvaluator.__new__(IncrementalEvaluator)
+        clone.__dict__.update(self.__dict__)
+        clone.values = list(self.values)
+        clone.operators = list(self.operators)
+        return clone
+
+    def feed(self, text):
+        if self.error is None:
+            try:
+                with self.backend.context():
+                    for kind, value, position in tokenize(text)[:-1]:
+                        self.push(kind, value, position + self.length)
+            except ExpressionError as error:
+                self.error = error
+        self.length += len(text)
+
+    def push(self, kind, value, position):
+        if kind == "number":
+            if not self.expect_operand:
+                raise ExpressionError(f"Unexpected {value!r}", position)
+            self.values.append(self.backend.number(value))
+            self.expect_operand = False
+        elif kind == "name":
+            raise ExpressionError(f"Unknown variable {value!r}", position)
+        elif value == "(":
+            if not self.expect_operand:
+                raise ExpressionError(f"Unexpected {value!r}", position)
+            self.operators.append(("(", 0, position))
+        elif value == ")":
+            if self.expect_operand:
+                raise ExpressionError(f"Unexpected {value!r}", position)
+            self.reduce(1)
+            if not self.operators:
+                raise ExpressionError(f"Unexpected {value!r}", position)
+            self.operators.pop()
+        elif self.expect_operand:
+            if value not in ("-", "+"):
+                raise ExpressionError(f"Unexpected {value!r}", position)
+            if value == "-":
+                self.operators.append(("negate", UNARY_POWER, position))
+        else:
+            if value not in BINARY_POWER:
+                raise ExpressionError(f"Unexpected {value!r}", position)
+            power = BINARY_POWER[value]
+            self.reduce(power)
+            self.operators.append((value, power - 1 if value == "**" else power, position))
+            self.expect_operand = True
+
+    def reduce(self, power):
+        operators = self.operators
+        while operators and operators[-1][1] >= power and operators[-1][0] != "(":
+            operator, _, position = operators.pop()
+            if operator == "negate":
+                self.values.append(-self.values.pop())
+            else:
+                right = self.values.pop()
+                left = self.values.pop()
+                self.values.append(apply_operator(operator, left, right, position, self.backend))
+
+    def result(self, partial=False):
+        if self.error is not None:
+            raise self.error
+        with self.backend.context():
+            if partial:
+                while self.expect_operand and self.operators:
+                    if self.operators.pop()[0] not in ("negate", "("):
+                        self.expect_operand = False
+                if self.expect_operand:
+                    return None
+                while self.operators:
+                    self.reduce(0)
+                    if self.operators:
+                        self.operators.pop()
+            else:
+                if self.expect_operand:
+                    raise ExpressionError("Incomplete expression", self.length)
+                self.reduce(0)
+                if self.operators:
+                    raise ExpressionError("Missing closing parenthesis", self.operators[-1][2])
+        result = self.values[-1]
+        if isinstance(result, complex):
+            raise ExpressionError("Result is not a real number")
+        return check_size(result)
+
+    def preview(self, pending=""):
+        clone = self.copy()
+        clone.feed(pending)
+        return clone.result(partial=True)
+
+def evaluate_array(text, **arrays):
+    import numpy as np
+
+    compiled = compile_expression(text)
+    missing = compiled.names - set(arrays)
+    if missing:
+        raise ExpressionError(f"Unknown variable {sorted(missing)[0]!r}")
+    env = {name: np.asarray(arrays[name], dtype=np.float64) for name in compiled.names}
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        return compiled.function(env)
+
+def format_result(result):
+    if isinstance(result, ExpressionError):
+        return f"error: {result}"
+    try:
+        return str(result)
+    except ValueError as error:
+        return f"error: {error}"
+
+def read_chunks(stream, chunk_size):
+    chunk = []
+    for line in stream:
+        chunk.append(line.rstrip("\n"))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_lines(stream, output, chunk_size, backend=FLOAT):
+    for chunk in read_chunks(stream, chunk_size):
+        output.write("\n".join(format_result(result) for result in evaluate_many(chunk, backend=backend)))
+        output.write("\n")
+
+def run_vectorized(stream, output, expression, columns, chunk_size, delimiter):
+    import numpy as np
+
+    names = [name.strip() for name in columns.split(",")]
+    for chunk in read_chunks(stream, chunk_size):
+        if delimiter.strip():
+            fields = delimiter.join(chunk).split(delimiter)
+        else:
+            fields = " ".join(chunk).split()
+        try:
+            data = np.array(fields, dtype=np.float64).reshape(-1, len(names))
+        except ValueError:
+            raise ExpressionError(f"Expected {len(names)} numeric columns per line") from None
+        arrays = {name: data[:, i] for i, name in enumerate(names)}
+        result = np.broadcast_to(evaluate_array(expression, **arrays), (len(data),))
+        output.write("\n".join(map(repr, result.tolist())))
+        output.write("\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate calculator expressions in bulk.")
+    parser.add_argument("file", nargs="?", help="input file (default: stdin)")
+    parser.add_argument("--expr", help="evaluate one expression over columns of numeric input")
+    parser.add_argument("--columns", default="x", help="comma-separated variable names for --expr columns")
+    parser.add_argument("--delimiter", default=",", help="column delimiter for --expr input")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="lines per batch")
+    parser.add_argument("--backend", choices=["float", "decimal", "fraction"], default="float",
+                        help="numeric backend for line mode")
+    parser.add_argument("--precision", type=int, default=28, help="digits for decimal/fraction roots")
+    args = parser.parse_args(argv)
+
+    stream = open(args.file, "r") if args.file else sys.stdin
+    try:
+        if args.expr:
+            run_vectorized(stream, sys.stdout, args.expr, args.columns, args.chunk_size, args.delimiter)
+        else:
+            run_lines(stream, sys.stdout, args.chunk_size, make_backend(args.backend, args.precision))
+    except ExpressionError as error:
+        parser.error(str(error))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+if __name__ == "__main__":
+    main()
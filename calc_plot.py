@@ -0,0 +1,156 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from calc_engine import ExpressionError, compile_expression
+
+TILE_COLUMNS = 256
+SAMPLES_PER_COLUMN = 2
+MAX_REFINE_DEPTH = 6
+MAX_TILE_SAMPLES = TILE_COLUMNS * 64
+REFINE_TOLERANCE = 1e-3
+CACHE_TILES = 256
+ZOOM_STEPS = 4
+BUILTINS = {
+    "sin": np.sin, "cos": np.cos, "tan": np.tan, "exp": np.exp, "log": np.log,
+    "sqrt": np.sqrt, "abs": np.abs, "pi": np.pi, "e": np.e,
+}
+
+def level_scale(level):
+    return 2.0 ** (level / ZOOM_STEPS)
+
+class Tile:
+    def __init__(self, columns, first, low, high, last, breaks, break_after):
+        self.columns = columns
+        self.first = first
+        self.low = low
+        self.high = high
+        self.last = last
+        self.breaks = breaks
+        self.break_after = break_after
+
+def decimate(xs, ys, start_column, scale, columns):
+    cols = np.floor(xs / scale).astype(np.int64) - start_column
+    inside = (cols >= 0) & (cols < columns)
+    cols, ys = cols[inside], ys[inside]
+    finite = np.isfinite(ys)
+    gaps = np.cumsum(~finite)
+    cols, ys, gaps = cols[finite], ys[finite], gaps[finite]
+    empty = np.empty(0)
+    if not len(cols):
+        return Tile(np.empty(0, np.int64), empty, empty, empty, empty, np.empty(0, bool), True)
+    starts = np.flatnonzero(np.r_[True, cols[1:] != cols[:-1]])
+    ends = np.r_[starts[1:] - 1, len(cols) - 1]
+    breaks = np.r_[gaps[0] > 0, gaps[starts[1:]] != gaps[starts[1:] - 1]]
+    return Tile(cols[starts] + start_column, ys[starts], np.minimum.reduceat(ys, starts),
+                np.maximum.reduceat(ys, starts), ys[ends], breaks, bool(gaps[-1] < np.count_nonzero(~finite)))
+
+class Plot:
+    def __init__(self, text, variables=None, tile_columns=TILE_COLUMNS):
+        self.text = text
+        self.compiled = compile_expression(text)
+        variables = dict(BUILTINS, **(variables or {}))
+        unknown = sorted(self.compiled.names - {"x"} - set(variables))
+        if unknown:
+            raise ExpressionError(f"Unknown variable {unknown[0]!r}")
+        self.env = {}
+        for name in self.compiled.names - {"x"}:
+            value = variables[name]
+            self.env[name] = value if callable(value) else float(value)
+        self.tile_columns = tile_columns
+        self.tiles = OrderedDict()
+        self.samples = 0
+        self.error = None
+
+    def evaluate(self, xs):
+        self.samples += len(xs)
+        try:
+            with np.errstate(all="ignore"):
+                ys = self.compiled.function(dict(self.env, x=xs))
+            return np.broadcast_to(np.asarray(ys, dtype=np.float64), xs.shape)
+        except (ExpressionError, TypeError, ValueError) as error:
+            self.error = error
+            return np.full(xs.shape, np.nan)
+
+    def refine(self, xs, ys, min_width):
+        for _ in range(MAX_REFINE_DEPTH):
+            finite = np.isfinite(ys)
+            if np.count_nonzero(finite) > 2:
+                low, high = np.percentile(ys[finite], [2, 98])
+                tolerance = max(high - low, 1e-12) * REFINE_TOLERANCE
+            else:
+                tolerance = np.inf
+            bend = np.abs(ys[:-2] - 2 * ys[1:-1] + ys[2:]) > tolerance
+            flagged = finite[:-1] != finite[1:]
+            flagged[:-1] |= bend
+            flagged[1:] |= bend
+            flagged &= np.diff(xs) > min_width
+            count = np.count_nonzero(flagged)
+            if not count or len(xs) + count > MAX_TILE_SAMPLES:
+                break
+            positions = np.flatnonzero(flagged)
+            mids = (xs[positions] + xs[positions + 1]) / 2
+            xs = np.insert(xs, positions + 1, mids)
+            ys = np.insert(ys, positions + 1, self.evaluate(mids))
+        return xs, ys
+
+    def tile(self, level, index):
+        key = (level, index)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            return tile
+        scale = level_scale(level)
+        start = index * self.tile_columns
+        steps = self.tile_columns * SAMPLES_PER_COLUMN
+        xs = (start + np.arange(steps + 1) / SAMPLES_PER_COLUMN) * scale
+        xs, ys = self.refine(xs, self.evaluate(xs), scale / SAMPLES_PER_COLUMN / 2 ** MAX_REFINE_DEPTH)
+        tile = decimate(xs, ys, start, scale, self.tile_columns)
+        self.tiles[key] = tile
+        if len(self.tiles) > CACHE_TILES:
+            self.tiles.popitem(last=False)
+        return tile
+
+    def columns(self, level, first_column, width):
+        size = self.tile_columns
+        tiles = [self.tile(level, index)
+                 for index in range(first_column // size, (first_column + width - 1) // size + 1)]
+        breaks = []
+        previous_gap = False
+        for tile in tiles:
+            tile_breaks = tile.breaks.copy()
+            if len(tile_breaks) and previous_gap:
+                tile_breaks[0] = True
+            breaks.append(tile_breaks)
+            previous_gap = tile.break_after if len(tile.columns) else True
+        fields = [np.concatenate([getattr(tile, name) for tile in tiles])
+                  for name in ("columns", "first", "low", "high", "last")]
+        visible = (fields[0] >= first_column) & (fields[0] < first_column + width)
+        return [field[visible] for field in fields] + [np.concatenate(breaks)[visible]]
+
+    def y_range(self, level, first_column, width):
+        columns, first, low, high, last, breaks = self.columns(level, first_column, width)
+        if not len(columns):
+            return -1.0, 1.0
+        low, high = np.percentile(np.r_[low, high], [5, 95])
+        if high - low < 1e-9:
+            low, high = low - 1, high + 1
+        margin = (high - low) * 0.1
+        return low - margin, high + margin
+
+    def polylines(self, level, first_column, width, y_top, y_scale, height):
+        columns, first, low, high, last, breaks = self.columns(level, first_column, width)
+        if not len(columns):
+            return []
+        px = np.repeat(columns - first_column + 0.5, 4)
+        py = (y_top - np.column_stack((first, low, high, last)).ravel()) / y_scale
+        py = np.clip(py, -height, 2 * height)
+        entry, leave = py[0::4], py[3::4]
+        jumps = ((leave[:-1] < 0) & (entry[1:] > height)) | ((leave[:-1] > height) & (entry[1:] < 0))
+        split = np.flatnonzero(breaks | np.r_[False, jumps]) * 4
+        points = np.column_stack((px, py)).ravel()
+        lines = []
+        for start, stop in zip(np.r_[0, split], np.r_[split, len(px)]):
+            if stop > start:
+                lines.append(points[start * 2:stop * 2].tolist())
+        return lines
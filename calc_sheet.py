@@ -0,0 +1,187 @@
+import re
+from collections import ChainMap, defaultdict, deque
+
+from calc_engine import FLOAT, ExpressionError, compile_expression
+
+NAME = r"[A-Za-z_][A-Za-z0-9_]*"
+DEFINITION_RE = re.compile(rf"\s*({NAME})\s*(?:\(\s*((?:{NAME}\s*(?:,\s*{NAME}\s*)*)?)\))?\s*=(.*)$", re.S)
+MISSING = object()
+
+def parse_definition(text):
+    match = DEFINITION_RE.match(text)
+    if not match:
+        return None
+    name, params, body = match.groups()
+    if params is not None:
+        params = tuple(param.strip() for param in params.split(",") if param.strip())
+        if len(set(params)) != len(params):
+            raise ExpressionError(f"Duplicate parameter in {name}()")
+    if not body.strip():
+        raise ExpressionError("Incomplete expression", len(text))
+    return name, params, body.strip()
+
+class Cell:
+    def __init__(self, name, params, body, backend=FLOAT):
+        self.name = name
+        self.params = params
+        self.body = body
+        self.compiled = compile_expression(body, backend)
+        self.references = self.compiled.names - set(params or ())
+
+    @property
+    def text(self):
+        if self.params is None:
+            return f"{self.name} = {self.body}"
+        return f"{self.name}({', '.join(self.params)}) = {self.body}"
+
+class Sheet:
+    def __init__(self, backend=FLOAT):
+        self.backend = backend
+        self.cells = {}
+        self.dependents = defaultdict(set)
+        self.values = {}
+        self.errors = {}
+
+    def __contains__(self, name):
+        return name in self.cells
+
+    def define(self, text):
+        definition = parse_definition(text)
+        if definition is None:
+            raise ExpressionError("Expected a definition such as 'rate = 0.07' or 'f(x) = x * rate'")
+        return self.set_cell(Cell(*definition, backend=self.backend))
+
+    def define_many(self, texts):
+        names = []
+        for text in texts:
+            definition = parse_definition(text)
+            if definition is None:
+                raise ExpressionError(f"Not a definition: {text!r}")
+            cell = Cell(*definition, backend=self.backend)
+            self.link(cell)
+            names.append(cell.name)
+        return self.recompute(names)
+
+    def set_value(self, name, value):
+        return self.set_cell(Cell(name, None, str(value), self.backend))
+
+    def set_cell(self, cell):
+        self.link(cell)
+        return self.recompute([cell.name])
+
+    def link(self, cell):
+        self.unlink(cell.name)
+        self.cells[cell.name] = cell
+        for reference in cell.references:
+            self.dependents[reference].add(cell.name)
+
+    def unlink(self, name):
+        cell = self.cells.pop(name, None)
+        if cell is not None:
+            for reference in cell.references:
+                self.dependents[reference].discard(name)
+
+    def remove(self, name):
+        if name not in self.cells:
+            return []
+        self.unlink(name)
+        self.values.pop(name, None)
+        self.errors.pop(name, None)
+        return [name] + self.recompute([name])
+
+    def set_backend(self, backend):
+        texts = self.definitions()
+        self.backend = backend
+        self.cells = {}
+        self.dependents = defaultdict(set)
+        self.values = {}
+        self.errors = {}
+        return self.define_many(texts)
+
+    def definitions(self):
+        return [cell.text for cell in self.cells.values()]
+
+    def affected(self, roots):
+        seen = set()
+        queue = deque(roots)
+        while queue:
+            name = queue.popleft()
+            if name not in seen:
+                seen.add(name)
+                queue.extend(self.dependents.get(name, ()))
+        return seen
+
+    def recompute(self, roots):
+        roots = set(roots)
+        affected = self.affected(roots)
+        pending = {}
+        for name in affected:
+            cell = self.cells.get(name)
+            pending[name] = len(cell.references & affected) if cell is not None else 0
+        ready = deque(name for name, count in pending.items() if count == 0)
+        changed = set()
+        updated = []
+        while ready:
+            name = ready.popleft()
+            cell = self.cells.get(name)
+            if name in roots or (cell is not None and not cell.references.isdisjoint(changed)):
+                if cell is None or self.update(cell):
+                    changed.add(name)
+                    if cell is not None:
+                        updated.append(name)
+            for dependent in self.dependents.get(name, ()):
+                if dependent in pending:
+                    pending[dependent] -= 1
+                    if pending[dependent] == 0:
+                        ready.append(dependent)
+        for name, count in pending.items():
+            if count and self.set_error(name, ExpressionError("Circular reference")):
+                updated.append(name)
+        return updated
+
+    def update(self, cell):
+        try:
+            for reference in cell.references:
+                if reference in self.errors:
+                    raise ExpressionError(f"{reference!r} has an error")
+            if cell.params is None:
+                value = cell.compiled.evaluate(self.values)
+            else:
+                value = self.make_function(cell)
+        except ExpressionError as error:
+            return self.set_error(cell.name, error)
+        had_error = self.errors.pop(cell.name, None) is not None
+        old = self.values.get(cell.name, MISSING)
+        self.values[cell.name] = value
+        return had_error or cell.params is not None or type(old) is not type(value) or old != value
+
+    def set_error(self, name, error):
+        self.values.pop(name, None)
+        old = self.errors.get(name)
+        self.errors[name] = error
+        return old is None or str(old) != str(error)
+
+    def make_function(self, cell):
+        compiled, params, values = cell.compiled, cell.params, self.values
+
+        def function(*args):
+            if len(args) != len(params):
+                raise ExpressionError(f"{cell.name}() takes {len(params)} argument(s), got {len(args)}")
+            return compiled.evaluate(ChainMap(dict(zip(params, args)), values))
+
+        return function
+
+    def value(self, name):
+        if name in self.errors:
+            raise self.errors[name]
+        return self.values[name]
+
+    def evaluate(self, text):
+        return compile_expression(text, self.backend).evaluate(self.values)
+
+    def display(self, name):
+        if name in self.errors:
+            return f"Error: {self.errors[name]}"
+        if self.cells[name].params is not None:
+            return "function"
+        return str(self.values.get(name, ""))
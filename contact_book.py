@@ -1,60 +1,313 @@
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
+import bisect
+from contact_storage import MemoryContactStore, SQLiteContactStore, import_contacts, export_contacts
+from contact_search import ContactSearchIndex
+from contact_dedupe import DuplicateGroup, find_duplicate_ids
+from storage import Document, data_path
+import os
+import threading
+
+DEDUPE_POLL_MS = 50
+INDEX_POLL_MS = 50
+PARALLEL_CONTACTS = 200000
+GROUP_CHUNK = 200
 
 class Contact:
-    def __init__(self, name, phone, email, address):
+    def __init__(self, name, phone, email, address, contact_id=None):
         self.name = name
         self.phone = phone
         self.email = email
         self.address = address
+        self.contact_id = contact_id
+
+    def record(self):
+        return (self.name, self.phone, self.email, self.address)
 
     def __str__(self):
         return f"{self.name} | {self.phone} | {self.email} | {self.address}"
 
 class ContactManager:
-    def __init__(self):
-        self.contacts = []
+    def __init__(self, storage=None):
+        self.storage = storage if storage is not None else MemoryContactStore()
+        self.listeners = []
+        self.search_index = None
+        self.index_pending = None
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def _notify(self, event, contact_id=None):
+        for callback in self.listeners:
+            callback(event, contact_id)
+
+    @property
+    def contacts(self):
+        return [self._to_contact(contact_id, record) for contact_id, record in self.storage.iter_all()]
+
+    @staticmethod
+    def _to_contact(contact_id, record):
+        return Contact(*record, contact_id=contact_id)
+
+    def _index(self, method, *args):
+        if self.search_index is not None:
+            getattr(self.search_index, method)(*args)
+        elif self.index_pending is not None:
+            self.index_pending.append((method, args))
+
+    def start_index_build(self):
+        self.search_index = None
+        self.index_pending = []
+        return self.storage.snapshot()
+
+    @staticmethod
+    def build_search_index(items):
+        index = ContactSearchIndex()
+        index.add_many(items)
+        return index
+
+    def install_search_index(self, index, pending):
+        if pending is not self.index_pending:
+            return False
+        for method, args in pending:
+            getattr(index, method)(*args)
+        self.search_index = index
+        self.index_pending = None
+        return True
 
     def add_contact(self, name, phone, email, address):
-        new_contact = Contact(name, phone, email, address)
-        self.contacts.append(new_contact)
+        contact_id = self.storage.add((name, phone, email, address))
+        self._index("add", contact_id, (name, phone, email, address))
+        self._notify("add", contact_id)
+        return Contact(name, phone, email, address, contact_id=contact_id)
 
     def view_contacts(self):
         return [str(contact) for contact in self.contacts]
 
+    def contact_ids(self):
+        return self.storage.ids()
+
+    def get_contact(self, contact_id):
+        record = self.storage.get(contact_id)
+        return self._to_contact(contact_id, record) if record is not None else None
+
     def search_contact(self, query):
-        results = [contact for contact in self.contacts if query.lower() in contact.name.lower() or query in contact.phone]
-        return results
+        return [self._to_contact(contact_id, record) for contact_id, record in self.storage.search(query)]
+
+    def fuzzy_search(self, query, limit=20):
+        if self.search_index is None:
+            if self.index_pending is not None:
+                return []
+            self.search_index = self.build_search_index(self.storage.iter_all())
+        return [self.get_contact(contact_id) for contact_id, score in self.search_index.search(query, limit)]
+
+    def search_prefix(self, prefix, limit=None):
+        return [self._to_contact(contact_id, record)
+                for contact_id, record in self.storage.search_prefix(prefix, limit)]
 
     def update_contact(self, name, new_name=None, new_phone=None, new_email=None, new_address=None):
-        for contact in self.contacts:
-            if contact.name == name:
-                if new_name:
-                    contact.name = new_name
-                if new_phone:
-                    contact.phone = new_phone
-                if new_email:
-                    contact.email = new_email
-                if new_address:
-                    contact.address = new_address
-                return True
-        return False
+        contact_id = self.storage.find_by_name(name)
+        if contact_id is None:
+            return False
+        contact = self._to_contact(contact_id, self.storage.get(contact_id))
+        old_record = contact.record()
+        if new_name:
+            contact.name = new_name
+        if new_phone:
+            contact.phone = new_phone
+        if new_email:
+            contact.email = new_email
+        if new_address:
+            contact.address = new_address
+        self.storage.update(contact_id, contact.record())
+        self._index("update", contact_id, old_record, contact.record())
+        self._notify("update", contact_id)
+        return True
 
     def delete_contact(self, name):
-        for i, contact in enumerate(self.contacts):
-            if contact.name == name:
-                del self.contacts[i]
-                return True
-        return False
+        contact_id = self.storage.find_by_name(name)
+        if contact_id is None:
+            return False
+        self._index("remove", contact_id, self.storage.get(contact_id))
+        self.storage.delete(contact_id)
+        self._notify("delete", contact_id)
+        return True
+
+    def find_duplicates(self, processes=1):
+        return self.duplicate_groups(find_duplicate_ids(self.storage.iter_all(), processes=processes))
+
+    def duplicate_groups(self, found):
+        groups = []
+        for ids, score in found:
+            contacts = [(contact_id, self.storage.get(contact_id)) for contact_id in ids]
+            if all(record is not None for contact_id, record in contacts):
+                groups.append(DuplicateGroup([(contact_id, tuple(record)) for contact_id, record in contacts],
+                                             score))
+        return groups
+
+    def merge_duplicates(self, groups):
+        updates = []
+        duplicate_ids = []
+        for group in groups:
+            if any(self.storage.get(contact_id) != record for contact_id, record in group.contacts):
+                continue
+            updates.append((group.primary_id, group.merged))
+            duplicate_ids.extend(group.duplicate_ids)
+            self._index("update", group.primary_id, group.contacts[0][1], group.merged)
+            for contact_id, record in group.contacts[1:]:
+                self._index("remove", contact_id, record)
+        if updates:
+            self.storage.update_many(updates)
+            self.storage.delete_many(duplicate_ids)
+            self._notify("reload")
+        return len(duplicate_ids)
+
+    def import_contacts(self, path):
+        count = import_contacts(self.storage, path)
+        self.search_index = None
+        self.index_pending = None
+        self._notify("reload")
+        return count
+
+    def export_contacts(self, path):
+        return export_contacts(self.storage, path)
+
+class VirtualListbox:
+    def __init__(self, parent, row_text, width=50, height=15, overscan=15):
+        self.row_text = row_text
+        self.height = height
+        self.overscan = overscan
+        self.rows = []
+        self.top = 0
+        self.window_start = 0
+        self.window_end = 0
+
+        self.frame = tk.Frame(parent)
+        self.listbox = tk.Listbox(self.frame, width=width, height=height,
+                                  yscrollcommand=self.on_listbox_scroll)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = tk.Scrollbar(self.frame, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.listbox.bind("<MouseWheel>", lambda event: self.scroll_by(-3 if event.delta > 0 else 3))
+        self.listbox.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        self.listbox.bind("<Button-5>", lambda event: self.scroll_by(3))
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self.top = 0
+        self.render()
+
+    def selected_row(self):
+        selection = self.listbox.curselection()
+        if not selection:
+            return None
+        return self.rows[self.window_start + selection[0]]
+
+    def render(self):
+        self.window_start = max(0, self.top - self.overscan)
+        self.window_end = min(len(self.rows), self.top + self.height + self.overscan)
+        self.listbox.delete(0, tk.END)
+        texts = [self.row_text(row) for row in self.rows[self.window_start:self.window_end]]
+        if texts:
+            self.listbox.insert(tk.END, *texts)
+        self.listbox.yview(self.top - self.window_start)
+        self.update_scrollbar()
+
+    def update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.top / total, (self.top + self.height) / total)
+
+    def scroll_to(self, top):
+        top = max(0, min(top, len(self.rows) - self.height))
+        self.top = top
+        if self.window_start <= top and top + self.height <= self.window_end:
+            self.listbox.yview(top - self.window_start)
+            self.update_scrollbar()
+        else:
+            self.render()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.top + rows)
+        return "break"
+
+    def on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.scroll_by(amount * self.height if args[2] == "pages" else amount)
+
+    def on_listbox_scroll(self, first, last):
+        top = self.window_start + self.listbox.nearest(0)
+        if top != self.top:
+            self.top = top
+            self.update_scrollbar()
+            near_start = self.window_start > 0 and top <= self.window_start
+            near_end = self.window_end < len(self.rows) and top + self.height >= self.window_end
+            if near_start or near_end:
+                self.listbox.after_idle(self.render)
+
+    def insert_row(self, index, row):
+        self.rows.insert(index, row)
+        if index < self.window_start:
+            self.window_start += 1
+            self.window_end += 1
+            self.top += 1
+        elif index <= self.window_end:
+            self.listbox.insert(index - self.window_start, self.row_text(row))
+            self.window_end += 1
+            if self.window_end - self.window_start > self.height + 2 * self.overscan:
+                self.listbox.delete(tk.END)
+                self.window_end -= 1
+        self.update_scrollbar()
+
+    def delete_row(self, index):
+        del self.rows[index]
+        if index < self.window_start:
+            self.window_start -= 1
+            self.window_end -= 1
+            self.top -= 1
+        elif index < self.window_end:
+            self.listbox.delete(index - self.window_start)
+            self.window_end -= 1
+            if self.window_end < len(self.rows):
+                self.listbox.insert(tk.END, self.row_text(self.rows[self.window_end]))
+                self.window_end += 1
+        if self.top > max(0, len(self.rows) - self.height):
+            self.scroll_to(self.top)
+        self.update_scrollbar()
+
+    def update_row(self, index):
+        if self.window_start <= index < self.window_end:
+            position = index - self.window_start
+            selected = position in self.listbox.curselection()
+            self.listbox.delete(position)
+            self.listbox.insert(position, self.row_text(self.rows[index]))
+            if selected:
+                self.listbox.selection_set(position)
 
 class ContactApp:
-    def __init__(self, root):
-        self.manager = ContactManager()
+    def __init__(self, root, storage=None):
+        self.manager = ContactManager(storage)
         self.root = root
+        self.settings = Document("contact_settings.json", after=root.after)
         self.root.title("Contact Management System")
 
-        self.listbox = tk.Listbox(root, width=50)
+        self.listbox = VirtualListbox(root, self.row_text, width=50)
         self.listbox.pack(pady=10)
+        self.manager.add_listener(self.on_contacts_changed)
+        self.showing_search = False
+        self.search_positions = {}
+        self.removed_positions = []
+        self.dedupe_result = None
+        self.duplicate_window = None
 
         btn_frame = tk.Frame(root)
         btn_frame.pack(pady=10)
@@ -64,6 +317,37 @@ class ContactApp:
         tk.Button(btn_frame, text="Search Contact", command=self.search_contact).grid(row=0, column=2)
         tk.Button(btn_frame, text="Update Contact", command=self.update_contact).grid(row=0, column=3)
         tk.Button(btn_frame, text="Delete Contact", command=self.delete_contact).grid(row=0, column=4)
+        tk.Button(btn_frame, text="Import", command=self.import_contacts).grid(row=1, column=0)
+        tk.Button(btn_frame, text="Export", command=self.export_contacts).grid(row=1, column=1)
+        self.dedupe_button = tk.Button(btn_frame, text="Find Duplicates", command=self.find_duplicates)
+        self.dedupe_button.grid(row=1, column=2)
+
+        self.view_contacts()
+        self.load_search_index()
+
+    def load_search_index(self):
+        items = self.manager.start_index_build()
+        pending = self.manager.index_pending
+        result = []
+        threading.Thread(target=self.build_search_index, args=(items, result), daemon=True).start()
+        self.root.after(INDEX_POLL_MS, self.check_search_index, pending, result)
+
+    def build_search_index(self, items, result):
+        try:
+            result.append(ContactManager.build_search_index(items))
+        except Exception as e:
+            result.append(e)
+
+    def check_search_index(self, pending, result):
+        if not result:
+            self.root.after(INDEX_POLL_MS, self.check_search_index, pending, result)
+            return
+        if isinstance(result[0], Exception):
+            if pending is self.manager.index_pending:
+                self.manager.index_pending = None
+            messagebox.showerror("Error", f"Could not build the search index: {result[0]}")
+            return
+        self.manager.install_search_index(result[0], pending)
 
     def add_contact(self):
         name = simpledialog.askstring("Input", "Enter Name:")
@@ -74,27 +358,64 @@ class ContactApp:
         if name and phone and email and address:
             self.manager.add_contact(name, phone, email, address)
             messagebox.showinfo("Success", f"Contact '{name}' added successfully.")
-            self.view_contacts()
     
     def view_contacts(self):
-        self.listbox.delete(0, tk.END)
-        contacts = self.manager.view_contacts()
-        
-        for contact in contacts:
-            self.listbox.insert(tk.END, contact)
+        self.showing_search = False
+        self.search_positions = {}
+        self.removed_positions = []
+        self.listbox.set_rows(self.manager.contact_ids())
+
+    def show_search_results(self, contact_ids):
+        self.showing_search = True
+        self.search_positions = {contact_id: i for i, contact_id in enumerate(contact_ids)}
+        self.removed_positions = []
+        self.listbox.set_rows(contact_ids)
+
+    def search_row(self, contact_id, remove=False):
+        position = self.search_positions.pop(contact_id, None) if remove else self.search_positions.get(contact_id)
+        if position is None:
+            return None
+        index = position - bisect.bisect_left(self.removed_positions, position)
+        if remove:
+            bisect.insort(self.removed_positions, position)
+        return index
+
+    def row_text(self, contact_id):
+        return str(self.manager.get_contact(contact_id))
+
+    def on_contacts_changed(self, event, contact_id):
+        rows = self.listbox.rows
+        if event == "reload":
+            self.view_contacts()
+            return
+        if self.showing_search:
+            index = self.search_row(contact_id, remove=event == "delete")
+            present = index is not None
+        else:
+            index = bisect.bisect_left(rows, contact_id)
+            present = index < len(rows) and rows[index] == contact_id
+        if event == "add" and not self.showing_search:
+            self.listbox.insert_row(index, contact_id)
+        elif event == "update" and present:
+            self.listbox.update_row(index)
+        elif event == "delete" and present:
+            self.listbox.delete_row(index)
 
     def search_contact(self):
-        query = simpledialog.askstring("Input", "Enter Name or Phone Number to Search:")
+        query = simpledialog.askstring("Input", "Enter Name, Email, Address or Phone Number to Search:")
         
         if query:
-            results = self.manager.search_contact(query)
-            self.listbox.delete(0, tk.END)
+            indexing = self.manager.index_pending is not None
+            results = [] if indexing else self.manager.fuzzy_search(query)
+            found = {contact.contact_id for contact in results}
+            results += [contact for contact in self.manager.search_contact(query) if contact.contact_id not in found]
+            self.show_search_results([contact.contact_id for contact in results])
             
-            for contact in results:
-                self.listbox.insert(tk.END, str(contact))
-                
             if not results:
-                messagebox.showinfo("Search Result", "No contacts found.")
+                message = "No contacts found."
+                if indexing:
+                    message += " Typo-tolerant search is still indexing; try again shortly."
+                messagebox.showinfo("Search Result", message)
 
     def update_contact(self):
         name = simpledialog.askstring("Input", "Enter the Name of the Contact to Update:")
@@ -113,7 +434,6 @@ class ContactApp:
 
             if updated:
                 messagebox.showinfo("Success", f"Contact '{name}' updated successfully.")
-                self.view_contacts()
             else:
                 messagebox.showwarning("Update Failed", f"Contact '{name}' not found.")
 
@@ -125,11 +445,149 @@ class ContactApp:
             
             if deleted:
                 messagebox.showinfo("Success", f"Contact '{name}' deleted successfully.")
-                self.view_contacts()
             else:
                 messagebox.showwarning("Delete Failed", f"Contact '{name}' not found.")
 
+    def import_contacts(self):
+        path = filedialog.askopenfilename(filetypes=[("Contacts", "*.csv *.vcf"), ("All Files", "*.*")],
+                                          initialdir=self.settings.get("last_directory"))
+
+        if path:
+            self.settings.set("last_directory", os.path.dirname(path))
+            count = self.manager.import_contacts(path)
+            self.load_search_index()
+            messagebox.showinfo("Success", f"Imported {count} contacts.")
+
+    def export_contacts(self):
+        path = filedialog.asksaveasfilename(defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv"), ("vCard", "*.vcf")],
+                                            initialdir=self.settings.get("last_directory"))
+
+        if path:
+            self.settings.set("last_directory", os.path.dirname(path))
+            count = self.manager.export_contacts(path)
+            messagebox.showinfo("Success", f"Exported {count} contacts.")
+
+    def find_duplicates(self):
+        self.dedupe_button.config(state=tk.DISABLED, text="Finding Duplicates...")
+        self.dedupe_result = None
+        threading.Thread(target=self.detect_duplicates, args=(self.manager.storage.snapshot(),),
+                         daemon=True).start()
+        self.root.after(DEDUPE_POLL_MS, self.check_duplicates)
+
+    def detect_duplicates(self, items):
+        try:
+            items = list(items)
+            processes = (os.cpu_count() or 1) if len(items) >= PARALLEL_CONTACTS else 1
+            self.dedupe_result = find_duplicate_ids(items, processes=processes)
+        except Exception as e:
+            self.dedupe_result = e
+
+    def check_duplicates(self):
+        if self.dedupe_result is None:
+            self.root.after(DEDUPE_POLL_MS, self.check_duplicates)
+            return
+        result, self.dedupe_result = self.dedupe_result, None
+        self.dedupe_button.config(state=tk.NORMAL, text="Find Duplicates")
+        if isinstance(result, Exception):
+            messagebox.showerror("Error", str(result))
+            return
+        groups = self.manager.duplicate_groups(result)
+        if not groups:
+            messagebox.showinfo("Duplicates", "No duplicate contacts found.")
+            return
+        if self.duplicate_window is not None:
+            self.duplicate_window.close()
+        self.duplicate_window = DuplicateWindow(self, groups)
+
+    def on_close(self):
+        self.settings.close()
+        self.manager.storage.close()
+        self.root.destroy()
+
+class DuplicateWindow:
+    def __init__(self, app, groups):
+        self.app = app
+        self.groups = dict(enumerate(groups))
+        self.window = tk.Toplevel(app.root)
+        self.window.title("Duplicate Contacts")
+        self.window.geometry("760x420")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.message_var = tk.StringVar()
+        ttk.Label(frame, textvariable=self.message_var).pack(anchor=tk.W)
+        self.tree = ttk.Treeview(frame, columns=("Phone", "Email", "Address"), show="tree headings")
+        self.tree.heading("#0", text="Name")
+        for column in ("Phone", "Email", "Address"):
+            self.tree.heading(column, text=column)
+        self.tree.column("#0", width=200)
+        self.tree.pack(fill=tk.BOTH, expand=True, pady=5)
+
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(anchor=tk.E)
+        ttk.Button(button_frame, text="Merge Selected", command=self.merge_selected).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Merge All", command=self.merge_all).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=self.close).pack(side=tk.LEFT, padx=5)
+        self.update_message()
+        self.populate(list(self.groups), 0)
+
+    def update_message(self):
+        self.message_var.set(f"{len(self.groups)} duplicate groups. Each top row previews the merged contact; "
+                             "expand it to see the contacts it replaces.")
+
+    def populate(self, keys, start):
+        if not self.window.winfo_exists():
+            return
+        for key in keys[start:start + GROUP_CHUNK]:
+            group = self.groups[key]
+            name, phone, email, address = group.merged
+            parent = self.tree.insert("", tk.END, iid=f"g{key}", text=f"{name} (merge {len(group.contacts)})",
+                                      values=(phone, email, address))
+            for contact_id, (name, phone, email, address) in group.contacts:
+                self.tree.insert(parent, tk.END, iid=f"g{key}:{contact_id}", text=name,
+                                 values=(phone, email, address))
+        if start + GROUP_CHUNK < len(keys):
+            self.window.after(1, self.populate, keys, start + GROUP_CHUNK)
+
+    def selected_keys(self):
+        return sorted({int(iid[1:].split(":")[0]) for iid in self.tree.selection()})
+
+    def merge_selected(self):
+        keys = [key for key in self.selected_keys() if key in self.groups]
+        if not keys:
+            messagebox.showwarning("Merge", "Select the duplicate groups to merge.", parent=self.window)
+            return
+        self.merge(keys)
+
+    def merge_all(self):
+        self.merge(list(self.groups))
+
+    def merge(self, keys):
+        if not messagebox.askyesno("Merge", f"Merge {len(keys)} duplicate group(s)?", parent=self.window):
+            return
+        groups = [self.groups.pop(key) for key in keys]
+        removed = self.app.manager.merge_duplicates(groups)
+        for key in keys:
+            if self.tree.exists(f"g{key}"):
+                self.tree.delete(f"g{key}")
+        self.update_message()
+        message = f"Removed {removed} duplicate contacts."
+        if removed < sum(len(group.duplicate_ids) for group in groups):
+            message += " Groups edited since the search were skipped."
+        messagebox.showinfo("Merge", message, parent=self.window)
+
+    def close(self):
+        self.app.duplicate_window = None
+        self.window.destroy()
+
+def create_app(root):
+    app = ContactApp(root, SQLiteContactStore(data_path("contacts.db")))
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
+    return app
+
 if __name__ == "__main__":
     root = tk.Tk()
-    app = ContactApp(root)
+    app = create_app(root)
     root.mainloop()
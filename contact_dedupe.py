@@ -0,0 +1,224 @@
+import itertools
+import multiprocessing
+import random
+import unicodedata
+import zlib
+from functools import lru_cache, partial
+
+from contact_search import edit_distance, pattern_masks, tokenize
+from contact_storage import phone_digits
+
+PHONE_DIGITS = 10
+MIN_PHONE_DIGITS = 7
+BANDS = 5
+ROWS = 6
+HASH_PRIME = (1 << 61) - 1
+HASH_CACHE_SIZE = 1 << 18
+_rng = random.Random(0x5EED)
+HASH_PARAMETERS = [(_rng.randrange(1, HASH_PRIME), _rng.randrange(HASH_PRIME)) for _ in range(BANDS * ROWS)]
+MAX_BLOCK_SIZE = 100
+CHUNK_SIZE = 20000
+DUPLICATE_THRESHOLD = 0.8
+MIN_EVIDENCE = 0.6
+WEIGHTS = (0.4, 0.25, 0.25, 0.1)
+
+def fold(text):
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+def normalize_record(record):
+    name, phone, email, address = record
+    digits = phone_digits(phone)
+    return (" ".join(sorted(tokenize(fold(name)))),
+            digits[-PHONE_DIGITS:] if len(digits) >= MIN_PHONE_DIGITS else "",
+            email.strip().casefold(),
+            " ".join(tokenize(fold(address))))
+
+def shingles(features):
+    padded = f"  {features[0]} "
+    grams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+    grams.update("@" + token for token in features[3].split())
+    return grams
+
+@lru_cache(maxsize=HASH_CACHE_SIZE)
+def shingle_hashes(gram):
+    value = zlib.crc32(gram.encode())
+    return tuple((a * value + b) % HASH_PRIME for a, b in HASH_PARAMETERS)
+
+def signature(grams):
+    if not grams:
+        return None
+    return list(map(min, zip(*map(shingle_hashes, grams))))
+
+def band_keys(features):
+    bins = signature(shingles(features))
+    if bins is None:
+        return []
+    return [hash((band,) + tuple(bins[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS)]
+
+def prepare(chunk):
+    prepared = []
+    for contact_id, record in chunk:
+        features = normalize_record(record)
+        prepared.append((contact_id, features, band_keys(features)))
+    return prepared
+
+def name_similarity(a, b):
+    if a == b:
+        return 1.0
+    longest = max(len(a), len(b))
+    return 1 - edit_distance(a, pattern_masks(a), b, longest) / longest
+
+def address_similarity(a, b):
+    a, b = set(a.split()), set(b.split())
+    return len(a & b) / len(a | b)
+
+def score_pair(a, b, threshold=0.0):
+    total = weight = 0.0
+    for field in (1, 2):
+        if a[field] and b[field]:
+            total += WEIGHTS[field] * (a[field] == b[field])
+            weight += WEIGHTS[field]
+    fuzzy = [field for field in (0, 3) if a[field] and b[field]]
+    weight += sum(WEIGHTS[field] for field in fuzzy)
+    if (total + sum(WEIGHTS[field] for field in fuzzy)) / max(weight, MIN_EVIDENCE) < threshold:
+        return 0.0
+    if 0 in fuzzy:
+        total += WEIGHTS[0] * name_similarity(a[0], b[0])
+    if 3 in fuzzy:
+        total += WEIGHTS[3] * address_similarity(a[3], b[3])
+    return total / max(weight, MIN_EVIDENCE)
+
+def score_pairs(chunk, threshold=DUPLICATE_THRESHOLD):
+    scored = []
+    for a, features_a, b, features_b in chunk:
+        score = score_pair(features_a, features_b, threshold)
+        if score >= threshold:
+            scored.append((a, b, score))
+    return scored
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def add_to_bucket(buckets, key, contact_id):
+    bucket = buckets.get(key)
+    if bucket is None:
+        buckets[key] = contact_id
+    elif type(bucket) is list:
+        bucket.append(contact_id)
+    else:
+        buckets[key] = [bucket, contact_id]
+
+def candidate_pairs(prepared, features):
+    buckets = {}
+    for chunk in prepared:
+        for contact_id, record_features, bands in chunk:
+            features[contact_id] = record_features
+            name, phone, email, address = record_features
+            for key in bands:
+                add_to_bucket(buckets, key, contact_id)
+            if phone:
+                add_to_bucket(buckets, ("phone", phone), contact_id)
+            if email:
+                add_to_bucket(buckets, ("email", email), contact_id)
+            if name:
+                add_to_bucket(buckets, ("name", name), contact_id)
+    pairs = set()
+    for key, bucket in buckets.items():
+        if type(bucket) is not list:
+            continue
+        bucket.sort()
+        if len(bucket) <= MAX_BLOCK_SIZE:
+            pairs.update(itertools.combinations(bucket, 2))
+        elif type(key) is tuple and key[0] in ("phone", "email"):
+            pairs.update(zip(bucket, bucket[1:]))
+    return pairs
+
+def cluster(scored):
+    parent = {}
+    weakest = {}
+
+    def find(contact_id):
+        root = contact_id
+        while parent[root] != root:
+            root = parent[root]
+        while contact_id != root:
+            parent[contact_id], contact_id = root, parent[contact_id]
+        return root
+
+    for a, b, score in scored:
+        parent.setdefault(a, a)
+        parent.setdefault(b, b)
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            root_a, root_b = min(root_a, root_b), max(root_a, root_b)
+            parent[root_b] = root_a
+            weakest[root_a] = min(score, weakest.get(root_a, score), weakest.pop(root_b, score))
+        else:
+            weakest[root_a] = min(score, weakest[root_a])
+    groups = {}
+    for contact_id in parent:
+        groups.setdefault(find(contact_id), []).append(contact_id)
+    return sorted((sorted(ids), weakest[root]) for root, ids in groups.items())
+
+def verify_groups(groups, features, threshold):
+    verified = []
+    for ids, weakest in groups:
+        remaining = ids
+        while len(remaining) > 1:
+            primary = features[remaining[0]]
+            members = [remaining[0]]
+            rest = []
+            scores = []
+            for contact_id in remaining[1:]:
+                score = score_pair(primary, features[contact_id], threshold)
+                if score >= threshold:
+                    members.append(contact_id)
+                    scores.append(score)
+                else:
+                    rest.append(contact_id)
+            if scores:
+                verified.append((members, min(scores)))
+            remaining = rest
+    verified.sort()
+    return verified
+
+def find_duplicate_ids(items, threshold=DUPLICATE_THRESHOLD, processes=1, chunk_size=CHUNK_SIZE):
+    if processes > 1:
+        with multiprocessing.get_context("spawn").Pool(processes) as pool:
+            return _find_duplicate_ids(items, threshold, chunk_size, pool.imap_unordered)
+    return _find_duplicate_ids(items, threshold, chunk_size, map)
+
+def _find_duplicate_ids(items, threshold, chunk_size, mapper):
+    features = {}
+    pairs = candidate_pairs(mapper(prepare, chunked(items, chunk_size)), features)
+    work = ((a, features[a], b, features[b]) for a, b in pairs)
+    scored = itertools.chain.from_iterable(
+        mapper(partial(score_pairs, threshold=threshold), chunked(work, chunk_size)))
+    return verify_groups(cluster(scored), features, threshold)
+
+def merge_records(records):
+    merged = list(records[0])
+    for record in records[1:]:
+        for field, value in enumerate(record):
+            if not merged[field].strip() and value.strip():
+                merged[field] = value
+    return tuple(merged)
+
+class DuplicateGroup:
+    def __init__(self, contacts, score):
+        self.contacts = contacts
+        self.score = score
+        self.merged = merge_records([record for contact_id, record in contacts])
+
+    @property
+    def primary_id(self):
+        return self.contacts[0][0]
+
+    @property
+    def duplicate_ids(self):
+        return [contact_id for contact_id, record in self.contacts[1:]]
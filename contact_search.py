@@ -0,0 +1,247 @@
+import heapq
+import itertools
+import re
+from collections import Counter, OrderedDict
+
+FIELD_WEIGHTS = (1.0, 0.9, 0.8)
+FIELD_COLUMNS = (0, 2, 3)
+PREFIX_WEIGHT = 0.8
+FUZZY_PREFIX_LENGTH = 7
+PREFIX_EDITS = 1
+DEFAULT_LIMIT = 20
+GRAM_EDITS = 3
+MATCH_CACHE_SIZE = 256
+MAX_COMBINATIONS = 256
+TOKEN_RE = re.compile(r"[^\W\d_]+|\d+")
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.casefold())
+
+def max_edits(length):
+    if length <= 2:
+        return 0
+    return 1 if length <= 7 else 2
+
+def term_grams(term, end="$"):
+    padded = "$$" + term + end
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def pattern_masks(token):
+    masks = {}
+    for i, c in enumerate(token):
+        masks[c] = masks.get(c, 0) | 1 << i
+    return masks
+
+def edit_distance(token, masks, term, limit, prefix=False):
+    size = len(token)
+    if not prefix and abs(len(term) - size) > limit:
+        return limit + 1
+    full = (1 << size) - 1
+    last = 1 << (size - 1)
+    positive, negative, diagonal, previous = full, 0, 0, 0
+    score = best = size
+    remaining = len(term)
+    for c in term:
+        matches = masks.get(c, 0)
+        diagonal = ((((~diagonal) & matches) << 1) & previous) | (((matches & positive) + positive) ^ positive) \
+            | matches | negative
+        horizontal_positive = negative | (~(diagonal | positive) & full)
+        horizontal_negative = positive & diagonal
+        if horizontal_positive & last:
+            score += 1
+        elif horizontal_negative & last:
+            score -= 1
+        horizontal_positive = ((horizontal_positive << 1) | 1) & full
+        horizontal_negative = (horizontal_negative << 1) & full
+        positive = horizontal_negative | (~(diagonal | horizontal_positive) & full)
+        negative = horizontal_positive & diagonal
+        previous = matches
+        remaining -= 1
+        if prefix:
+            best = min(best, score)
+            if len(term) - remaining > size + limit:
+                break
+        elif score - remaining > limit:
+            return limit + 1
+    return min(best if prefix else score, limit + 1)
+
+class ContactSearchIndex:
+    def __init__(self):
+        self.postings = tuple({} for _ in FIELD_WEIGHTS)
+        self.grams = {}
+        self.match_cache = OrderedDict()
+
+    @staticmethod
+    def record_terms(record):
+        return [set(tokenize(record[column])) for column in FIELD_COLUMNS]
+
+    def add(self, contact_id, record):
+        for postings, terms in zip(self.postings, self.record_terms(record)):
+            for term in terms:
+                ids = postings.get(term)
+                if ids is None:
+                    ids = postings[term] = set()
+                    self.add_term(term)
+                    self.match_cache.clear()
+                ids.add(contact_id)
+
+    def add_many(self, items):
+        count = 0
+        for contact_id, record in items:
+            self.add(contact_id, record)
+            count += 1
+        return count
+
+    def remove(self, contact_id, record):
+        for postings, terms in zip(self.postings, self.record_terms(record)):
+            for term in terms:
+                ids = postings.get(term)
+                if ids is None:
+                    continue
+                ids.discard(contact_id)
+                if not ids:
+                    del postings[term]
+                    self.remove_term(term)
+                    self.match_cache.clear()
+
+    def update(self, contact_id, old_record, new_record):
+        self.remove(contact_id, old_record)
+        self.add(contact_id, new_record)
+
+    def has_term(self, term):
+        return any(term in postings for postings in self.postings)
+
+    def add_term(self, term):
+        if sum(term in postings for postings in self.postings) == 1:
+            for gram in term_grams(term):
+                self.grams.setdefault(gram, set()).add(term)
+
+    def remove_term(self, term):
+        if not self.has_term(term):
+            for gram in term_grams(term):
+                terms = self.grams[gram]
+                terms.discard(term)
+                if not terms:
+                    del self.grams[gram]
+
+    def candidates(self, token, limit):
+        counts = Counter()
+        for gram in term_grams(token, end=""):
+            counts.update(self.grams.get(gram, ()))
+        size = len(token)
+        full_threshold = size - GRAM_EDITS * limit
+        prefix_threshold = size - GRAM_EDITS * PREFIX_EDITS if size >= FUZZY_PREFIX_LENGTH else size
+        threshold = max(1, min(full_threshold, prefix_threshold))
+        for term, count in counts.items():
+            if count < threshold:
+                continue
+            if count >= prefix_threshold or (abs(len(term) - size) <= limit
+                                             and count >= len(term) - GRAM_EDITS * limit):
+                yield term, count == size
+
+    def match(self, token):
+        matches = self.match_cache.get(token)
+        if matches is not None:
+            self.match_cache.move_to_end(token)
+            return matches
+        limit = max_edits(len(token))
+        masks = pattern_masks(token)
+        characters = set(token)
+        scale = len(token) + 1
+        matches = []
+        for term, shares_prefix in self.candidates(token, limit):
+            if term == token:
+                similarity = 1.0
+            elif shares_prefix and term.startswith(token):
+                similarity = PREFIX_WEIGHT
+                if len(term) <= len(token) + limit:
+                    similarity = max(similarity, 1 - edit_distance(token, masks, term, limit) / scale)
+            elif len(characters.difference(term)) > limit:
+                continue
+            else:
+                distance = edit_distance(token, masks, term, limit)
+                if distance <= limit:
+                    similarity = 1 - distance / scale
+                elif len(token) >= FUZZY_PREFIX_LENGTH:
+                    distance = edit_distance(token, masks, term, PREFIX_EDITS, prefix=True)
+                    if distance > PREFIX_EDITS:
+                        continue
+                    similarity = (1 - distance / scale) * PREFIX_WEIGHT
+                else:
+                    continue
+            for field, weight in enumerate(FIELD_WEIGHTS):
+                ids = self.postings[field].get(term)
+                if ids:
+                    matches.append((similarity * weight, field, term, ids))
+        matches.sort(key=lambda match: (match[0], len(match[3])), reverse=True)
+        self.match_cache[token] = matches
+        if len(self.match_cache) > MATCH_CACHE_SIZE:
+            self.match_cache.popitem(last=False)
+        return matches
+
+    @staticmethod
+    def combinations(token_matches):
+        first = tuple(0 for _ in token_matches)
+        heap = [(-sum(matches[0][0] for matches in token_matches), first)]
+        queued = {first}
+        while heap:
+            score, positions = heapq.heappop(heap)
+            yield -score, [matches[i][3] for matches, i in zip(token_matches, positions)]
+            for k, matches in enumerate(token_matches):
+                if positions[k] + 1 < len(matches):
+                    following = positions[:k] + (positions[k] + 1,) + positions[k + 1:]
+                    if following not in queued:
+                        queued.add(following)
+                        score = sum(m[i][0] for m, i in zip(token_matches, following))
+                        heapq.heappush(heap, (-score, following))
+
+    @staticmethod
+    def rescore(scores, matches):
+        remaining = set(scores)
+        rescored = {}
+        for score, field, term, ids in matches:
+            hits = remaining.intersection(ids)
+            if hits:
+                remaining -= hits
+                for contact_id in hits:
+                    rescored[contact_id] = scores[contact_id] + score
+                if not remaining:
+                    break
+        return rescored
+
+    def scan(self, token_matches, results, limit):
+        candidates = None
+        for matches in sorted(token_matches, key=lambda matches: sum(len(match[3]) for match in matches)):
+            ids = set().union(*(match[3] for match in matches))
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return
+        candidates.difference_update(results)
+        scores = dict.fromkeys(candidates, 0)
+        for matches in token_matches:
+            scores = self.rescore(scores, matches)
+        for contact_id, score in heapq.nlargest(limit - len(results), scores.items(), key=lambda item: item[1]):
+            results[contact_id] = round(score, 6)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        token_matches = [self.match(token) for token in tokens]
+        if not all(token_matches):
+            return []
+        results = {}
+        explored = 0
+        for score, postings in self.combinations(token_matches):
+            if len(results) >= limit:
+                break
+            if explored == MAX_COMBINATIONS:
+                self.scan(token_matches, results, limit)
+                break
+            explored += 1
+            postings.sort(key=len)
+            hits = postings[0].intersection(*postings[1:]) if len(postings) > 1 else postings[0]
+            fresh = (contact_id for contact_id in hits if contact_id not in results)
+            for contact_id in itertools.islice(fresh, limit - len(results)):
+                results[contact_id] = round(score, 6)
+        return sorted(results.items(), key=lambda item: -item[1])
@@ -0,0 +1,493 @@
+import bisect
+import csv
+import re
+import sqlite3
+
+from storage import atomic_open
+
+FIELDS = ("name", "phone", "email", "address")
+PHONE_QUERY_RE = re.compile(r"[\d+()\-. ]+")
+
+def normalize_name(name):
+    return " ".join(name.lower().split())
+
+def search_key(text):
+    return text.casefold()
+
+def phone_digits(phone):
+    return "".join(c for c in phone if c.isdigit())
+
+def phone_query(query):
+    return phone_digits(query) if PHONE_QUERY_RE.fullmatch(query) else ""
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _remove_sorted(items, item):
+    i = bisect.bisect_left(items, item)
+    if i < len(items) and items[i] == item:
+        del items[i]
+
+class MemoryContactStore:
+    def __init__(self):
+        self._records = {}
+        self._next_id = 0
+        self._name_index = {}
+        self._name_prefixes = []
+        self._name_trigrams = {}
+        self._phone_suffixes = []
+
+    def __len__(self):
+        return len(self._records)
+
+    def add(self, record):
+        contact_id = self._next_id
+        self._next_id += 1
+        self._records[contact_id] = tuple(record)
+        self._index_record(contact_id, self._records[contact_id])
+        return contact_id
+
+    def add_many(self, records):
+        count = 0
+        for record in records:
+            contact_id = self._next_id
+            self._next_id += 1
+            self._records[contact_id] = tuple(record)
+            self._index_record(contact_id, self._records[contact_id], insert=list.append)
+            count += 1
+        self._name_prefixes.sort()
+        self._phone_suffixes.sort()
+        return count
+
+    def get(self, contact_id):
+        return self._records.get(contact_id)
+
+    def update(self, contact_id, record):
+        self._unindex_record(contact_id, self._records[contact_id])
+        self._records[contact_id] = tuple(record)
+        self._index_record(contact_id, self._records[contact_id])
+
+    def delete(self, contact_id):
+        self._unindex_record(contact_id, self._records.pop(contact_id))
+
+    def update_many(self, updates):
+        for contact_id, record in updates:
+            self.update(contact_id, record)
+
+    def delete_many(self, contact_ids):
+        for contact_id in contact_ids:
+            self.delete(contact_id)
+
+    def iter_all(self):
+        return iter(list(self._records.items()))
+
+    def snapshot(self):
+        return list(self._records.items())
+
+    def ids(self):
+        return list(self._records)
+
+    def find_by_name(self, name):
+        ids = self._name_index.get(normalize_name(name), ())
+        matches = [contact_id for contact_id in ids if self._records[contact_id][0] == name]
+        return min(matches) if matches else None
+
+    def search(self, query):
+        if not query:
+            return list(self._records.items())
+        ids = self._search_name(search_key(query)) | self._search_phone(query)
+        return [(contact_id, self._records[contact_id]) for contact_id in sorted(ids)]
+
+    def search_prefix(self, prefix, limit=None):
+        prefix = normalize_name(prefix)
+        start = bisect.bisect_left(self._name_prefixes, (prefix, -1))
+        results = []
+        for i in range(start, len(self._name_prefixes)):
+            key, contact_id = self._name_prefixes[i]
+            if not key.startswith(prefix) or (limit is not None and len(results) >= limit):
+                break
+            results.append((contact_id, self._records[contact_id]))
+        return results
+
+    def close(self):
+        pass
+
+    def _search_name(self, query):
+        if len(query) < 3:
+            return {contact_id for contact_id, record in self._records.items()
+                    if query in search_key(record[0])}
+        postings = []
+        for gram in trigrams(query):
+            ids = self._name_trigrams.get(gram)
+            if not ids:
+                return set()
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {contact_id for contact_id in candidates
+                if query in search_key(self._records[contact_id][0])}
+
+    def _search_phone(self, query):
+        digits = phone_query(query)
+        if not digits:
+            return set()
+        start = bisect.bisect_left(self._phone_suffixes, (digits, -1))
+        ids = set()
+        for i in range(start, len(self._phone_suffixes)):
+            suffix, contact_id = self._phone_suffixes[i]
+            if not suffix.startswith(digits):
+                break
+            ids.add(contact_id)
+        return ids
+
+    def _index_record(self, contact_id, record, insert=bisect.insort):
+        key = normalize_name(record[0])
+        self._name_index.setdefault(key, {})[contact_id] = None
+        insert(self._name_prefixes, (key, contact_id))
+        for gram in trigrams(search_key(record[0])):
+            self._name_trigrams.setdefault(gram, set()).add(contact_id)
+        digits = phone_digits(record[1])
+        for i in range(len(digits)):
+            insert(self._phone_suffixes, (digits[i:], contact_id))
+
+    def _unindex_record(self, contact_id, record):
+        key = normalize_name(record[0])
+        ids = self._name_index[key]
+        del ids[contact_id]
+        if not ids:
+            del self._name_index[key]
+        _remove_sorted(self._name_prefixes, (key, contact_id))
+        for gram in trigrams(search_key(record[0])):
+            ids = self._name_trigrams[gram]
+            ids.discard(contact_id)
+            if not ids:
+                del self._name_trigrams[gram]
+        digits = phone_digits(record[1])
+        for i in range(len(digits)):
+            _remove_sorted(self._phone_suffixes, (digits[i:], contact_id))
+
+class SQLiteContactStore:
+    INDEXES = {
+        "contacts_name_key": "name_key",
+        "contacts_phone_digits": "phone_digits",
+        "contacts_email_key": "email_key",
+    }
+    COLUMNS = "name, phone, email, address, name_key, phone_digits, email_key, search_key"
+    INSERT_TRIGGER = """
+        CREATE TRIGGER IF NOT EXISTS contacts_ai AFTER INSERT ON contacts BEGIN
+            INSERT INTO contacts_fts(rowid, search_key, phone_digits, email, address)
+            VALUES (new.id, new.search_key, new.phone_digits, new.email, new.address);
+        END
+    """
+
+    def __init__(self, path="contacts.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.create_function("search_key", 1, search_key, deterministic=True)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS contacts (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                phone TEXT NOT NULL,
+                email TEXT NOT NULL,
+                address TEXT NOT NULL,
+                name_key TEXT NOT NULL,
+                phone_digits TEXT NOT NULL,
+                email_key TEXT NOT NULL,
+                search_key TEXT NOT NULL
+            );
+        """)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(contacts)")]
+        if "search_key" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE contacts ADD COLUMN search_key TEXT NOT NULL DEFAULT ''")
+                self.conn.execute("UPDATE contacts SET search_key = search_key(name)")
+        for index, column in self.INDEXES.items():
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON contacts({column})")
+        self.has_fts = self._create_fts()
+        self.conn.commit()
+
+    def _create_fts(self):
+        try:
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(contacts_fts)")]
+            rebuild = bool(columns) and "search_key" not in columns
+            if rebuild:
+                self.conn.executescript("""
+                    DROP TRIGGER IF EXISTS contacts_ai;
+                    DROP TRIGGER IF EXISTS contacts_ad;
+                    DROP TRIGGER IF EXISTS contacts_au;
+                    DROP TABLE contacts_fts;
+                """)
+            self.conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+                    search_key, phone_digits, email, address,
+                    content='contacts', content_rowid='id', tokenize='trigram'
+                );
+                CREATE TRIGGER IF NOT EXISTS contacts_ad AFTER DELETE ON contacts BEGIN
+                    INSERT INTO contacts_fts(contacts_fts, rowid, search_key, phone_digits, email, address)
+                    VALUES ('delete', old.id, old.search_key, old.phone_digits, old.email, old.address);
+                END;
+                CREATE TRIGGER IF NOT EXISTS contacts_au AFTER UPDATE ON contacts BEGIN
+                    INSERT INTO contacts_fts(contacts_fts, rowid, search_key, phone_digits, email, address)
+                    VALUES ('delete', old.id, old.search_key, old.phone_digits, old.email, old.address);
+                    INSERT INTO contacts_fts(rowid, search_key, phone_digits, email, address)
+                    VALUES (new.id, new.search_key, new.phone_digits, new.email, new.address);
+                END;
+            """)
+            self.conn.execute(self.INSERT_TRIGGER)
+            if rebuild:
+                self.conn.execute("INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+
+    @staticmethod
+    def _row(record):
+        name, phone, email, address = record
+        return (name, phone, email, address,
+                normalize_name(name), phone_digits(phone), email.strip().lower(), search_key(name))
+
+    def add(self, record):
+        with self.conn:
+            cursor = self.conn.execute(
+                f"INSERT INTO contacts ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._row(record))
+        return cursor.lastrowid
+
+    def add_many(self, records, batch_size=50000):
+        sql = f"INSERT INTO contacts ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        first_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM contacts").fetchone()[0]
+        count = 0
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute("DROP TRIGGER IF EXISTS contacts_ai")
+            for index in self.INDEXES:
+                self.conn.execute(f"DROP INDEX IF EXISTS {index}")
+            batch = []
+            for record in records:
+                batch.append(self._row(record))
+                if len(batch) >= batch_size:
+                    self.conn.executemany(sql, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self.conn.executemany(sql, batch)
+                count += len(batch)
+            for index, column in self.INDEXES.items():
+                self.conn.execute(f"CREATE INDEX {index} ON contacts({column})")
+            if self.has_fts:
+                self.conn.execute(
+                    "INSERT INTO contacts_fts(rowid, search_key, phone_digits, email, address) "
+                    "SELECT id, search_key, phone_digits, email, address FROM contacts WHERE id > ?", (first_id,))
+                self.conn.execute(self.INSERT_TRIGGER)
+        return count
+
+    def get(self, contact_id):
+        return self.conn.execute(
+            "SELECT name, phone, email, address FROM contacts WHERE id = ?", (contact_id,)).fetchone()
+
+    def update(self, contact_id, record):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE contacts SET name = ?, phone = ?, email = ?, address = ?, "
+                "name_key = ?, phone_digits = ?, email_key = ?, search_key = ? WHERE id = ?",
+                self._row(record) + (contact_id,))
+
+    def delete(self, contact_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
+
+    def update_many(self, updates):
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE contacts SET name = ?, phone = ?, email = ?, address = ?, "
+                "name_key = ?, phone_digits = ?, email_key = ?, search_key = ? WHERE id = ?",
+                (self._row(record) + (contact_id,) for contact_id, record in updates))
+
+    def delete_many(self, contact_ids):
+        with self.conn:
+            self.conn.executemany("DELETE FROM contacts WHERE id = ?", ((contact_id,) for contact_id in contact_ids))
+
+    def ids(self):
+        return [row[0] for row in self.conn.execute("SELECT id FROM contacts ORDER BY id")]
+
+    def iter_all(self, batch_size=10000):
+        cursor = self.conn.execute("SELECT id, name, phone, email, address FROM contacts ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row[0], row[1:]
+
+    def snapshot(self):
+        if self.path in ("", ":memory:"):
+            return list(self.iter_all())
+        return self._read_snapshot()
+
+    def _read_snapshot(self, batch_size=10000):
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute("SELECT id, name, phone, email, address FROM contacts ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row[0], row[1:]
+        finally:
+            conn.close()
+
+    def find_by_name(self, name):
+        row = self.conn.execute(
+            "SELECT MIN(id) FROM contacts WHERE name_key = ? AND name = ?",
+            (normalize_name(name), name)).fetchone()
+        return row[0]
+
+    def search(self, query):
+        if not query:
+            return list(self.iter_all())
+        folded = search_key(query)
+        digits = phone_query(query)
+        if self.has_fts and len(folded) >= 3:
+            sql = ("SELECT c.id, c.name, c.phone, c.email, c.address FROM contacts_fts f "
+                   "JOIN contacts c ON c.id = f.rowid WHERE f.search_key LIKE ?")
+            params = [f"%{folded}%"]
+        else:
+            sql = ("SELECT id, name, phone, email, address FROM contacts c "
+                   "WHERE instr(c.search_key, ?) > 0")
+            params = [folded]
+        if digits:
+            if self.has_fts and len(digits) >= 3:
+                sql += (" UNION SELECT c.id, c.name, c.phone, c.email, c.address FROM contacts_fts f "
+                        "JOIN contacts c ON c.id = f.rowid WHERE f.phone_digits LIKE ?")
+                params.append(f"%{digits}%")
+            else:
+                sql += (" UNION SELECT id, name, phone, email, address FROM contacts "
+                        "WHERE instr(phone_digits, ?) > 0")
+                params.append(digits)
+        results = []
+        for row in self.conn.execute(sql + " ORDER BY 1", params):
+            record = row[1:]
+            if folded in search_key(record[0]) or (digits and digits in phone_digits(record[1])):
+                results.append((row[0], record))
+        return results
+
+    def search_prefix(self, prefix, limit=None):
+        prefix = normalize_name(prefix)
+        sql = ("SELECT id, name, phone, email, address FROM contacts "
+               "WHERE name_key >= ? AND name_key < ? ORDER BY name_key, id")
+        params = [prefix, prefix + "\U0010ffff"]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [(row[0], row[1:]) for row in self.conn.execute(sql, params)]
+
+    def full_text_search(self, query, limit=100):
+        query = search_key(query)
+        if not self.has_fts:
+            rows = self.conn.execute(
+                "SELECT id, name, phone, email, address FROM contacts "
+                "WHERE instr(search_key(name || ' ' || email || ' ' || address), ?) > 0 LIMIT ?",
+                (query, limit))
+            return [(row[0], row[1:]) for row in rows]
+        phrase = '"' + query.replace('"', '""') + '"'
+        rows = self.conn.execute(
+            "SELECT c.id, c.name, c.phone, c.email, c.address FROM contacts_fts f "
+            "JOIN contacts c ON c.id = f.rowid "
+            "WHERE contacts_fts MATCH ? ORDER BY rank LIMIT ?",
+            ("{search_key email address}: " + phrase, limit))
+        return [(row[0], row[1:]) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+def read_csv(path):
+    with open(path, "r", newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = [name.strip().lower() for name in header]
+        if all(field in columns for field in FIELDS):
+            positions = [columns.index(field) for field in FIELDS]
+        else:
+            positions = [0, 1, 2, 3]
+            yield tuple((header + [""] * 4)[:4])
+        for row in reader:
+            if row:
+                row = row + [""] * (max(positions) + 1 - len(row))
+                yield tuple(row[i] for i in positions)
+
+def write_csv(path, records):
+    count = 0
+    with atomic_open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDS)
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    return count
+
+def _vcard_unescape(value):
+    return re.sub(r"\\(.)", lambda match: {"n": "\n", "N": "\n"}.get(match.group(1), match.group(1)), value)
+
+def _vcard_escape(value):
+    return (value.replace("\\", "\\\\").replace(",", "\\,")
+            .replace(";", "\\;").replace("\n", "\\n"))
+
+def _vcard_lines(file):
+    pending = None
+    for line in file:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending is not None:
+        yield pending
+
+def read_vcard(path):
+    with open(path, "r", encoding="utf-8") as file:
+        card = None
+        for line in _vcard_lines(file):
+            key, _, value = line.partition(":")
+            prop = key.split(";")[0].upper()
+            if prop == "BEGIN" and value.upper() == "VCARD":
+                card = {}
+            elif prop == "END" and value.upper() == "VCARD" and card is not None:
+                yield (card.get("FN", ""), card.get("TEL", ""), card.get("EMAIL", ""), card.get("ADR", ""))
+                card = None
+            elif card is not None and prop in ("FN", "TEL", "EMAIL") and prop not in card:
+                card[prop] = _vcard_unescape(value)
+            elif card is not None and prop == "ADR" and prop not in card:
+                parts = [_vcard_unescape(part) for part in re.split(r"(?<!\\);", value)]
+                card[prop] = ", ".join(part for part in parts if part)
+
+def write_vcard(path, records):
+    count = 0
+    with atomic_open(path, "w", encoding="utf-8") as file:
+        for name, phone, email, address in records:
+            file.write("BEGIN:VCARD\r\nVERSION:3.0\r\n")
+            file.write(f"FN:{_vcard_escape(name)}\r\n")
+            file.write(f"N:{_vcard_escape(name)};;;;\r\n")
+            file.write(f"TEL:{_vcard_escape(phone)}\r\n")
+            file.write(f"EMAIL:{_vcard_escape(email)}\r\n")
+            file.write(f"ADR:;;{_vcard_escape(address)};;;;\r\n")
+            file.write("END:VCARD\r\n")
+            count += 1
+    return count
+
+def import_contacts(store, path):
+    reader = read_vcard if path.lower().endswith((".vcf", ".vcard")) else read_csv
+    return store.add_many(reader(path))
+
+def export_contacts(store, path):
+    writer = write_vcard if path.lower().endswith((".vcf", ".vcard")) else write_csv
+    return writer(path, (record for _, record in store.iter_all()))
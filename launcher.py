@@ -0,0 +1,107 @@
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import importlib
+import json
+import sys
+import tkinter as tk
+from tkinter import ttk
+
+READY_POLL_MS = 10
+
+APPS = {
+    "todo": ("To-Do List", "todo_app"),
+    "calculator": ("Calculator", "Advanced_calculator"),
+    "passwords": ("Password Generator", "password_generator"),
+    "rps": ("Rock Paper Scissors", "Rock_Paper_Scissors"),
+    "contacts": ("Contact Book", "contact_book"),
+}
+
+def elapsed_ms():
+    return (time.perf_counter() - STARTED) * 1000
+
+def start_app(window, key, on_ready=None):
+    title, module_name = APPS[key]
+    window.title(title)
+    placeholder = ttk.Label(window, text=f"Loading {title}...", padding=40)
+    placeholder.pack()
+    window.update_idletasks()
+    timings = {"first_paint_ms": elapsed_ms()}
+    window.after(0, build_app, window, module_name, placeholder, timings, on_ready)
+
+def build_app(window, module_name, placeholder, timings, on_ready):
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    timings["import_ms"] = (time.perf_counter() - start) * 1000
+    placeholder.destroy()
+    app = module.create_app(window)
+    window.update_idletasks()
+    timings["app_paint_ms"] = elapsed_ms()
+    wait_until_ready(window, app, timings, on_ready)
+
+def wait_until_ready(window, app, timings, on_ready):
+    if not window.winfo_exists():
+        return
+    if getattr(app, "loading", False):
+        window.after(READY_POLL_MS, wait_until_ready, window, app, timings, on_ready)
+        return
+    timings["interactive_ms"] = elapsed_ms()
+    if on_ready is not None:
+        on_ready(app, timings)
+
+class Launcher:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("CodSoft Apps")
+        self.windows = {}
+        self.apps = {}
+
+        frame = ttk.Frame(root, padding="20")
+        frame.pack(fill=tk.BOTH, expand=True)
+        for key, (title, module_name) in APPS.items():
+            ttk.Button(frame, text=title, width=25,
+                       command=lambda key=key: self.open_app(key)).pack(pady=5)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def open_app(self, key):
+        window = self.windows.get(key)
+        if window is not None and window.winfo_exists():
+            window.deiconify()
+            window.lift()
+            return
+        window = tk.Toplevel(self.root)
+        self.windows[key] = window
+        self.apps.pop(key, None)
+        start_app(window, key, lambda app, timings: self.apps.__setitem__(key, app))
+
+    def on_close(self):
+        for key, app in self.apps.items():
+            if self.windows[key].winfo_exists() and hasattr(app, "on_close"):
+                app.on_close()
+        self.root.destroy()
+
+def report_and_close(app, timings):
+    print(json.dumps({name: round(value, 2) for name, value in timings.items()}), flush=True)
+    if hasattr(app, "on_close"):
+        app.on_close()
+    else:
+        app.root.destroy()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Start one of the CodSoft apps.")
+    parser.add_argument("app", nargs="?", choices=list(APPS), help="app to open directly")
+    parser.add_argument("--timing", action="store_true",
+                        help="print startup timings as JSON once the app is interactive, then exit")
+    args = parser.parse_args(argv)
+
+    root = tk.Tk()
+    if args.app is None:
+        Launcher(root)
+    else:
+        start_app(root, args.app, report_and_close if args.timing else None)
+    root.mainloop()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import argparse
+import os
+import string
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SIMILAR_CHARACTERS = "1lI0O"
+MIN_LENGTH = 8
+MAX_LENGTH = 100
+VECTORIZE_THRESHOLD = 256
+
+class PasswordPolicy:
+    def __init__(self, length=12, uppercase=True, lowercase=True, digits=True, symbols=True,
+                 avoid_similar=True):
+        if not any([uppercase, lowercase, digits, symbols]):
+            raise ValueError("Please select at least one character type")
+        if length < MIN_LENGTH:
+            raise ValueError(f"Password length must be at least {MIN_LENGTH} characters")
+        if length > MAX_LENGTH:
+            raise ValueError(f"Password length must not exceed {MAX_LENGTH} characters")
+        self.length = length
+        self.avoid_similar = avoid_similar
+        selected = [
+            (uppercase, string.ascii_uppercase),
+            (lowercase, string.ascii_lowercase),
+            (digits, string.digits),
+            (symbols, string.punctuation),
+        ]
+        self.classes = []
+        for enabled, chars in selected:
+            if enabled:
+                if avoid_similar:
+                    chars = chars.translate(str.maketrans("", "", SIMILAR_CHARACTERS))
+                self.classes.append(chars)
+        self.alphabet = "".join(self.classes)
+
+    def validate(self, password):
+        return len(password) == self.length and all(
+            any(c in chars for c in password) for chars in self.classes)
+
+class ByteSampler:
+    def __init__(self, symbols, urandom=os.urandom):
+        if isinstance(symbols, int):
+            symbols = bytes(range(symbols))
+        elif isinstance(symbols, str):
+            symbols = symbols.encode("ascii")
+        size = len(symbols)
+        limit = 256 - 256 % size
+        self.table = bytes(symbols[i % size] for i in range(256))
+        self.rejected = bytes(range(limit, 256))
+        self.acceptance = limit / 256
+        self.urandom = urandom
+
+    def take(self, count):
+        chunks = []
+        remaining = count
+        while remaining > 0:
+            request = int(remaining / self.acceptance) + 64
+            accepted = self.urandom(request).translate(self.table, self.rejected)
+            chunks.append(accepted[:remaining])
+            remaining -= len(chunks[-1])
+        return b"".join(chunks)
+
+class PasswordEngine:
+    def __init__(self, urandom=os.urandom):
+        self.urandom = urandom
+        self.samplers = {}
+
+    def sampler(self, symbols):
+        sampler = self.samplers.get(symbols)
+        if sampler is None:
+            sampler = self.samplers[symbols] = ByteSampler(symbols, self.urandom)
+        return sampler
+
+    def generate_batch(self, n, policy):
+        if np is not None and n >= VECTORIZE_THRESHOLD:
+            return self.generate_batch_vectorized(n, policy)
+        length = policy.length
+        required = len(policy.classes)
+        fill = length - required
+        filler = self.sampler(policy.alphabet).take(n * fill)
+        class_chars = [self.sampler(chars).take(n) for chars in policy.classes]
+        positions = [self.sampler(fill + j + 1).take(n) for j in range(required)]
+        passwords = []
+        for i in range(n):
+            password = bytearray(filler[i * fill:(i + 1) * fill])
+            for j in range(required):
+                password.insert(positions[j][i], class_chars[j][i])
+            passwords.append(password.decode("ascii"))
+        return passwords
+
+    def generate_batch_vectorized(self, n, policy):
+        length = policy.length
+        data = self.sampler(policy.alphabet).take(n * length)
+        passwords = np.frombuffer(data, dtype=np.uint8).reshape(n, length).copy()
+        rows = np.arange(n)
+        chosen = np.empty((n, 0), dtype=np.int64)
+        for j, chars in enumerate(policy.classes):
+            position = np.frombuffer(self.sampler(length - j).take(n), dtype=np.uint8).astype(np.int64)
+            for column in range(j):
+                position += position >= chosen[:, column]
+            passwords[rows, position] = np.frombuffer(self.sampler(chars).take(n), dtype=np.uint8)
+            chosen = np.sort(np.column_stack([chosen, position]), axis=1)
+        lines = np.empty((n, length + 1), dtype=np.uint8)
+        lines[:, :length] = passwords
+        lines[:, length] = ord("\n")
+        return lines.tobytes().decode("ascii").split("\n")[:n]
+
+_default_engine = PasswordEngine()
+
+def generate_password(policy):
+    return _default_engine.generate_batch(1, policy)[0]
+
+def generate_batch(n, policy):
+    return _default_engine.generate_batch(n, policy)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate policy-compliant passwords in bulk.")
+    parser.add_argument("-n", "--count", type=int, default=1, help="number of passwords")
+    parser.add_argument("-l", "--length", type=int, default=12, help="password length")
+    parser.add_argument("--no-uppercase", action="store_true", help="exclude uppercase letters")
+    parser.add_argument("--no-lowercase", action="store_true", help="exclude lowercase letters")
+    parser.add_argument("--no-digits", action="store_true", help="exclude digits")
+    parser.add_argument("--no-symbols", action="store_true", help="exclude special characters")
+    parser.add_argument("--allow-similar", action="store_true", help="allow 1, l, I, 0 and O")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="passwords per batch")
+    args = parser.parse_args(argv)
+
+    try:
+        policy = PasswordPolicy(args.length, not args.no_uppercase, not args.no_lowercase,
+                                not args.no_digits, not args.no_symbols, not args.allow_similar)
+    except ValueError as error:
+        parser.error(str(error))
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        remaining = args.count
+        while remaining > 0:
+            batch = generate_batch(min(args.chunk_size, remaining), policy)
+            output.write("\n".join(batch))
+            output.write("\n")
+            remaining -= len(batch)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
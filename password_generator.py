@@ -1,18 +1,28 @@
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
-import random
-import string
-import re
-from datetime import datetime
+from tkinter import ttk, messagebox, simpledialog
+from password_engine import PasswordPolicy, generate_password
+from password_history import PasswordHistory
+from password_strength import estimate as estimate_strength, get_estimator
+from storage import data_path
+
+HISTORY_DISPLAY_SIZE = 10
+HISTORY_FILE = "password_history.bin"
+
+def mask_password(password):
+    return password[:2] + "\u2022" * (len(password) - 2)
 
 class PasswordGenerator:
-    def __init__(self, root):
+    def __init__(self, root, history=None):
         self.root = root
         self.root.title("Advanced Password Generator")
         self.root.geometry("600x700")
         
-        self.password_history = []
+        self.password_history = history if history is not None else PasswordHistory()
+        self.displayed_lines = 0
+        self.showing_search = False
         self.setup_gui()
+        self.root.after_idle(lambda: threading.Thread(target=get_estimator, daemon=True).start())
 
     def setup_gui(self):
         main_frame = ttk.Frame(self.root, padding="10")
@@ -62,98 +72,50 @@ class PasswordGenerator:
         history_frame = ttk.LabelFrame(main_frame, text="Password History", padding="5")
         history_frame.grid(row=11, column=0, columnspan=2, pady=10, sticky=(tk.W, tk.E))
 
+        controls = ttk.Frame(history_frame)
+        controls.pack(fill=tk.X)
+        self.history_search_var = tk.StringVar()
+        ttk.Entry(controls, textvariable=self.history_search_var, width=20).pack(side=tk.LEFT)
+        ttk.Button(controls, text="Search", command=self.search_history).pack(side=tk.LEFT, padx=2)
+        ttk.Button(controls, text="Recent", command=self.update_history_display).pack(side=tk.LEFT, padx=2)
+        self.show_passwords_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(controls, text="Show", variable=self.show_passwords_var,
+                        command=self.update_history_display).pack(side=tk.LEFT, padx=2)
+        ttk.Button(controls, text="Encrypt to File...", command=self.attach_history).pack(side=tk.RIGHT)
+
         self.history_text = tk.Text(history_frame, height=8, width=50)
         self.history_text.pack()
+        self.update_history_display()
 
     def generate_password(self):
         try:
             length = int(self.length_var.get())
-            if length < 8:
-                messagebox.showerror("Error", "Password length must be at least 8 characters")
-                return
-            if length > 100:
-                messagebox.showerror("Error", "Password length must not exceed 100 characters")
-                return
-
-            chars = ""
-            if not any([self.uppercase_var.get(), self.lowercase_var.get(), 
-                       self.digits_var.get(), self.symbols_var.get()]):
-                messagebox.showerror("Error", "Please select at least one character type")
-                return
-
-            if self.uppercase_var.get():
-                chars += string.ascii_uppercase
-            if self.lowercase_var.get():
-                chars += string.ascii_lowercase
-            if self.digits_var.get():
-                chars += string.digits
-            if self.symbols_var.get():
-                chars += string.punctuation
-
-            if self.avoid_similar_var.get():
-                chars = chars.translate(str.maketrans("", "", "1lI0O"))
-
-            password = ""
-            while not self.validate_password(password):
-                password = "".join(random.choice(chars) for _ in range(length))
-
-            self.result_var.set(password)
-            self.evaluate_strength(password)
-            self.add_to_history(password)
-
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid number for password length")
+            return
 
-    def validate_password(self, password):
-        if not password:
-            return False
-            
-        requirements = [
-            (self.uppercase_var.get(), lambda p: any(c.isupper() for c in p)),
-            (self.lowercase_var.get(), lambda p: any(c.islower() for c in p)),
-            (self.digits_var.get(), lambda p: any(c.isdigit() for c in p)),
-            (self.symbols_var.get(), lambda p: any(c in string.punctuation for c in p))
-        ]
-
-        return all(func(password) for req, func in requirements if req)
+        try:
+            policy = PasswordPolicy(length,
+                                    uppercase=self.uppercase_var.get(),
+                                    lowercase=self.lowercase_var.get(),
+                                    digits=self.digits_var.get(),
+                                    symbols=self.symbols_var.get(),
+                                    avoid_similar=self.avoid_similar_var.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        password = generate_password(policy)
+        self.result_var.set(password)
+        self.evaluate_strength(password)
+        self.add_to_history(password)
 
     def evaluate_strength(self, password):
-        score = 0
-        feedback = []
-
-        if len(password) >= 12:
-            score += 25
-            feedback.append("Good length")
-        elif len(password) >= 8:
-            score += 10
-            feedback.append("Minimum length met")
-
-        if any(c.isupper() for c in password):
-            score += 20
-            feedback.append("Contains uppercase")
-        if any(c.islower() for c in password):
-            score += 20
-            feedback.append("Contains lowercase")
-        if any(c.isdigit() for c in password):
-            score += 20
-            feedback.append("Contains numbers")
-        if any(c in string.punctuation for c in password):
-            score += 20
-            feedback.append("Contains symbols")
-
-        entropy = len(set(password)) / len(password)
-        score = min(100, score + int(entropy * 20))
-
-        self.progress_var.set(score)
-        strength_text = "Weak"
-        if score >= 80:
-            strength_text = "Very Strong"
-        elif score >= 60:
-            strength_text = "Strong"
-        elif score >= 40:
-            strength_text = "Moderate"
-
-        self.strength_var.set(f"Strength: {strength_text} ({score}%)\n" + "\n".join(feedback))
+        result = estimate_strength(password)
+        feedback = result.feedback() or ["No common patterns found"]
+        feedback.append(f"Estimated entropy: {result.bits:.0f} bits")
+        self.progress_var.set(result.score)
+        self.strength_var.set(f"Strength: {result.label} ({result.score}%)\n" + "\n".join(feedback))
 
     def copy_to_clipboard(self):
         password = self.result_var.get()
@@ -164,16 +126,68 @@ class PasswordGenerator:
             messagebox.showwarning("Warning", "No password to copy!")
 
     def add_to_history(self, password):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.password_history.append(f"{timestamp}: {password}")
-        self.update_history_display()
+        try:
+            self.password_history.append(password)
+            if self.showing_search:
+                self.update_history_display()
+                return
+            timestamp, password = self.password_history.entry(-1)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.history_text.insert("1.0", self.history_line(timestamp, password))
+        if self.displayed_lines == HISTORY_DISPLAY_SIZE:
+            self.history_text.delete(f"{HISTORY_DISPLAY_SIZE + 1}.0", tk.END)
+        else:
+            self.displayed_lines += 1
 
-    def update_history_display(self):
+    def history_line(self, timestamp, password):
+        if not self.show_passwords_var.get():
+            password = mask_password(password)
+        return f"{timestamp}: {password}\n"
+
+    def show_history_lines(self, entries, showing_search=False):
         self.history_text.delete(1.0, tk.END)
-        for entry in reversed(self.password_history[-10:]):
-            self.history_text.insert(tk.END, entry + "\n")
+        self.history_text.insert(tk.END, "".join(self.history_line(*entry) for entry in entries))
+        self.displayed_lines = len(entries)
+        self.showing_search = showing_search
+
+    def update_history_display(self):
+        self.show_history_lines(self.password_history.newest(HISTORY_DISPLAY_SIZE))
+
+    def search_history(self):
+        text = self.history_search_var.get().strip()
+        if not text:
+            self.update_history_display()
+            return
+        matches = []
+        for entry in self.password_history.search(text):
+            matches.append(entry)
+            if len(matches) == HISTORY_DISPLAY_SIZE:
+                break
+        self.show_history_lines(matches, showing_search=True)
+
+    def attach_history(self):
+        passphrase = simpledialog.askstring("Encrypted History", "Passphrase:", show="*", parent=self.root)
+        if not passphrase:
+            return
+        try:
+            self.password_history.attach(data_path(HISTORY_FILE), passphrase)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.update_history_display()
+
+    def on_close(self):
+        self.password_history.close()
+        self.root.destroy()
+
+def create_app(root):
+    app = PasswordGenerator(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
+    return app
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app = PasswordGenerator(root)
+    app = create_app(root)
     root.mainloop()
@@ -0,0 +1,208 @@
+import hashlib
+import hmac
+import os
+import struct
+from collections import deque
+from itertools import islice
+from datetime import datetime
+
+from storage import atomic_open
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:
+    AESGCM = None
+
+FILE_MAGIC = b"PWHIST1\n"
+CIPHER_AESGCM = 1
+CIPHER_HMAC_CTR = 2
+HEADER = struct.Struct("<8sB16sBII")
+RECORD_LENGTH = struct.Struct("<I")
+NONCE_SIZE = 12
+TAG_SIZE = 16
+SCRYPT_N_LOG2 = 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+MAX_SCRYPT_N_LOG2 = 20
+MAX_SCRYPT_COST = 64
+KEY_CHECK = b"password-history"
+
+def derive_key(passphrase, salt, n_log2=SCRYPT_N_LOG2, r=SCRYPT_R, p=SCRYPT_P):
+    return hashlib.scrypt(passphrase.encode("utf-8"), salt=salt, n=1 << n_log2, r=r, p=p,
+                          maxmem=256 * r * (1 << n_log2), dklen=32)
+
+class HmacCtrCipher:
+    def __init__(self, key):
+        self.encryption_key = hmac.new(key, b"encrypt", hashlib.sha256).digest()
+        self.mac_key = hmac.new(key, b"authenticate", hashlib.sha256).digest()
+
+    def keystream(self, nonce, size):
+        blocks = []
+        for counter in range((size + 31) // 32):
+            blocks.append(hmac.new(self.encryption_key, nonce + counter.to_bytes(4, "little"),
+                                   hashlib.sha256).digest())
+        return b"".join(blocks)[:size]
+
+    def tag(self, nonce, ciphertext, associated_data):
+        message = associated_data + nonce + ciphertext
+        return hmac.new(self.mac_key, message, hashlib.sha256).digest()[:TAG_SIZE]
+
+    def encrypt(self, nonce, data, associated_data):
+        stream = self.keystream(nonce, len(data))
+        ciphertext = bytes(a ^ b for a, b in zip(data, stream))
+        return ciphertext + self.tag(nonce, ciphertext, associated_data)
+
+    def decrypt(self, nonce, data, associated_data):
+        ciphertext, tag = data[:-TAG_SIZE], data[-TAG_SIZE:]
+        if not hmac.compare_digest(tag, self.tag(nonce, ciphertext, associated_data)):
+            raise ValueError("History record failed authentication")
+        stream = self.keystream(nonce, len(ciphertext))
+        return bytes(a ^ b for a, b in zip(ciphertext, stream))
+
+class AesGcmCipher:
+    def __init__(self, key):
+        self.aead = AESGCM(key)
+
+    def encrypt(self, nonce, data, associated_data):
+        return self.aead.encrypt(nonce, data, associated_data)
+
+    def decrypt(self, nonce, data, associated_data):
+        try:
+            return self.aead.decrypt(nonce, data, associated_data)
+        except Exception:
+            raise ValueError("History record failed authentication") from None
+
+def make_cipher(cipher_id, key):
+    if cipher_id == CIPHER_AESGCM:
+        if AESGCM is None:
+            raise ValueError("This history file needs the 'cryptography' package")
+        return AesGcmCipher(key)
+    if cipher_id == CIPHER_HMAC_CTR:
+        return HmacCtrCipher(key)
+    raise ValueError("Unknown history cipher")
+
+class PasswordHistory:
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.entries = deque(maxlen=capacity)
+        self.cipher_id = CIPHER_AESGCM if AESGCM is not None else CIPHER_HMAC_CTR
+        self.cipher = make_cipher(self.cipher_id, os.urandom(32))
+        self.path = None
+        self.file = None
+        self.header = b""
+        self.records_on_disk = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def seal(self, timestamp, password):
+        nonce = os.urandom(NONCE_SIZE)
+        data = f"{timestamp}\t{password}".encode("utf-8")
+        return nonce + self.cipher.encrypt(nonce, data, self.header)
+
+    def open_entry(self, record):
+        data = self.cipher.decrypt(record[:NONCE_SIZE], record[NONCE_SIZE:], self.header)
+        timestamp, password = data.decode("utf-8").split("\t", 1)
+        return timestamp, password
+
+    def append(self, password, timestamp=None):
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        record = self.seal(timestamp, password)
+        evicted = len(self.entries) == self.capacity
+        self.entries.append(record)
+        if self.file is not None:
+            self.file.write(RECORD_LENGTH.pack(len(record)) + record)
+            self.file.flush()
+            self.records_on_disk += 1
+            if self.records_on_disk > 2 * self.capacity:
+                self.compact()
+        return evicted
+
+    def entry(self, index):
+        return self.open_entry(self.entries[index])
+
+    def readable(self, start=0):
+        for i in range(len(self.entries) - 1 - start, -1, -1):
+            try:
+                yield self.entry(i)
+            except ValueError:
+                continue
+
+    def newest(self, count, start=0):
+        return list(islice(self.readable(start), count))
+
+    def search(self, text):
+        text = text.lower()
+        for timestamp, password in self.readable():
+            if text in password.lower() or text in timestamp:
+                yield timestamp, password
+
+    def attach(self, path, passphrase):
+        plaintext = list(self.readable())[::-1]
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            salt = os.urandom(16)
+            self.header = HEADER.pack(FILE_MAGIC, self.cipher_id, salt, SCRYPT_N_LOG2, SCRYPT_R, SCRYPT_P)
+            self.cipher = make_cipher(self.cipher_id, derive_key(passphrase, salt))
+            self.entries.clear()
+        else:
+            with file:
+                self.load(file, passphrase)
+        self.path = path
+        for timestamp, password in plaintext:
+            self.entries.append(self.seal(timestamp, password))
+        self.compact()
+
+    def load(self, file, passphrase):
+        header = file.read(HEADER.size)
+        try:
+            magic, cipher_id, salt, n_log2, r, p = HEADER.unpack(header)
+        except struct.error:
+            raise ValueError("Not a password history file") from None
+        if magic != FILE_MAGIC or not 0 < n_log2 <= MAX_SCRYPT_N_LOG2 or not 0 < r * p <= MAX_SCRYPT_COST:
+            raise ValueError("Not a password history file")
+        prefix = file.read(RECORD_LENGTH.size)
+        if len(prefix) < RECORD_LENGTH.size:
+            raise ValueError("Not a password history file")
+        check = file.read(RECORD_LENGTH.unpack(prefix)[0])
+        if len(check) < NONCE_SIZE + TAG_SIZE:
+            raise ValueError("Not a password history file")
+        cipher = make_cipher(cipher_id, derive_key(passphrase, salt, n_log2, r, p))
+        try:
+            if cipher.decrypt(check[:NONCE_SIZE], check[NONCE_SIZE:], header) != KEY_CHECK:
+                raise ValueError
+        except ValueError:
+            raise ValueError("Wrong passphrase for password history") from None
+        self.cipher_id = cipher_id
+        self.cipher = cipher
+        self.header = header
+        self.entries.clear()
+        while True:
+            prefix = file.read(RECORD_LENGTH.size)
+            if len(prefix) < RECORD_LENGTH.size:
+                break
+            record = file.read(RECORD_LENGTH.unpack(prefix)[0])
+            if len(record) < NONCE_SIZE + TAG_SIZE:
+                break
+            self.entries.append(record)
+
+    def compact(self):
+        if self.path is None:
+            return
+        if self.file is not None:
+            self.file.close()
+        nonce = os.urandom(NONCE_SIZE)
+        check = nonce + self.cipher.encrypt(nonce, KEY_CHECK, self.header)
+        with atomic_open(self.path, "wb") as file:
+            file.write(self.header)
+            file.write(RECORD_LENGTH.pack(len(check)) + check)
+            for record in self.entries:
+                file.write(RECORD_LENGTH.pack(len(record)) + record)
+        self.records_on_disk = len(self.entries)
+        self.file = open(self.path, "ab")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,81 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from password_engine import PasswordEngine, PasswordPolicy
+
+_worker_engine = None
+
+def _init_worker():
+    global _worker_engine
+    _worker_engine = PasswordEngine()
+
+def _format_chunk(start, passwords, fmt):
+    if fmt == "jsonl":
+        return "".join(json.dumps({"id": start + i, "password": password}) + "\n"
+                       for i, password in enumerate(passwords))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows((start + i, password) for i, password in enumerate(passwords))
+    return buffer.getvalue()
+
+def generate_chunk(start, count, policy, fmt):
+    engine = _worker_engine or PasswordEngine()
+    return count, _format_chunk(start, engine.generate_batch(count, policy), fmt)
+
+def provision(count, policy, output, fmt="csv", workers=None, chunk_size=65536, max_pending=None):
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    if fmt == "csv":
+        output.write("id,password\n")
+    written = 0
+    next_start = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        pending = set()
+        while next_start < count or pending:
+            while next_start < count and len(pending) < max_pending:
+                size = min(chunk_size, count - next_start)
+                pending.add(executor.submit(generate_chunk, next_start, size, policy, fmt))
+                next_start += size
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                size, text = future.result()
+                output.write(text)
+                written += size
+    output.flush()
+    return written
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Provision passwords in parallel across processes.")
+    parser.add_argument("-n", "--count", type=int, required=True, help="number of passwords")
+    parser.add_argument("-l", "--length", type=int, default=16, help="password length")
+    parser.add_argument("--no-uppercase", action="store_true", help="exclude uppercase letters")
+    parser.add_argument("--no-lowercase", action="store_true", help="exclude lowercase letters")
+    parser.add_argument("--no-digits", action="store_true", help="exclude digits")
+    parser.add_argument("--no-symbols", action="store_true", help="exclude special characters")
+    parser.add_argument("--allow-similar", action="store_true", help="allow 1, l, I, 0 and O")
+    parser.add_argument("-f", "--format", choices=["csv", "jsonl"], default="csv", help="output format")
+    parser.add_argument("-w", "--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="passwords per worker task")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        policy = PasswordPolicy(args.length, not args.no_uppercase, not args.no_lowercase,
+                                not args.no_digits, not args.no_symbols, not args.allow_similar)
+    except ValueError as error:
+        parser.error(str(error))
+
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        provision(args.count, policy, output, args.format, args.workers, args.chunk_size)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
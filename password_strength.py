@@ -0,0 +1,414 @@
+import argparse
+import bisect
+import csv
+import itertools
+import math
+import mmap
+import os
+import re
+import string
+import struct
+import sys
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from storage import atomic_write, data_dir
+
+COMMON_PASSWORDS = """
+123456 password 12345678 qwerty 123456789 12345 1234 111111 1234567 dragon 123123 baseball abc123
+football monkey letmein 696969 shadow master 666666 qwertyuiop 123321 mustang 1234567890 michael
+654321 superman 1qaz2wsx 7777777 121212 000000 qazwsx 123qwe killer trustno1 jordan jennifer zxcvbnm
+asdfgh hunter buster soccer harley batman andrew tigger sunshine iloveyou 2000 charlie robert thomas
+hockey ranger daniel starwars klaster 112233 george computer michelle jessica pepper 1111 zxcvbn
+555555 11111111 131313 freedom 777777 pass maggie 159753 aaaaaa ginger princess joshua cheese amanda
+summer love ashley nicole chelsea biteme matthew access yankees 987654321 dallas austin thunder taylor
+matrix mobilemail mom monitor monitoring montana moon moscow welcome admin login secret hello world
+dragon1 passw0rd password1 password123 qwerty123 abc letmein1 welcome1 admin123 root toor changeme
+default guest test user office summer2024 winter spring autumn january february march april june
+july august september october november december monday friday sunday apple orange banana cherry
+flower garden house family friend happy lucky money music orange purple silver golden diamond
+secure security system server internet google yahoo facebook twitter linkedin microsoft windows
+""".split()
+
+ENGLISH_WORDS = """
+the be to of and in that have it for not on with he as you do at this but his by from they we say
+her she or an will my one all would there their what so up out if about who get which go me when make
+can like time no just him know take people into year your good some could them see other than then
+now look only come its over think also back after use two how our work first well way even new want
+because any these give day most us cat dog sun moon star fire water earth wind tree blue red green
+black white king queen love hate life death angel devil heaven hell magic power dream night light
+dark shadow storm tiger lion eagle wolf bear snake horse dragon phoenix ninja pirate rocket
+""".split()
+
+SHIFTED = dict(zip('~!@#$%^&*()_+{}|:"<>?', "`1234567890-=[]\\;',./"))
+KEYBOARD_ROWS = ["`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./"]
+LEET = str.maketrans({"@": "a", "4": "a", "3": "e", "1": "i", "!": "i", "0": "o", "$": "s", "5": "s",
+                      "7": "t", "+": "t", "8": "b", "9": "g"})
+
+LABELS = ["Very Weak", "Weak", "Moderate", "Strong", "Very Strong"]
+LABEL_THRESHOLDS = [28, 36, 60, 80]
+REPEAT_RE = re.compile(r"(.+?)\1+", re.DOTALL)
+DIGITS_RE = re.compile(r"\d{4,}")
+
+CHARSETS = [(frozenset(string.ascii_lowercase), 26), (frozenset(string.ascii_uppercase), 26),
+            (frozenset(string.digits), 10), (frozenset(string.punctuation), 33)]
+
+INDEX_MAGIC = b"PWSTRIX1"
+HEADER = struct.Struct("<8sIIII")
+SLOT = struct.Struct("<II")
+PREFIX_ONLY = 0
+MISSING = -1
+MEMO_LIMIT = 1 << 20
+
+def default_cache_path(checksum):
+    return os.path.join(data_dir(), "cache", f"password_strength-{checksum:08x}.idx")
+
+KEYBOARD_POSITIONS = {key: (row, column) for row, keys in enumerate(KEYBOARD_ROWS)
+                      for column, key in enumerate(keys)}
+
+def build_index(words):
+    entries = {}
+    for rank, word in enumerate(words, 1):
+        word = word.lower().encode("utf-8")
+        if not word or len(word) > 255:
+            continue
+        if entries.get(word, PREFIX_ONLY) == PREFIX_ONLY:
+            entries[word] = rank
+        for end in range(1, len(word)):
+            entries.setdefault(word[:end], PREFIX_ONLY)
+    slot_count = 1
+    while slot_count < len(entries) * 2:
+        slot_count *= 2
+    slots = bytearray(SLOT.size * slot_count)
+    blob = bytearray()
+    for key, rank in entries.items():
+        slot = zlib.crc32(key) & (slot_count - 1)
+        while SLOT.unpack_from(slots, slot * SLOT.size)[0]:
+            slot = (slot + 1) & (slot_count - 1)
+        SLOT.pack_into(slots, slot * SLOT.size, len(blob) + 1, rank)
+        blob.append(len(key))
+        blob += key
+    max_length = max((len(key) for key in entries), default=0)
+    checksum = zlib.crc32("\n".join(words).encode("utf-8"))
+    header = HEADER.pack(INDEX_MAGIC, checksum, slot_count, max_length, HEADER.size + len(slots))
+    return header + bytes(slots) + bytes(blob)
+
+class DictionaryIndex:
+    def __init__(self, buffer):
+        self.buffer = buffer
+        magic, self.checksum, self.slot_count, self.max_length, self.blob_offset = HEADER.unpack_from(buffer, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError("Not a password strength index")
+        self.mask = self.slot_count - 1
+        self.memo = {}
+
+    @classmethod
+    def load(cls, words, path=None):
+        checksum = zlib.crc32("\n".join(words).encode("utf-8"))
+        path = path or default_cache_path(checksum)
+        try:
+            index = cls.open(path)
+            if index.checksum == checksum:
+                return index
+        except (OSError, ValueError, struct.error):
+            pass
+        data = build_index(words)
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            atomic_write(path, data)
+            return cls.open(path)
+        except OSError:
+            return cls(data)
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as file:
+            return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def lookup(self, text):
+        rank = self.memo.get(text)
+        if rank is None:
+            rank = self.probe(text.encode("utf-8"))
+            if len(self.memo) < MEMO_LIMIT:
+                self.memo[text] = rank
+        return rank
+
+    def probe(self, key):
+        buffer = self.buffer
+        slot = zlib.crc32(key) & self.mask
+        while True:
+            offset, rank = SLOT.unpack_from(buffer, HEADER.size + slot * SLOT.size)
+            if not offset:
+                return MISSING
+            start = self.blob_offset + offset - 1
+            length = buffer[start]
+            if length == len(key) and buffer[start + 1:start + 1 + length] == key:
+                return rank
+            slot = (slot + 1) & self.mask
+
+def cardinality(password):
+    chars = set(password)
+    size = 0
+    for charset, charset_size in CHARSETS:
+        if not chars.isdisjoint(charset):
+            size += charset_size
+    if any(not c.isascii() for c in chars):
+        size += 100
+    return max(size, 10)
+
+def uppercase_variations(word):
+    if word.islower() or not any(c.isalpha() for c in word):
+        return 1
+    if word[0].isupper() and word[1:].islower() or word.isupper():
+        return 2
+    upper = sum(1 for c in word if c.isupper())
+    lower = sum(1 for c in word if c.islower())
+    return sum(math.comb(upper + lower, i) for i in range(1, min(upper, lower) + 1))
+
+class StrengthResult:
+    def __init__(self, password, guesses_log2, patterns):
+        self.password = password
+        self.bits = guesses_log2
+        self.patterns = patterns
+        self.score = min(100, int(guesses_log2 * 100 / 80))
+        self.label = LABELS[bisect.bisect_right(LABEL_THRESHOLDS, guesses_log2)]
+
+    def feedback(self):
+        return [f"{kind.capitalize()}: '{token}'" for kind, token in self.patterns]
+
+class StrengthEstimator:
+    def __init__(self, words=None, index_path=None):
+        self.words = words or COMMON_PASSWORDS + ENGLISH_WORDS
+        self.index = DictionaryIndex.load(self.words, index_path)
+
+    def dictionary_matches(self, password):
+        lowered = password.lower()
+        variants = [(lowered, 1, False), (lowered.translate(LEET), 2, False), (lowered[::-1], 2, True)]
+        best = {}
+        max_length = self.index.max_length
+        memo = self.index.memo
+        lookup = self.index.lookup
+        for text, factor, reversed_text in variants:
+            if factor == 2 and not reversed_text and text == lowered:
+                continue
+            length = len(text)
+            for i in range(length - 2):
+                rank = memo.get(text[i:i + 2])
+                if rank is None:
+                    rank = lookup(text[i:i + 2])
+                if rank == MISSING:
+                    continue
+                for j in range(i + 3, min(length, i + max_length) + 1):
+                    key = text[i:j]
+                    rank = memo.get(key)
+                    if rank is None:
+                        rank = lookup(key)
+                    if rank == MISSING:
+                        break
+                    if rank == PREFIX_ONLY:
+                        continue
+                    start, end = (length - j, length - i) if reversed_text else (i, j)
+                    guesses = rank * uppercase_variations(password[start:end]) * factor
+                    if guesses < best.get((start, end), math.inf):
+                        best[(start, end)] = guesses
+        return [(start, end, guesses, "dictionary word") for (start, end), guesses in best.items()]
+
+    def repeat_matches(self, password):
+        matches = []
+        for match in REPEAT_RE.finditer(password):
+            base = match.group(1)
+            count = len(match.group(0)) // len(base)
+            if len(base) == 1:
+                if count >= 3:
+                    matches.append((match.start(), match.end(), 10 * count, "repeated characters"))
+            else:
+                guesses = 2 ** self.estimate(base).bits * count
+                matches.append((match.start(), match.end(), guesses, "repeated sequence"))
+        return matches
+
+    @staticmethod
+    def sequence_matches(password):
+        matches = []
+        length = len(password)
+        i = 0
+        while i < length - 2:
+            delta = ord(password[i + 1]) - ord(password[i])
+            j = i + 1
+            if abs(delta) == 1:
+                while j + 1 < length and ord(password[j + 1]) - ord(password[j]) == delta:
+                    j += 1
+            if j - i + 1 >= 3:
+                start_char = password[i]
+                base = 4 if start_char in "aAzZ019" else (10 if start_char.isdigit() else 26)
+                guesses = base * (j - i + 1) * (2 if delta < 0 else 1)
+                matches.append((i, j + 1, guesses, "sequence"))
+                i = j + 1
+            else:
+                i += 1
+        return matches
+
+    @staticmethod
+    def keyboard_matches(password):
+        matches = []
+        positions = [KEYBOARD_POSITIONS.get(SHIFTED.get(c, c.lower())) for c in password]
+        length = len(positions)
+        i = 0
+        while i < length - 3:
+            j = i
+            turns = 0
+            direction = None
+            while j + 1 < length and positions[j] and positions[j + 1]:
+                step = (positions[j + 1][0] - positions[j][0], positions[j + 1][1] - positions[j][1])
+                if step == (0, 0) or abs(step[0]) > 1 or abs(step[1]) > 1:
+                    break
+                if step != direction:
+                    turns += 1
+                    direction = step
+                j += 1
+            if j - i + 1 >= 4:
+                matches.append((i, j + 1, 47 * 4 ** turns * (j - i + 1), "keyboard pattern"))
+                i = j + 1
+            else:
+                i += 1
+        return matches
+
+    @staticmethod
+    def date_matches(password):
+        matches = []
+        for run in DIGITS_RE.finditer(password):
+            digits = run.group(0)
+            for size in (4, 6, 8):
+                for i in range(len(digits) - size + 1):
+                    token = digits[i:i + size]
+                    start = run.start() + i
+                    if size == 4 and 1900 <= int(token) <= 2099:
+                        matches.append((start, start + size, 200, "year"))
+                    elif size > 4 and _looks_like_date(token):
+                        matches.append((start, start + size, 365 * 200, "date"))
+        return matches
+
+    def estimate(self, password):
+        if not password:
+            return StrengthResult(password, 0.0, [])
+        matches = (self.dictionary_matches(password) + self.repeat_matches(password)
+                   + self.sequence_matches(password) + self.keyboard_matches(password)
+                   + self.date_matches(password))
+        ending = {}
+        for match in matches:
+            ending.setdefault(match[1], []).append(match)
+        bruteforce = math.log2(cardinality(password))
+        length = len(password)
+        best = [0.0] + [math.inf] * length
+        choice = [None] * (length + 1)
+        for end in range(1, length + 1):
+            best[end] = best[end - 1] + bruteforce
+            choice[end] = None
+            for start, _, guesses, kind in ending.get(end, ()):
+                cost = best[start] + math.log2(max(guesses, 1)) + 1
+                if cost < best[end]:
+                    best[end] = cost
+                    choice[end] = (start, kind)
+        patterns = []
+        end = length
+        while end > 0:
+            if choice[end] is None:
+                end -= 1
+            else:
+                start, kind = choice[end]
+                patterns.append((kind, password[start:end]))
+                end = start
+        patterns.reverse()
+        return StrengthResult(password, best[length], patterns)
+
+    def estimate_batch(self, passwords):
+        results = {}
+        estimate = self.estimate
+        for password in passwords:
+            if password not in results:
+                results[password] = estimate(password)
+        return [results[password] for password in passwords]
+
+def _looks_like_date(token):
+    candidates = []
+    if len(token) == 8:
+        candidates = [(token[:4], token[4:6], token[6:]), (token[4:], token[2:4], token[:2]), (token[4:], token[:2], token[2:4])]
+    else:
+        candidates = [("19" + token[4:], token[2:4], token[:2]), ("19" + token[4:], token[:2], token[2:4]),
+                      ("19" + token[:2], token[2:4], token[4:])]
+    for year, month, day in candidates:
+        if 1900 <= int(year) <= 2099 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
+            return True
+    return False
+
+_default_estimator = None
+_estimator_lock = threading.Lock()
+
+def get_estimator():
+    global _default_estimator
+    with _estimator_lock:
+        if _default_estimator is None:
+            _default_estimator = StrengthEstimator()
+    return _default_estimator
+
+def estimate(password):
+    return get_estimator().estimate(password)
+
+def load_wordlist(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        return [line.strip() for line in file if line.strip()]
+
+def _init_worker(words):
+    global _default_estimator
+    if words:
+        _default_estimator = StrengthEstimator(words)
+
+def _estimate_chunk(passwords):
+    return get_estimator().estimate_batch(passwords)
+
+def estimate_batch(passwords, workers=1, chunk_size=65536, words=None):
+    if workers == 1:
+        return get_estimator().estimate_batch(passwords)
+    passwords = list(passwords)
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(words,)) as executor:
+        return [result for chunk in executor.map(_estimate_chunk, chunks) for result in chunk]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate password strength in bulk.")
+    parser.add_argument("file", nargs="?", help="one password per line (default: stdin)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="worker processes (0: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=65536, help="passwords per batch")
+    parser.add_argument("--wordlist", help="ranked dictionary, one word per line (most common first)")
+    parser.add_argument("--summary", action="store_true", help="print counts per strength label only")
+    args = parser.parse_args(argv)
+
+    global _default_estimator
+    workers = args.workers or os.cpu_count() or 1
+    words = load_wordlist(args.wordlist) if args.wordlist else None
+    if words:
+        _default_estimator = StrengthEstimator(words)
+    stream = open(args.file, "r", encoding="utf-8", errors="replace") if args.file else sys.stdin
+    counts = {}
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    if not args.summary:
+        writer.writerow(["password", "bits", "score", "label", "patterns"])
+    try:
+        while True:
+            chunk = [line.rstrip("\r\n") for line in itertools.islice(stream, args.chunk_size * workers)]
+            if not chunk:
+                break
+            for result in estimate_batch(chunk, workers, args.chunk_size, words):
+                counts[result.label] = counts.get(result.label, 0) + 1
+                if not args.summary:
+                    writer.writerow([result.password, f"{result.bits:.1f}", result.score, result.label,
+                                     "; ".join(result.feedback())])
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    if args.summary:
+        for label in LABELS:
+            print(f"{label}: {counts.get(label, 0)}")
+
+if __name__ == "__main__":
+    main()
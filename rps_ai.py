@@ -0,0 +1,177 @@
+import struct
+from array import array
+
+from storage import atomic_write
+from rps_engine import RandomStrategy, Strategy, beats
+
+MODEL_MAGIC = b"RPSAI01\n"
+MODEL_HEADER = struct.Struct("<BH")
+PREDICTOR_HEADER = struct.Struct("<BId")
+MAX_ROW_COUNT = 1024
+DECAY = 0.9
+
+class MarkovPredictor:
+    def __init__(self, order=1, max_row_count=MAX_ROW_COUNT):
+        self.order = order
+        self.max_row_count = max_row_count
+        self.contexts = 3 ** order
+        self.counts = array("I", bytes(4 * 3 * self.contexts))
+        self.context = 0
+        self.seen = 0
+
+    def predict(self):
+        if self.seen < self.order:
+            return None
+        base = self.context * 3
+        counts = self.counts
+        rock, paper, scissors = counts[base], counts[base + 1], counts[base + 2]
+        if rock == paper == scissors == 0:
+            return None
+        if rock >= paper and rock >= scissors:
+            return 0
+        return 1 if paper >= scissors else 2
+
+    def update(self, move):
+        if self.seen >= self.order:
+            index = self.context * 3 + move
+            self.counts[index] += 1
+            if self.counts[index] >= self.max_row_count:
+                base = self.context * 3
+                for i in range(base, base + 3):
+                    self.counts[i] //= 2
+        if self.order:
+            self.context = (self.context * 3 + move) % self.contexts
+        self.seen += 1
+
+    def reset_context(self):
+        self.context = 0
+        self.seen = 0
+
+    def to_bytes(self):
+        return self.counts.tobytes()
+
+    def load_bytes(self, data):
+        counts = array("I")
+        counts.frombytes(data)
+        if len(counts) != len(self.counts):
+            raise ValueError("Model size does not match predictor order")
+        self.counts = counts
+
+class PredictorStrategy(Strategy):
+    def __init__(self, predictors, rng=None):
+        super().__init__(rng)
+        self.predictors = predictors
+        self.prediction = None
+
+    def next_move(self):
+        self.prediction = self.predict()
+        if self.prediction is None:
+            return self.rng.randrange(3)
+        return beats(self.prediction)
+
+    def predict(self):
+        return self.predictors[0].predict()
+
+    def observe(self, own, opponent):
+        super().observe(own, opponent)
+        for predictor in self.predictors:
+            predictor.update(opponent)
+
+    def reset(self):
+        super().reset()
+        for predictor in self.predictors:
+            predictor.reset_context()
+
+class FrequencyStrategy(PredictorStrategy):
+    name = "frequency"
+
+    def __init__(self, rng=None):
+        super().__init__([MarkovPredictor(0)], rng)
+
+class MarkovStrategy(PredictorStrategy):
+    name = "markov"
+
+    def __init__(self, order=2, rng=None):
+        super().__init__([MarkovPredictor(order)], rng)
+        self.name = f"markov{order}"
+
+class EnsembleStrategy(PredictorStrategy):
+    name = "ensemble"
+
+    def __init__(self, orders=(0, 1, 2, 3, 4), decay=DECAY, rng=None):
+        super().__init__([MarkovPredictor(order) for order in orders], rng)
+        self.decay = decay
+        self.scores = [0.0] * len(self.predictors)
+        self.predictions = [None] * len(self.predictors)
+        self.current = 0
+
+    def predict(self):
+        self.predictions = [predictor.predict() for predictor in self.predictors]
+        best = None
+        for i, prediction in enumerate(self.predictions):
+            if prediction is not None and (best is None or self.scores[i] > self.scores[best]):
+                best = i
+        self.current = best
+        return None if best is None else self.predictions[best]
+
+    def observe(self, own, opponent):
+        decay = self.decay
+        for i, prediction in enumerate(self.predictions):
+            if prediction is not None:
+                self.scores[i] = self.scores[i] * decay + (1.0 if prediction == opponent else -0.5)
+        super().observe(own, opponent)
+
+OPPONENTS = {
+    "Random": RandomStrategy,
+    "Frequency": FrequencyStrategy,
+    "Markov (order 1)": lambda rng=None: MarkovStrategy(1, rng),
+    "Markov (order 2)": lambda rng=None: MarkovStrategy(2, rng),
+    "Markov (order 3)": lambda rng=None: MarkovStrategy(3, rng),
+    "Ensemble": EnsembleStrategy,
+}
+
+def make_opponents(rng=None):
+    return {name: factory(rng=rng) for name, factory in OPPONENTS.items()}
+
+def save_models(path, opponents):
+    chunks = [MODEL_MAGIC, struct.pack("<H", len(opponents))]
+    for name, strategy in opponents.items():
+        encoded = name.encode("utf-8")
+        predictors = getattr(strategy, "predictors", [])
+        chunks.append(MODEL_HEADER.pack(len(encoded), len(predictors)))
+        chunks.append(encoded)
+        scores = getattr(strategy, "scores", [0.0] * len(predictors))
+        for predictor, score in zip(predictors, scores):
+            data = predictor.to_bytes()
+            chunks.append(PREDICTOR_HEADER.pack(predictor.order, len(data), score))
+            chunks.append(data)
+    atomic_write(path, b"".join(chunks))
+
+def load_models(path, opponents):
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return False
+    if not data.startswith(MODEL_MAGIC):
+        raise ValueError("Not an RPS model file")
+    offset = len(MODEL_MAGIC)
+    (count,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    for _ in range(count):
+        name_length, predictor_count = MODEL_HEADER.unpack_from(data, offset)
+        offset += MODEL_HEADER.size
+        name = data[offset:offset + name_length].decode("utf-8")
+        offset += name_length
+        strategy = opponents.get(name)
+        predictors = getattr(strategy, "predictors", [])
+        for i in range(predictor_count):
+            order, size, score = PREDICTOR_HEADER.unpack_from(data, offset)
+            offset += PREDICTOR_HEADER.size
+            payload = data[offset:offset + size]
+            offset += size
+            if i < len(predictors) and predictors[i].order == order:
+                predictors[i].load_bytes(payload)
+                if hasattr(strategy, "scores"):
+                    strategy.scores[i] = score
+    return True
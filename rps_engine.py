@@ -0,0 +1,437 @@
+import argparse
+import math
+import random
+import re
+import time
+from datetime import date, datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHOICES = ["Rock", "Paper", "Scissors"]
+ROCK, PAPER, SCISSORS = range(3)
+TIE, WIN, LOSS = range(3)
+RESULTS = ["Tie", "Win", "Loss"]
+OUTCOMES = [[(player - computer) % 3 for computer in range(3)] for player in range(3)]
+
+def move_index(choice):
+    return choice if isinstance(choice, int) else CHOICES.index(choice)
+
+def beats(move):
+    return (move + 1) % 3
+
+def determine_winner(player_choice, computer_choice):
+    return RESULTS[OUTCOMES[move_index(player_choice)][move_index(computer_choice)]]
+
+class GameState:
+    def __init__(self):
+        self.user_score = 0
+        self.computer_score = 0
+        self.rounds_played = 0
+        self.current_streak = 0
+        self.best_streak = 0
+
+    def record(self, result):
+        self.rounds_played += 1
+        if result == "Win":
+            self.user_score += 1
+            self.current_streak += 1
+            self.best_streak = max(self.best_streak, self.current_streak)
+        else:
+            self.current_streak = 0
+            if result == "Loss":
+                self.computer_score += 1
+
+LEGACY_ENTRY_RE = re.compile(r"(\d\d:\d\d:\d\d) - (\w+) vs (\w+): (\w+)")
+
+class RoundRecord:
+    def __init__(self, player, computer, result, opponent="random", timestamp=None):
+        self.player = player
+        self.computer = computer
+        self.result = result
+        self.opponent = opponent
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    @property
+    def result_name(self):
+        return RESULTS[self.result]
+
+    def format(self):
+        clock = datetime.fromtimestamp(self.timestamp).strftime("%H:%M:%S")
+        return f"{clock} - {CHOICES[self.player]} vs {CHOICES[self.computer]}: {RESULTS[self.result]}"
+
+    def to_dict(self):
+        return {"player": self.player, "computer": self.computer, "result": self.result,
+                "opponent": self.opponent, "timestamp": self.timestamp}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["player"], data["computer"], data["result"], data["opponent"], data["timestamp"])
+
+    @classmethod
+    def parse_legacy(cls, entry):
+        match = LEGACY_ENTRY_RE.match(entry.strip())
+        if not match or match.group(4) not in RESULTS:
+            return None
+        clock, player, computer, result = match.groups()
+        played = datetime.combine(date.today(), datetime.strptime(clock, "%H:%M:%S").time())
+        return cls(move_index(player), move_index(computer), RESULTS.index(result), "random", played.timestamp())
+
+class RoundStats:
+    def __init__(self):
+        self.rounds = 0
+        self.results = [0, 0, 0]
+        self.choice_counts = [0, 0, 0]
+        self.current_streak = 0
+        self.best_streak = 0
+        self.leading_streak = 0
+        self.by_opponent = {}
+
+    @property
+    def wins(self):
+        return self.results[WIN]
+
+    @property
+    def losses(self):
+        return self.results[LOSS]
+
+    @property
+    def ties(self):
+        return self.results[TIE]
+
+    def record(self, record):
+        self.rounds += 1
+        self.results[record.result] += 1
+        self.choice_counts[record.player] += 1
+        if record.result == WIN:
+            self.current_streak += 1
+            if self.current_streak > self.best_streak:
+                self.best_streak = self.current_streak
+            if self.current_streak == sum(self.results):
+                self.leading_streak = self.current_streak
+        else:
+            self.current_streak = 0
+        opponent = self.by_opponent.get(record.opponent)
+        if opponent is None:
+            opponent = self.by_opponent[record.opponent] = [0, 0, 0]
+        opponent[record.result] += 1
+
+    def merge(self, later):
+        merged = RoundStats()
+        merged.rounds = self.rounds + later.rounds
+        merged.results = [a + b for a, b in zip(self.results, later.results)]
+        merged.choice_counts = [a + b for a, b in zip(self.choice_counts, later.choice_counts)]
+        self_all_wins = self.leading_streak == sum(self.results)
+        later_all_wins = later.leading_streak == sum(later.results)
+        merged.leading_streak = self.leading_streak + later.leading_streak if self_all_wins else self.leading_streak
+        merged.current_streak = self.current_streak + later.current_streak if later_all_wins else later.current_streak
+        merged.best_streak = max(self.best_streak, later.best_streak, self.current_streak + later.leading_streak)
+        merged.by_opponent = {name: list(counts) for name, counts in self.by_opponent.items()}
+        for name, counts in later.by_opponent.items():
+            totals = merged.by_opponent.setdefault(name, [0, 0, 0])
+            for i in range(3):
+                totals[i] += counts[i]
+        return merged
+
+    def win_rate(self):
+        tracked = sum(self.results)
+        return self.wins / tracked if tracked else 0.0
+
+    def most_picked(self):
+        if not self.rounds:
+            return None
+        return CHOICES[max(range(3), key=self.choice_counts.__getitem__)]
+
+    def opponent_results(self, opponent):
+        return self.by_opponent.get(opponent, [0, 0, 0])
+
+    def to_dict(self):
+        return {"rounds": self.rounds, "results": self.results, "choice_counts": self.choice_counts,
+                "current_streak": self.current_streak, "best_streak": self.best_streak,
+                "leading_streak": self.leading_streak, "by_opponent": self.by_opponent}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.rounds = data["rounds"]
+        stats.results = list(data["results"])
+        stats.choice_counts = list(data["choice_counts"])
+        stats.current_streak = data["current_streak"]
+        stats.best_streak = data["best_streak"]
+        stats.leading_streak = data.get("leading_streak", 0)
+        stats.by_opponent = {name: list(counts) for name, counts in data["by_opponent"].items()}
+        return stats
+
+class Strategy:
+    name = None
+    reactive = False
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self.last_own = None
+        self.last_opponent = None
+
+    def next_move(self):
+        raise NotImplementedError
+
+    def observe(self, own, opponent):
+        self.last_own = own
+        self.last_opponent = opponent
+
+    def reset(self):
+        self.last_own = None
+        self.last_opponent = None
+
+class RandomStrategy(Strategy):
+    name = "random"
+
+    def next_move(self):
+        return self.rng.randrange(3)
+
+    def sample(self, rounds, generator):
+        return generator.integers(0, 3, rounds, dtype=np.uint8)
+
+class BiasedStrategy(Strategy):
+    name = "biased"
+
+    def __init__(self, weights=(0.5, 0.3, 0.2), rng=None):
+        super().__init__(rng)
+        total = sum(weights)
+        self.weights = [weight / total for weight in weights]
+
+    def next_move(self):
+        return self.rng.choices(range(3), self.weights)[0]
+
+    def sample(self, rounds, generator):
+        return generator.choice(3, rounds, p=self.weights).astype(np.uint8)
+
+class ConstantStrategy(Strategy):
+    name = "constant"
+
+    def __init__(self, move=ROCK, rng=None):
+        super().__init__(rng)
+        self.move = move_index(move)
+        self.name = CHOICES[self.move].lower()
+
+    def next_move(self):
+        return self.move
+
+    def sample(self, rounds, generator):
+        return np.full(rounds, self.move, dtype=np.uint8)
+
+class CycleStrategy(Strategy):
+    name = "cycle"
+
+    def __init__(self, sequence=(ROCK, PAPER, SCISSORS), rng=None):
+        super().__init__(rng)
+        self.sequence = [move_index(move) for move in sequence]
+        self.position = 0
+
+    def next_move(self):
+        move = self.sequence[self.position]
+        self.position = (self.position + 1) % len(self.sequence)
+        return move
+
+    def reset(self):
+        super().reset()
+        self.position = 0
+
+    def sample(self, rounds, generator):
+        return np.resize(np.array(self.sequence, dtype=np.uint8), rounds)
+
+class ReactiveStrategy(Strategy):
+    reactive = True
+    table = None
+
+    def next_move(self):
+        if self.last_own is None:
+            return self.rng.randrange(3)
+        return self.table[self.last_own][self.last_opponent]
+
+class BeatLastStrategy(ReactiveStrategy):
+    name = "beat_last"
+    table = [[beats(opponent) for opponent in range(3)] for own in range(3)]
+
+class CopyLastStrategy(ReactiveStrategy):
+    name = "copy_last"
+    table = [[opponent for opponent in range(3)] for own in range(3)]
+
+class WinStayLoseShiftStrategy(ReactiveStrategy):
+    name = "win_stay_lose_shift"
+    table = [[own if OUTCOMES[own][opponent] == WIN else beats(opponent) for opponent in range(3)]
+             for own in range(3)]
+
+STRATEGIES = {
+    "random": RandomStrategy,
+    "biased": BiasedStrategy,
+    "rock": lambda rng=None: ConstantStrategy(ROCK, rng),
+    "paper": lambda rng=None: ConstantStrategy(PAPER, rng),
+    "scissors": lambda rng=None: ConstantStrategy(SCISSORS, rng),
+    "cycle": CycleStrategy,
+    "beat_last": BeatLastStrategy,
+    "copy_last": CopyLastStrategy,
+    "win_stay_lose_shift": WinStayLoseShiftStrategy,
+}
+
+def make_strategy(name, rng=None):
+    try:
+        factory = STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown strategy {name!r}") from None
+    strategy = factory(rng=rng)
+    strategy.name = name
+    return strategy
+
+class RPSEngine:
+    def __init__(self, strategy=None, state=None, stats=None, opponent=None):
+        self.strategy = strategy or RandomStrategy()
+        self.opponent = opponent or self.strategy.name
+        self.state = state or GameState()
+        self.stats = stats or RoundStats()
+
+    def play(self, player_choice):
+        player = move_index(player_choice)
+        computer = self.strategy.next_move()
+        self.strategy.observe(computer, player)
+        record = RoundRecord(player, computer, OUTCOMES[player][computer], self.opponent)
+        self.state.record(record.result_name)
+        self.stats.record(record)
+        return record
+
+def play_match(first, second, rounds):
+    outcomes = [0, 0, 0]
+    for _ in range(rounds):
+        a = first.next_move()
+        b = second.next_move()
+        first.observe(a, b)
+        second.observe(b, a)
+        outcomes[OUTCOMES[a][b]] += 1
+    return outcomes[WIN], outcomes[LOSS], outcomes[TIE]
+
+def _compose_prefix(maps):
+    composed = maps.copy()
+    shift = 1
+    while shift < len(composed):
+        composed[shift:] = np.take_along_axis(composed[shift:], composed[:-shift], axis=1)
+        shift *= 2
+    return composed
+
+def _respond(strategy, opponent_moves, generator):
+    table = np.array(strategy.table, dtype=np.uint8)
+    moves = np.empty(len(opponent_moves), dtype=np.uint8)
+    moves[0] = generator.integers(3)
+    if len(moves) > 1:
+        maps = np.ascontiguousarray(table[:, opponent_moves[:-1]].T)
+        moves[1:] = _compose_prefix(maps)[:, moves[0]]
+    return moves
+
+def _play_reactive_pair(first, second, rounds, generator):
+    table_a = first.table
+    table_b = second.table
+    state = (int(generator.integers(3)), int(generator.integers(3)))
+    seen = {}
+    sequence = []
+    while state not in seen:
+        seen[state] = len(sequence)
+        sequence.append(state)
+        a, b = state
+        state = (table_a[a][b], table_b[b][a])
+    prefix = np.array(sequence[:seen[state]], dtype=np.uint8).reshape(-1, 2)
+    cycle = np.array(sequence[seen[state]:], dtype=np.uint8).reshape(-1, 2)
+    moves = np.concatenate([prefix[:rounds], np.resize(cycle, (max(rounds - len(prefix), 0), 2))])
+    return moves[:, 0], moves[:, 1]
+
+def vectorizable(strategy):
+    return hasattr(strategy, "sample") or getattr(strategy, "table", None) is not None
+
+def simulate_moves(first, second, rounds, generator):
+    if first.reactive and second.reactive:
+        return _play_reactive_pair(first, second, rounds, generator)
+    if first.reactive:
+        b = second.sample(rounds, generator)
+        return _respond(first, b, generator), b
+    a = first.sample(rounds, generator)
+    if second.reactive:
+        return a, _respond(second, a, generator)
+    return a, second.sample(rounds, generator)
+
+def wilson_interval(successes, trials, z=1.96):
+    if trials == 0:
+        return 0.0, 0.0
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (rate + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return centre - margin, centre + margin
+
+class TournamentResult:
+    def __init__(self, name):
+        self.name = name
+        self.wins = 0
+        self.losses = 0
+        self.ties = 0
+
+    @property
+    def rounds(self):
+        return self.wins + self.losses + self.ties
+
+    @property
+    def win_rate(self):
+        return self.wins / self.rounds if self.rounds else 0.0
+
+    def confidence_interval(self, z=1.96):
+        return wilson_interval(self.wins, self.rounds, z)
+
+def run_tournament(strategies, rounds, seed=None, chunk_size=1 << 22):
+    if np is None:
+        raise RuntimeError("The vectorized tournament requires NumPy")
+    generator = np.random.default_rng(seed)
+    outcome_table = np.array(OUTCOMES, dtype=np.uint8)
+    results = {strategy.name: TournamentResult(strategy.name) for strategy in strategies}
+    pairings = {}
+    for i, first in enumerate(strategies):
+        for second in strategies[i + 1:]:
+            counts = np.zeros(3, dtype=np.int64)
+            if not (vectorizable(first) and vectorizable(second)):
+                first.reset()
+                second.reset()
+                wins, losses, ties = play_match(first, second, rounds)
+                counts += (ties, wins, losses)
+            elif first.reactive and second.reactive:
+                a, b = simulate_moves(first, second, rounds, generator)
+                counts += np.bincount(outcome_table[a, b], minlength=3)
+            else:
+                for start in range(0, rounds, chunk_size):
+                    a, b = simulate_moves(first, second, min(chunk_size, rounds - start), generator)
+                    counts += np.bincount(outcome_table[a, b], minlength=3)
+            ties, wins, losses = (int(count) for count in counts)
+            pairings[(first.name, second.name)] = (wins, losses, ties)
+            for name, won, lost in ((first.name, wins, losses), (second.name, losses, wins)):
+                results[name].wins += won
+                results[name].losses += lost
+                results[name].ties += ties
+    return results, pairings
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Rock-Paper-Scissors strategies against each other.")
+    parser.add_argument("-n", "--rounds", type=int, default=1_000_000, help="rounds per pairing")
+    parser.add_argument("-s", "--strategies", default=",".join(STRATEGIES),
+                        help=f"comma-separated strategies ({', '.join(STRATEGIES)})")
+    parser.add_argument("--seed", type=int, help="random seed")
+    args = parser.parse_args(argv)
+
+    try:
+        strategies = [make_strategy(name.strip()) for name in args.strategies.split(",")]
+        results, _ = run_tournament(strategies, args.rounds, args.seed)
+    except (ValueError, RuntimeError) as error:
+        parser.error(str(error))
+
+    print(f"{'strategy':<22} {'rounds':>12} {'win rate':>9} {'95% CI':>19}")
+    for result in sorted(results.values(), key=lambda result: result.win_rate, reverse=True):
+        low, high = result.confidence_interval()
+        print(f"{result.name:<22} {result.rounds:>12,} {result.win_rate:>8.2%} [{low:>7.2%}, {high:>7.2%}]")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+from rps_engine import WIN, RoundRecord, RoundStats
+from storage import FileLock
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LOG_MAGIC = b"RPSLOG2\0"
+LEGACY_MAGIC = b"RPSLOG1\0"
+HEADER_SIZE = 512
+HEADER = struct.Struct("<8sqqq")
+LEGACY_HEADER = struct.Struct("<8sq")
+COUNTERS = struct.Struct("<qq")
+COUNTERS_OFFSET = LEGACY_HEADER.size
+NAMES_OFFSET = HEADER.size
+NAMES_SIZE = HEADER_SIZE - NAMES_OFFSET
+RECORD = struct.Struct("<BBH")
+RECORD_SIZE = RECORD.size
+MAX_DELTA = 0xFFFF
+TIME_GAP = 0xFF
+SESSION_START = 0xFE
+CHUNK_RECORDS = 1 << 24
+
+def pack_moves(record):
+    return record.player | record.computer << 2 | record.result << 4
+
+def parse_header(header):
+    if len(header) < HEADER_SIZE:
+        raise ValueError("Not an RPS round log")
+    magic = header[:len(LOG_MAGIC)]
+    if magic == LOG_MAGIC:
+        _, base_time, last_time, count = HEADER.unpack_from(header, 0)
+        names = bytes(header[NAMES_OFFSET:HEADER_SIZE])
+    elif magic == LEGACY_MAGIC:
+        _, base_time = LEGACY_HEADER.unpack_from(header, 0)
+        last_time, count = base_time, 0
+        names = bytes(header[LEGACY_HEADER.size:HEADER_SIZE])
+    else:
+        raise ValueError("Not an RPS round log")
+    names = names.rstrip(b"\0")
+    return magic, base_time, last_time, count, names.decode("utf-8").split("\0") if names else []
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([("moves", "u1"), ("opponent", "u1"), ("delta", "<u2")])
+
+class RoundLog:
+    def __init__(self, path="rps_rounds.log", flush_interval=1.0, batch_records=4096):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_bytes = batch_records * RECORD_SIZE
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.closed = threading.Event()
+        self.pending = bytearray()
+        self.names = []
+        self.base_time = 0
+        self.last_time = 0
+        self.record_count = 0
+        self.file = None
+        self.writer = None
+        self.file_lock = FileLock(path)
+
+    def open(self):
+        self.file_lock.acquire(timeout=0)
+        if not os.path.exists(self.path):
+            self.base_time = int(time.time())
+            header = bytearray(HEADER_SIZE)
+            HEADER.pack_into(header, 0, LOG_MAGIC, self.base_time, self.base_time, 0)
+            with open(self.path, "wb") as file:
+                file.write(header)
+        self.file = open(self.path, "r+b")
+        try:
+            magic, self.base_time, last_time, count, self.names = parse_header(self.file.read(HEADER_SIZE))
+            if magic == LEGACY_MAGIC:
+                self.write_header()
+        except ValueError:
+            self.file.close()
+            self.file_lock.release()
+            raise
+        size = os.path.getsize(self.path)
+        valid = HEADER_SIZE + (size - HEADER_SIZE) // RECORD_SIZE * RECORD_SIZE
+        if valid != size:
+            self.file.truncate(valid)
+        self.record_count = (valid - HEADER_SIZE) // RECORD_SIZE
+        if count == self.record_count and magic == LOG_MAGIC:
+            self.last_time = last_time
+        else:
+            with RoundLogView(self.path) as view:
+                self.last_time = self.base_time + view.total_delta()
+            self.write_counters()
+        self.file.seek(0, os.SEEK_END)
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+        return self
+
+    def write_header(self):
+        names = "\0".join(self.names).encode("utf-8")
+        if len(names) > NAMES_SIZE:
+            raise ValueError("Too many opponents in the round log")
+        self.file.seek(0)
+        self.file.write(HEADER.pack(LOG_MAGIC, self.base_time, self.base_time, 0) + names.ljust(NAMES_SIZE, b"\0"))
+        self.file.flush()
+
+    def write_counters(self):
+        position = self.file.tell()
+        self.file.seek(COUNTERS_OFFSET)
+        self.file.write(COUNTERS.pack(self.last_time, self.record_count))
+        self.file.seek(position)
+
+    def opponent_id(self, name):
+        try:
+            return self.names.index(name)
+        except ValueError:
+            pass
+        names = "\0".join(self.names + [name]).encode("utf-8")
+        if len(names) > NAMES_SIZE or len(self.names) >= 0xFF:
+            raise ValueError("Too many opponents in the round log")
+        with self.lock:
+            position = self.file.tell()
+            self.file.seek(NAMES_OFFSET)
+            self.file.write(names.ljust(NAMES_SIZE, b"\0"))
+            self.file.seek(position)
+            self.names.append(name)
+        return len(self.names) - 1
+
+    def encode_delta(self, timestamp, moves, opponent):
+        now = max(int(timestamp), self.last_time)
+        delta = now - self.last_time
+        chunks = []
+        while delta > MAX_DELTA:
+            chunks.append(RECORD.pack(TIME_GAP, 0, MAX_DELTA))
+            delta -= MAX_DELTA
+        chunks.append(RECORD.pack(moves, opponent, delta))
+        self.last_time = now
+        return b"".join(chunks)
+
+    def start_session(self, timestamp=None):
+        with self.lock:
+            self.pending += self.encode_delta(time.time() if timestamp is None else timestamp, SESSION_START, 0)
+
+    def append(self, record):
+        opponent = self.opponent_id(record.opponent)
+        with self.lock:
+            self.pending += self.encode_delta(record.timestamp, pack_moves(record), opponent)
+            if len(self.pending) >= self.batch_bytes:
+                self.wake.set()
+
+    def write_loop(self):
+        while not self.closed.is_set():
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            if not self.pending or self.file is None:
+                return
+            self.file.write(self.pending)
+            self.record_count += len(self.pending) // RECORD_SIZE
+            self.write_counters()
+            self.file.flush()
+            self.pending = bytearray()
+
+    def close(self):
+        if self.file is None:
+            return
+        self.closed.set()
+        self.wake.set()
+        self.writer.join()
+        self.flush()
+        with self.lock:
+            self.file.close()
+            self.file = None
+        self.file_lock.release()
+
+class RoundLogView:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        size = os.path.getsize(path)
+        self.count = max(size - HEADER_SIZE, 0) // RECORD_SIZE
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            _, self.base_time, self.last_time, self.last_count, self.names = parse_header(self.buffer)
+        except ValueError:
+            self.close()
+            raise
+        self.total = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+        self.file.close()
+
+    def records(self, start=0, stop=None):
+        stop = self.count if stop is None else stop
+        if np is not None:
+            return np.frombuffer(self.buffer, RECORD_DTYPE, stop - start, HEADER_SIZE + start * RECORD_SIZE)
+        return [RECORD.unpack_from(self.buffer, HEADER_SIZE + i * RECORD_SIZE) for i in range(start, stop)]
+
+    def total_delta(self):
+        if self.total is None:
+            if 0 < self.last_count <= self.count:
+                self.total = self.last_time - self.base_time + self.sum_deltas(self.last_count)
+            else:
+                self.total = self.sum_deltas()
+        return self.total
+
+    def sum_deltas(self, first=0):
+        if np is not None:
+            total = 0
+            for start in range(first, self.count, CHUNK_RECORDS):
+                chunk = self.records(start, min(start + CHUNK_RECORDS, self.count))
+                total += int(chunk["delta"].sum(dtype=np.int64))
+            return total
+        return sum(record[2] for record in self.records(first))
+
+    def recent(self, count):
+        start = max(self.count - count, 0)
+        tail = self.records(start)
+        moment = self.base_time + self.total_delta()
+        rows = [tuple(int(value) for value in row) for row in tail]
+        stamps = []
+        for moves, opponent, delta in reversed(rows):
+            stamps.append(moment)
+            moment -= delta
+        result = []
+        for (moves, opponent, delta), stamp in zip(rows, reversed(stamps)):
+            if moves < SESSION_START:
+                result.append(RoundRecord(moves & 3, moves >> 2 & 3, moves >> 4 & 3, self.names[opponent], stamp))
+        return result
+
+    def aggregate(self):
+        if np is None:
+            return self.aggregate_python()
+        stats = RoundStats()
+        high_score = 0
+        session_wins = 0
+        for start in range(0, self.count, CHUNK_RECORDS):
+            chunk = self.records(start, min(start + CHUNK_RECORDS, self.count))
+            chunk_stats, session_wins, chunk_high = self.aggregate_chunk(chunk, session_wins)
+            stats = stats.merge(chunk_stats)
+            high_score = max(high_score, chunk_high)
+        return stats, high_score
+
+    def aggregate_chunk(self, chunk, session_wins):
+        moves = chunk["moves"]
+        is_round = moves < SESSION_START
+        rounds = moves[is_round]
+        results = rounds >> 4 & 3
+        wins = results == WIN
+        stats = RoundStats()
+        stats.rounds = len(rounds)
+        stats.results = np.bincount(results, minlength=3)[:3].tolist()
+        stats.choice_counts = np.bincount(rounds & 3, minlength=3)[:3].tolist()
+        breaks = np.flatnonzero(~wins)
+        runs = np.diff(np.concatenate(([-1], breaks, [len(rounds)]))) - 1
+        stats.leading_streak = int(runs[0])
+        stats.current_streak = int(runs[-1])
+        stats.best_streak = int(runs.max())
+        opponents = chunk["opponent"][is_round].astype(np.int64)
+        totals = np.bincount(opponents * 3 + results, minlength=3 * len(self.names)).reshape(-1, 3)
+        stats.by_opponent = {self.names[i]: row.tolist() for i, row in enumerate(totals) if row.any()}
+        session = np.cumsum(moves == SESSION_START)
+        starts = int(session[-1]) if len(session) else 0
+        per_session = np.bincount(session[is_round][wins], minlength=starts + 1)
+        per_session[0] += session_wins
+        return stats, int(per_session[starts]), int(per_session.max())
+
+    def aggregate_python(self):
+        stats = RoundStats()
+        high_score = 0
+        session_wins = 0
+        moment = self.base_time
+        for moves, opponent, delta in self.records():
+            moment += delta
+            if moves == SESSION_START:
+                session_wins = 0
+            elif moves < SESSION_START:
+                record = RoundRecord(moves & 3, moves >> 2 & 3, moves >> 4 & 3, self.names[opponent], moment)
+                stats.record(record)
+                if record.result == WIN:
+                    session_wins += 1
+                    high_score = max(high_score, session_wins)
+        return stats, high_score
@@ -0,0 +1,346 @@
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+DATA_DIR_ENV = "CODSOFT_DATA_DIR"
+APP_NAME = "codsoft"
+LEGACY_SUFFIXES = ("", ".log", ".log.old", "-wal", "-shm", "-journal")
+
+_data_dir = None
+
+class StorageLocked(RuntimeError):
+    pass
+
+def set_data_dir(path):
+    global _data_dir
+    _data_dir = path
+
+def default_data_dir():
+    if os.environ.get(DATA_DIR_ENV):
+        return os.environ[DATA_DIR_ENV]
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, APP_NAME)
+
+def data_dir():
+    path = _data_dir or default_data_dir()
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def data_path(name, migrate=True):
+    path = os.path.join(data_dir(), name)
+    if migrate and not os.path.exists(path) and os.path.exists(name):
+        if os.path.realpath(os.path.dirname(os.path.abspath(name))) != os.path.realpath(data_dir()):
+            for suffix in LEGACY_SUFFIXES:
+                if os.path.exists(name + suffix):
+                    shutil.move(name + suffix, path + suffix)
+    return path
+
+def fsync_directory(path):
+    if fcntl is None:
+        return
+    fd = os.open(path or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+@contextmanager
+def atomic_open(path, mode="wb", encoding=None, newline=None):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding, newline=newline) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    fsync_directory(directory)
+
+def atomic_write(path, data):
+    with atomic_open(path, "wb") as file:
+        file.write(data)
+
+class FileLock:
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self.file = None
+
+    def acquire(self, timeout=None, poll_interval=0.05):
+        file = open(self.path, "a+b")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    file.close()
+                    raise StorageLocked(f"{self.path[:-5]} is in use by another instance") from None
+                time.sleep(poll_interval)
+        self.file = file
+        return self
+
+    def release(self):
+        if self.file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+class JsonSerializer:
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+class FastJsonSerializer(JsonSerializer):
+    name = "fastjson"
+
+    def dumps(self, obj):
+        if orjson is not None:
+            return orjson.dumps(obj)
+        return super().dumps(obj)
+
+    def loads(self, data):
+        if orjson is not None:
+            return orjson.loads(data)
+        return super().loads(data)
+
+class BinarySerializer:
+    name = "binary"
+
+    def dumps(self, obj):
+        if msgpack is not None:
+            return msgpack.packb(obj, use_bin_type=True)
+        chunks = []
+        pack_value(obj, chunks)
+        return b"".join(chunks)
+
+    def loads(self, data):
+        if msgpack is not None:
+            return msgpack.unpackb(data, raw=False, strict_map_key=False)
+        value, offset = unpack_value(memoryview(data), 0)
+        if offset != len(data):
+            raise ValueError("Trailing data after binary document")
+        return value
+
+INT_FORMATS = [
+    (0xCC, "B", 0, 0xFF), (0xCD, "H", 0, 0xFFFF), (0xCE, "I", 0, 0xFFFFFFFF), (0xCF, "Q", 0, 2 ** 64 - 1),
+    (0xD0, "b", -2 ** 7, -1), (0xD1, "h", -2 ** 15, -1), (0xD2, "i", -2 ** 31, -1), (0xD3, "q", -2 ** 63, -1),
+]
+
+def _pack_length(chunks, length, fix_base, fix_limit, codes):
+    if length < fix_limit:
+        chunks.append(bytes([fix_base | length]))
+    elif length <= 0xFF and codes[0] is not None:
+        chunks.append(struct.pack(">BB", codes[0], length))
+    elif length <= 0xFFFF:
+        chunks.append(struct.pack(">BH", codes[1], length))
+    else:
+        chunks.append(struct.pack(">BI", codes[2], length))
+
+def pack_value(obj, chunks):
+    if obj is None:
+        chunks.append(b"\xc0")
+    elif obj is True:
+        chunks.append(b"\xc3")
+    elif obj is False:
+        chunks.append(b"\xc2")
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80 or -32 <= obj < 0:
+            chunks.append(struct.pack(">b", obj) if obj < 0 else bytes([obj]))
+            return
+        for code, fmt, low, high in INT_FORMATS:
+            if low <= obj <= high:
+                chunks.append(struct.pack(">B" + fmt, code, obj))
+                return
+        raise OverflowError("Integer too large for binary document")
+    elif isinstance(obj, float):
+        chunks.append(struct.pack(">Bd", 0xCB, obj))
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        _pack_length(chunks, len(data), 0xA0, 32, (0xD9, 0xDA, 0xDB))
+        chunks.append(data)
+    elif isinstance(obj, (bytes, bytearray)):
+        _pack_length(chunks, len(obj), 0xC4, 0, (0xC4, 0xC5, 0xC6))
+        chunks.append(bytes(obj))
+    elif isinstance(obj, (list, tuple)):
+        _pack_length(chunks, len(obj), 0x90, 16, (None, 0xDC, 0xDD))
+        for item in obj:
+            pack_value(item, chunks)
+    elif isinstance(obj, dict):
+        _pack_length(chunks, len(obj), 0x80, 16, (None, 0xDE, 0xDF))
+        for key, value in obj.items():
+            pack_value(key, chunks)
+            pack_value(value, chunks)
+    else:
+        raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+FIXED_FORMATS = {
+    0xCC: ">B", 0xCD: ">H", 0xCE: ">I", 0xCF: ">Q",
+    0xD0: ">b", 0xD1: ">h", 0xD2: ">i", 0xD3: ">q",
+    0xCA: ">f", 0xCB: ">d",
+}
+LENGTH_FORMATS = {
+    0xD9: ("str", ">B"), 0xDA: ("str", ">H"), 0xDB: ("str", ">I"),
+    0xC4: ("bin", ">B"), 0xC5: ("bin", ">H"), 0xC6: ("bin", ">I"),
+    0xDC: ("array", ">H"), 0xDD: ("array", ">I"),
+    0xDE: ("map", ">H"), 0xDF: ("map", ">I"),
+}
+
+def unpack_value(data, offset):
+    code = data[offset]
+    offset += 1
+    if code < 0x80:
+        return code, offset
+    if code >= 0xE0:
+        return code - 0x100, offset
+    if code == 0xC0:
+        return None, offset
+    if code in (0xC2, 0xC3):
+        return code == 0xC3, offset
+    if code in FIXED_FORMATS:
+        fmt = FIXED_FORMATS[code]
+        return struct.unpack_from(fmt, data, offset)[0], offset + struct.calcsize(fmt)
+    if 0xA0 <= code <= 0xBF:
+        kind, length = "str", code & 0x1F
+    elif 0x90 <= code <= 0x9F:
+        kind, length = "array", code & 0x0F
+    elif 0x80 <= code <= 0x8F:
+        kind, length = "map", code & 0x0F
+    elif code in LENGTH_FORMATS:
+        kind, fmt = LENGTH_FORMATS[code]
+        length = struct.unpack_from(fmt, data, offset)[0]
+        offset += struct.calcsize(fmt)
+    else:
+        raise ValueError(f"Unsupported binary type code 0x{code:02x}")
+    if kind == "str":
+        return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+    if kind == "bin":
+        return bytes(data[offset:offset + length]), offset + length
+    if kind == "array":
+        items = []
+        for _ in range(length):
+            item, offset = unpack_value(data, offset)
+            items.append(item)
+        return items, offset
+    result = {}
+    for _ in range(length):
+        key, offset = unpack_value(data, offset)
+        result[key], offset = unpack_value(data, offset)
+    return result, offset
+
+SERIALIZERS = {
+    "json": JsonSerializer(),
+    "fastjson": FastJsonSerializer(),
+    "binary": BinarySerializer(),
+}
+
+def get_serializer(name):
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown serializer {name!r}") from None
+
+class Document:
+    def __init__(self, name, default=None, serializer="json", flush_delay=1.0, after=None, path=None):
+        self.path = path or data_path(name)
+        self.serializer = get_serializer(serializer) if isinstance(serializer, str) else serializer
+        self.flush_delay = flush_delay
+        self.after = after
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.pending = None
+        try:
+            with open(self.path, "rb") as file:
+                self.data = self.serializer.loads(file.read())
+        except FileNotFoundError:
+            self.data = None
+        except (ValueError, TypeError, IndexError, struct.error):
+            self.data = None
+        if not isinstance(self.data, dict):
+            self.data = {} if default is None else default
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        with self.lock:
+            if key in self.data and self.data[key] == value:
+                return
+            self.data[key] = value
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        with self.lock:
+            self.dirty = True
+            if self.pending is not None:
+                return
+            if self.after is not None:
+                self.pending = self.after(int(self.flush_delay * 1000), self.flush)
+            else:
+                self.pending = threading.Timer(self.flush_delay, self.flush)
+                self.pending.daemon = True
+                self.pending.start()
+
+    def flush(self):
+        with self.lock:
+            self.pending = None
+            if not self.dirty:
+                return
+            atomic_write(self.path, self.serializer.dumps(self.data))
+            self.dirty = False
+
+    def close(self):
+        with self.lock:
+            if isinstance(self.pending, threading.Timer):
+                self.pending.cancel()
+        self.flush()
@@ -0,0 +1,92 @@
+import bisect
+from datetime import date, datetime, timedelta
+
+PRIORITY_RANKS = {"High": 0, "Medium": 1, "Low": 2}
+NO_DATE = date.max.toordinal() + 1
+UNKNOWN_PRIORITY = len(PRIORITY_RANKS)
+
+def parse_due_date(text):
+    if not text:
+        return None
+    return datetime.strptime(text.strip(), "%Y-%m-%d").date()
+
+def due_key(text):
+    try:
+        due = parse_due_date(text)
+    except ValueError:
+        return NO_DATE
+    return due.toordinal() if due else NO_DATE
+
+class TaskSchedule:
+    def __init__(self, tasks=None):
+        self.keys = {}
+        self.by_due = []
+        self.by_priority = []
+        if tasks:
+            for task_id, task in tasks.items():
+                key = self.task_key(task)
+                self.keys[task_id] = key
+                self.by_due.append((key[0], key[1], task_id))
+                self.by_priority.append((key[1], key[0], task_id))
+            self.by_due.sort()
+            self.by_priority.sort()
+
+    @staticmethod
+    def task_key(task):
+        return due_key(task.get("due_date", "")), PRIORITY_RANKS.get(task.get("priority"), UNKNOWN_PRIORITY)
+
+    def add(self, task_id, task):
+        key = self.task_key(task)
+        self.keys[task_id] = key
+        bisect.insort(self.by_due, (key[0], key[1], task_id))
+        bisect.insort(self.by_priority, (key[1], key[0], task_id))
+
+    def remove(self, task_id):
+        due, rank = self.keys.pop(task_id)
+        self._remove(self.by_due, (due, rank, task_id))
+        self._remove(self.by_priority, (rank, due, task_id))
+
+    def update(self, task_id, task):
+        if self.keys[task_id] != self.task_key(task):
+            self.remove(task_id)
+            self.add(task_id, task)
+
+    @staticmethod
+    def _remove(items, item):
+        i = bisect.bisect_left(items, item)
+        if i < len(items) and items[i] == item:
+            del items[i]
+
+    def sort_key(self, task_id, column, reverse=False):
+        due, rank = self.keys[task_id]
+        key = (due, rank, task_id) if column == "Due Date" else (rank, due, task_id)
+        return tuple(-value for value in key) if reverse else key
+
+    def ordered(self, column, reverse=False):
+        items = self.by_due if column == "Due Date" else self.by_priority
+        return (item[2] for item in (reversed(items) if reverse else items))
+
+    def due_between(self, start, end):
+        lo = bisect.bisect_left(self.by_due, (start.toordinal(),))
+        hi = bisect.bisect_left(self.by_due, (end.toordinal() + 1,))
+        return [item[2] for item in self.by_due[lo:hi]]
+
+    def overdue(self, today=None):
+        today = today or date.today()
+        hi = bisect.bisect_left(self.by_due, (today.toordinal(),))
+        return [item[2] for item in self.by_due[:hi]]
+
+    def due_within(self, days, today=None):
+        today = today or date.today()
+        return self.due_between(today, today + timedelta(days=days))
+
+    def with_priority(self, priority, start=None, end=None):
+        rank = PRIORITY_RANKS[priority]
+        lo_due = start.toordinal() if start else 0
+        hi_due = end.toordinal() + 1 if end else NO_DATE + 1
+        lo = bisect.bisect_left(self.by_priority, (rank, lo_due))
+        hi = bisect.bisect_left(self.by_priority, (rank, hi_due))
+        return [item[2] for item in self.by_priority[lo:hi]]
+
+    def top_k(self, k):
+        return [item[2] for item in self.by_priority[:k]]
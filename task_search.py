@@ -0,0 +1,94 @@
+SEARCH_FIELDS = ("title", "category", "description")
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class TaskSearchIndex:
+    def __init__(self, tasks=None):
+        self.fields = {}
+        self.grams = None
+        self.last_query = None
+        self.last_results = None
+        if tasks:
+            for task_id, task in tasks.items():
+                self.add(task_id, task)
+
+    @staticmethod
+    def normalize(task):
+        return tuple(task.get(field, "").lower() for field in SEARCH_FIELDS)
+
+    @staticmethod
+    def field_grams(fields):
+        return set().union(*(trigrams(field) for field in fields))
+
+    def add(self, task_id, task):
+        fields = self.normalize(task)
+        self.fields[task_id] = fields
+        self.add_grams(task_id, self.field_grams(fields))
+        self.last_query = None
+
+    def remove(self, task_id):
+        self.remove_grams(task_id, self.field_grams(self.fields.pop(task_id)))
+        self.last_query = None
+
+    def update(self, task_id, task):
+        old_grams = self.field_grams(self.fields[task_id])
+        fields = self.normalize(task)
+        self.fields[task_id] = fields
+        new_grams = self.field_grams(fields)
+        self.remove_grams(task_id, old_grams - new_grams)
+        self.add_grams(task_id, new_grams - old_grams)
+        self.last_query = None
+
+    def build_grams(self):
+        self.grams = {}
+        for task_id, fields in self.fields.items():
+            for gram in self.field_grams(fields):
+                self.grams.setdefault(gram, set()).add(task_id)
+
+    def add_grams(self, task_id, grams):
+        if self.grams is None:
+            return
+        for gram in grams:
+            self.grams.setdefault(gram, set()).add(task_id)
+
+    def remove_grams(self, task_id, grams):
+        if self.grams is None:
+            return
+        for gram in grams:
+            ids = self.grams[gram]
+            ids.discard(task_id)
+            if not ids:
+                del self.grams[gram]
+
+    def matches(self, task_id, query):
+        return any(query in field for field in self.fields[task_id])
+
+    def search(self, query):
+        query = query.lower()
+        if not query:
+            results = list(self.fields)
+        elif self.last_query is not None and self.last_query in query:
+            results = [task_id for task_id in self.last_results if self.matches(task_id, query)]
+        elif len(query) < 3:
+            results = [task_id for task_id, fields in self.fields.items()
+                       if any(query in field for field in fields)]
+        else:
+            if self.grams is None:
+                self.build_grams()
+            postings = []
+            for gram in trigrams(query):
+                ids = self.grams.get(gram)
+                if not ids:
+                    postings = None
+                    break
+                postings.append(ids)
+            if postings is None:
+                results = []
+            else:
+                postings.sort(key=len)
+                candidates = set(postings[0]).intersection(*postings[1:])
+                results = sorted(task_id for task_id in candidates if self.matches(task_id, query))
+        self.last_query = query
+        self.last_results = results
+        return results
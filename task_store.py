@@ -0,0 +1,169 @@
+import os
+import threading
+
+from storage import FileLock, atomic_write, get_serializer
+
+class TaskStore:
+    def __init__(self, path="tasks.json", sync_interval=1.0, compact_every=1000, serializer="fastjson"):
+        self.path = path
+        self.serializer = get_serializer(serializer)
+        self.file_lock = FileLock(path)
+        self.log_path = path + ".log"
+        self.old_log_path = path + ".log.old"
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+        self.tasks = {}
+        self.next_id = 1
+        self.seq = 0
+        self.ops_since_compact = 0
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.log_file = None
+        self.compactor = None
+        self.closed = threading.Event()
+        self.syncer = None
+        self.migrated = False
+
+    def load(self):
+        if self.file_lock.file is None:
+            self.file_lock.acquire(timeout=0)
+        self.tasks = {}
+        self.next_id = 1
+        snapshot_seq = 0
+        try:
+            with open(self.path, "rb") as file:
+                snapshot = self.serializer.loads(file.read())
+            if isinstance(snapshot, list):
+                snapshot = {"seq": 0, "tasks": snapshot}
+            snapshot_seq = snapshot["seq"]
+            for task in snapshot["tasks"]:
+                self.insert(task)
+        except FileNotFoundError:
+            pass
+        self.seq = snapshot_seq
+        for path in (self.old_log_path, self.log_path):
+            self.replay(path, snapshot_seq)
+        self.log_file = open(self.log_path, "ab")
+        self.ops_since_compact = 0
+        if self.syncer is None:
+            self.syncer = threading.Thread(target=self.sync_loop, daemon=True)
+            self.syncer.start()
+        if self.migrated:
+            self.compact(background=False)
+        return self.tasks
+
+    def insert(self, task):
+        if "id" not in task:
+            task["id"] = self.next_id
+            self.migrated = True
+        self.tasks[task["id"]] = task
+        self.next_id = max(self.next_id, task["id"] + 1)
+
+    def replay(self, path, snapshot_seq):
+        try:
+            file = open(path, "rb+")
+        except FileNotFoundError:
+            return
+        with file:
+            valid = 0
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = self.serializer.loads(line)
+                except ValueError:
+                    break
+                valid += len(line)
+                if record["seq"] <= snapshot_seq:
+                    continue
+                self.apply(record)
+                self.seq = record["seq"]
+            file.truncate(valid)
+
+    def task_id(self, record):
+        if "id" in record:
+            return record["id"]
+        return list(self.tasks)[record["index"]]
+
+    def apply(self, record):
+        op = record["op"]
+        if op == "add":
+            self.insert(record["task"])
+        elif op == "update":
+            self.tasks[self.task_id(record)].update(record["fields"])
+        elif op == "delete":
+            del self.tasks[self.task_id(record)]
+
+    def add(self, task):
+        task["id"] = self.next_id
+        self.write({"op": "add", "task": task})
+        return task["id"]
+
+    def update(self, task_id, fields):
+        self.write({"op": "update", "id": task_id, "fields": fields})
+
+    def delete(self, task_id):
+        self.write({"op": "delete", "id": task_id})
+
+    def write(self, record):
+        self.seq += 1
+        record["seq"] = self.seq
+        self.apply(record)
+        line = self.serializer.dumps(record) + b"\n"
+        with self.lock:
+            self.log_file.write(line)
+            self.log_file.flush()
+            self.dirty = True
+        self.ops_since_compact += 1
+        if self.ops_since_compact >= self.compact_every:
+            self.compact()
+
+    def sync_loop(self):
+        while not self.closed.wait(self.sync_interval):
+            self.sync()
+
+    def sync(self):
+        with self.lock:
+            if self.dirty and self.log_file is not None:
+                os.fsync(self.log_file.fileno())
+                self.dirty = False
+
+    def compact(self, background=True):
+        if self.compactor is not None:
+            if background and self.compactor.is_alive():
+                return
+            self.compactor.join()
+        tasks = [dict(task) for task in self.tasks.values()]
+        seq = self.seq
+        with self.lock:
+            self.log_file.flush()
+            os.fsync(self.log_file.fileno())
+            self.log_file.close()
+            if os.path.exists(self.old_log_path):
+                with open(self.old_log_path, "ab") as old_log, open(self.log_path, "rb") as log:
+                    old_log.write(log.read())
+                os.remove(self.log_path)
+            else:
+                os.replace(self.log_path, self.old_log_path)
+            self.log_file = open(self.log_path, "ab")
+            self.dirty = False
+        self.ops_since_compact = 0
+        self.compactor = threading.Thread(target=self.write_snapshot, args=(tasks, seq))
+        self.compactor.start()
+        self.migrated = False
+        if not background:
+            self.compactor.join()
+
+    def write_snapshot(self, tasks, seq):
+        atomic_write(self.path, self.serializer.dumps({"seq": seq, "tasks": tasks}))
+        os.remove(self.old_log_path)
+
+    def close(self):
+        if self.log_file is None:
+            return
+        self.compact(background=False)
+        self.closed.set()
+        with self.lock:
+            self.log_file.close()
+            self.log_file = None
+        self.file_lock.release()
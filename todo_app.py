@@ -1,21 +1,47 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
-from datetime import datetime
-import os
+from storage import Document, StorageLocked, data_path
+from task_store import TaskStore
+from task_search import TaskSearchIndex
+from task_schedule import TaskSchedule, parse_due_date
+from datetime import date, datetime, timedelta
+import bisect
+import threading
+
+LOAD_POLL_MS = 20
+LOAD_CHUNK = 500
 
 class ToDoApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Advanced To-Do List")
         self.root.geometry("800x600")
-        self.tasks = []
-        self.load_tasks()
+        self.store = TaskStore(data_path("tasks.json"))
+        self.settings = Document("todo_settings.json", after=self.root.after)
+        self.tasks = {}
+        self.search_index = TaskSearchIndex()
+        self.schedule = TaskSchedule()
+        self.visible_ids = {}
+        self.sorted_rows = []
+        self.row_keys = {}
+        self.search_job = None
+        self.populate_job = None
+        self.loading = True
+        self.load_result = None
+        self.sort_column = self.settings.get("sort_column")
+        self.sort_reverse = self.settings.get("sort_reverse", False)
         self.style = ttk.Style()
         self.style.configure("Priority.High.TLabel", foreground="red")
         self.style.configure("Priority.Medium.TLabel", foreground="orange")
         self.style.configure("Priority.Low.TLabel", foreground="green")
         self.setup_gui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.start_loading()
+
+    def on_close(self):
+        self.settings.close()
+        self.store.close()
+        self.root.destroy()
 
     def setup_gui(self):
         left_panel = ttk.Frame(self.root, padding="10")
@@ -43,9 +69,14 @@ class ToDoApp:
         self.category_entry = ttk.Entry(left_panel, width=30)
         self.category_entry.pack(pady=5)
         
-        ttk.Button(left_panel, text="Add Task", command=self.add_task).pack(pady=10)
-        ttk.Button(left_panel, text="Update Selected", command=self.update_task).pack(pady=5)
-        ttk.Button(left_panel, text="Delete Selected", command=self.delete_task).pack(pady=5)
+        self.action_buttons = [
+            ttk.Button(left_panel, text="Add Task", command=self.add_task),
+            ttk.Button(left_panel, text="Update Selected", command=self.update_task),
+            ttk.Button(left_panel, text="Delete Selected", command=self.delete_task),
+        ]
+        for i, button in enumerate(self.action_buttons):
+            button.pack(pady=10 if i == 0 else 5)
+            button.state(["disabled"])
         
         right_panel = ttk.Frame(self.root, padding="10")
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
@@ -55,20 +86,28 @@ class ToDoApp:
         
         ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', lambda name, index, mode: self.filter_tasks())
+        self.search_var.trace('w', lambda name, index, mode: self.schedule_filter())
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
         search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
+        ttk.Label(search_frame, text="Show:").pack(side=tk.LEFT)
+        self.view_var = tk.StringVar(value=self.settings.get("view", "All"))
+        views = ["All", "Overdue", "Due This Week", "High Priority This Week", "Top 10 by Priority"]
+        view_combo = ttk.Combobox(search_frame, textvariable=self.view_var, values=views, state="readonly", width=22)
+        view_combo.pack(side=tk.LEFT)
+        view_combo.bind("<<ComboboxSelected>>", lambda event: self.change_view())
+        
         self.tree = ttk.Treeview(right_panel, columns=("Title", "Due Date", "Priority", "Category", "Status"), show="headings")
         self.tree.heading("Title", text="Title")
-        self.tree.heading("Due Date", text="Due Date")
-        self.tree.heading("Priority", text="Priority")
+        self.tree.heading("Due Date", text="Due Date", command=lambda: self.sort_by("Due Date"))
+        self.tree.heading("Priority", text="Priority", command=lambda: self.sort_by("Priority"))
         self.tree.heading("Category", text="Category")
         self.tree.heading("Status", text="Status")
         self.tree.pack(fill=tk.BOTH, expand=True)
         self.tree.bind('<<TreeviewSelect>>', self.on_select)
         
-        self.refresh_task_list()
+        self.status_var = tk.StringVar(value="Loading tasks...")
+        ttk.Label(right_panel, textvariable=self.status_var).pack(fill=tk.X, pady=(5, 0))
 
     def add_task(self):
         title = self.title_entry.get().strip()
@@ -80,6 +119,8 @@ class ToDoApp:
         due_date = self.date_entry.get().strip()
         priority = self.priority_var.get()
         category = self.category_entry.get().strip()
+        if not self.valid_due_date(due_date):
+            return
         
         task = {
             "title": title,
@@ -91,9 +132,18 @@ class ToDoApp:
             "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
-        self.tasks.append(task)
-        self.save_tasks()
-        self.refresh_task_list()
+        task_id = self.store.add(task)
+        self.search_index.add(task_id, task)
+        self.schedule.add(task_id, task)
+        if self.view_var.get() != "All":
+            self.filter_tasks()
+        elif not self.search_index.matches(task_id, self.search_var.get().lower()):
+            pass
+        elif self.sort_column:
+            self.place_row(task_id)
+        else:
+            self.tree.insert("", tk.END, iid=str(task_id), values=self.task_values(task))
+            self.visible_ids[task_id] = None
         self.clear_inputs()
 
     def update_task(self):
@@ -102,7 +152,7 @@ class ToDoApp:
             messagebox.showwarning("Warning", "Please select a task to update!")
             return
             
-        index = self.tree.index(selection[0])
+        task_id = int(selection[0])
         title = self.title_entry.get().strip()
         if not title:
             messagebox.showerror("Error", "Title is required!")
@@ -112,8 +162,10 @@ class ToDoApp:
         due_date = self.date_entry.get().strip()
         priority = self.priority_var.get()
         category = self.category_entry.get().strip()
+        if not self.valid_due_date(due_date):
+            return
         
-        self.tasks[index].update({
+        self.store.update(task_id, {
             "title": title,
             "description": description,
             "due_date": due_date,
@@ -121,8 +173,18 @@ class ToDoApp:
             "category": category
         })
         
-        self.save_tasks()
-        self.refresh_task_list()
+        task = self.tasks[task_id]
+        self.search_index.update(task_id, task)
+        self.schedule.update(task_id, task)
+        if self.view_var.get() != "All":
+            self.remove_row(task_id)
+            self.filter_tasks()
+        elif not self.search_index.matches(task_id, self.search_var.get().lower()):
+            self.remove_row(task_id)
+        elif self.sort_column:
+            self.place_row(task_id)
+        else:
+            self.tree.item(selection[0], values=self.task_values(task))
         self.clear_inputs()
 
     def delete_task(self):
@@ -132,17 +194,17 @@ class ToDoApp:
             return
             
         if messagebox.askyesno("Confirm", "Are you sure you want to delete this task?"):
-            index = self.tree.index(selection[0])
-            self.tasks.pop(index)
-            self.save_tasks()
-            self.refresh_task_list()
+            task_id = int(selection[0])
+            self.store.delete(task_id)
+            self.search_index.remove(task_id)
+            self.remove_row(task_id)
+            self.schedule.remove(task_id)
             self.clear_inputs()
 
     def on_select(self, event):
         selection = self.tree.selection()
         if selection:
-            index = self.tree.index(selection[0])
-            task = self.tasks[index]
+            task = self.tasks[int(selection[0])]
             
             self.title_entry.delete(0, tk.END)
             self.title_entry.insert(0, task["title"])
@@ -165,34 +227,176 @@ class ToDoApp:
         self.priority_var.set("Medium")
         self.category_entry.delete(0, tk.END)
 
-    def filter_tasks(self):
+    def valid_due_date(self, due_date):
+        try:
+            parse_due_date(due_date)
+        except ValueError:
+            messagebox.showerror("Error", "Due date must be in YYYY-MM-DD format!")
+            return False
+        return True
+
+    def sort_by(self, column):
+        if self.sort_column != column:
+            self.sort_column = column
+            self.sort_reverse = False
+        elif not self.sort_reverse:
+            self.sort_reverse = True
+        else:
+            self.sort_column = None
+            self.sort_reverse = False
+        self.settings.set("sort_column", self.sort_column)
+        self.settings.set("sort_reverse", self.sort_reverse)
+        self.filter_tasks(reorder=True)
+
+    def change_view(self):
+        self.settings.set("view", self.view_var.get())
+        self.filter_tasks()
+
+    def view_ids(self):
+        view = self.view_var.get()
+        today = date.today()
+        if view == "Overdue":
+            return self.schedule.overdue(today)
+        if view == "Due This Week":
+            return self.schedule.due_within(7, today)
+        if view == "High Priority This Week":
+            return self.schedule.with_priority("High", today, today + timedelta(days=7))
+        if view == "Top 10 by Priority":
+            return self.schedule.top_k(10)
+        return None
+
+    def schedule_filter(self):
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(120, self.filter_tasks)
+
+    def filter_tasks(self, reorder=False):
+        self.search_job = None
         search_term = self.search_var.get().lower()
-        self.refresh_task_list(search_term)
-
-    def refresh_task_list(self, search_term=""):
-        self.tree.delete(*self.tree.get_children())
-        for task in self.tasks:
-            if search_term.lower() in task["title"].lower() or search_term.lower() in task["category"].lower():
-                self.tree.insert("", tk.END, values=(
-                    task["title"],
-                    task["due_date"],
-                    task["priority"],
-                    task["category"],
-                    task["status"]
-                ))
+        self.refresh_task_list(search_term, reorder)
+        if self.populate_job is not None:
+            self.root.after_cancel(self.populate_job)
+            self.populate_job = None
+            self.finish_loading()
+
+    def task_values(self, task):
+        return (
+            task["title"],
+            task["due_date"],
+            task["priority"],
+            task["category"],
+            task["status"]
+        )
+
+    def matching_ids(self, search_term=""):
+        results = self.search_index.search(search_term)
+        view_ids = self.view_ids()
+        if view_ids is not None:
+            view_ids = set(view_ids)
+            results = [task_id for task_id in results if task_id in view_ids]
+        if self.sort_column:
+            matched = set(results)
+            results = [task_id for task_id in self.schedule.ordered(self.sort_column, self.sort_reverse)
+                       if task_id in matched]
+        return results
+
+    def row_key(self, task_id):
+        return self.schedule.sort_key(task_id, self.sort_column, self.sort_reverse)
+
+    def track_order(self, results):
+        self.row_keys = {task_id: self.row_key(task_id) for task_id in results} if self.sort_column else {}
+        self.sorted_rows = list(self.row_keys.values())
+
+    def place_row(self, task_id):
+        old_key = self.row_keys.pop(task_id, None)
+        if old_key is not None:
+            del self.sorted_rows[bisect.bisect_left(self.sorted_rows, old_key)]
+        key = self.row_key(task_id)
+        position = bisect.bisect_left(self.sorted_rows, key)
+        self.sorted_rows.insert(position, key)
+        self.row_keys[task_id] = key
+        values = self.task_values(self.tasks[task_id])
+        if task_id not in self.visible_ids:
+            self.tree.insert("", position, iid=str(task_id), values=values)
+            self.visible_ids[task_id] = None
+            return
+        self.tree.item(str(task_id), values=values)
+        if key != old_key:
+            self.tree.move(str(task_id), "", position)
+
+    def remove_row(self, task_id):
+        if task_id not in self.visible_ids:
+            return
+        key = self.row_keys.pop(task_id, None)
+        if key is not None:
+            del self.sorted_rows[bisect.bisect_left(self.sorted_rows, key)]
+        self.tree.delete(str(task_id))
+        del self.visible_ids[task_id]
+
+    def refresh_task_list(self, search_term="", reorder=False):
+        results = self.matching_ids(search_term)
+        keep = set(results)
+        removed = [str(task_id) for task_id in self.visible_ids if task_id not in keep]
+        if removed:
+            self.tree.delete(*removed)
+        for position, task_id in enumerate(results):
+            if task_id not in self.visible_ids:
+                self.tree.insert("", position, iid=str(task_id), values=self.task_values(self.tasks[task_id]))
+            elif reorder:
+                self.tree.move(str(task_id), "", position)
+        self.visible_ids = dict.fromkeys(results)
+        self.track_order(results)
+
+    def start_loading(self):
+        threading.Thread(target=self.load_tasks, daemon=True).start()
+        self.root.after(LOAD_POLL_MS, self.check_loaded)
 
     def load_tasks(self):
         try:
-            with open("tasks.json", "r") as file:
-                self.tasks = json.load(file)
-        except FileNotFoundError:
-            self.tasks = []
+            tasks = self.store.load()
+            self.load_result = (tasks, TaskSearchIndex(tasks), TaskSchedule(tasks))
+        except (StorageLocked, OSError, ValueError) as e:
+            self.load_result = e
+
+    def check_loaded(self):
+        if self.load_result is None:
+            self.root.after(LOAD_POLL_MS, self.check_loaded)
+            return
+        if isinstance(self.load_result, Exception):
+            messagebox.showerror("Error", str(self.load_result))
+            self.on_close()
+            return
+        self.tasks, self.search_index, self.schedule = self.load_result
+        self.load_result = None
+        results = self.matching_ids(self.search_var.get().lower())
+        self.track_order(results)
+        self.populate(results, 0)
+
+    def populate(self, results, start):
+        end = min(start + LOAD_CHUNK, len(results))
+        for task_id in results[start:end]:
+            self.tree.insert("", tk.END, iid=str(task_id), values=self.task_values(self.tasks[task_id]))
+            self.visible_ids[task_id] = None
+        if end < len(results):
+            self.status_var.set(f"Loading tasks... {end}/{len(results)}")
+            self.populate_job = self.root.after(1, self.populate, results, end)
+        else:
+            self.populate_job = None
+            self.finish_loading()
+
+    def finish_loading(self):
+        self.loading = False
+        self.status_var.set("")
+        for button in self.action_buttons:
+            button.state(["!disabled"])
 
     def save_tasks(self):
-        with open("tasks.json", "w") as file:
-            json.dump(self.tasks, file, indent=2)
+        self.store.compact(background=False)
+
+def create_app(root):
+    return ToDoApp(root)
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app = ToDoApp(root)
+    app = create_app(root)
     root.mainloop()